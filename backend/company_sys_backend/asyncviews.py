@@ -0,0 +1,97 @@
+"""
+Native async list and retrieve for DRF viewsets.
+
+DRF views are synchronous, so under ASGI a request to one holds a thread
+from the first middleware to the response, including all the time it waits
+on the database. AsyncReadMixin serves GET list and retrieve from an async
+view instead. Queries go through Django's async ORM (aget(), aaggregate()),
+and the synchronous parts (DRF authentication and filter backends, cursor
+pagination and serializers) run in short sync_to_async() hops, the same way
+the async ORM itself runs. Between the hops the request holds no thread.
+Every other method and action keeps the synchronous path, as does every
+request when ASYNC_READ_VIEWS is False.
+
+The async handlers mirror the synchronous ones with an ``a`` prefix (alist,
+aretrieve, aget_object, aget_validators), and ConditionalGetMixin and
+CachedResponseMixin wrap them just as they wrap list and retrieve. Role
+scoping, permissions, validators and the response cache therefore behave
+the same on both paths.
+"""
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework.response import Response
+
+ASYNC_ACTIONS = ('list', 'retrieve')
+
+
+class AsyncReadMixin:
+    """Viewset mixin; place it after the conditional and caching mixins."""
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if actions.get('get') not in ASYNC_ACTIONS:
+            return view
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            if request.method != 'GET' or not settings.ASYNC_READ_VIEWS:
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            # As in ViewSetMixin.as_view()
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Keeps cls, actions and csrf_exempt, which routers and tests read
+        return update_wrapper(async_view, view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """APIView.dispatch() for the async handlers."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            # Authentication, permissions and throttling
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await getattr(self, f'a{self.action}')(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def afilter_queryset(self):
+        # Filter backends may validate parameters against the database
+        return await sync_to_async(self.filter_queryset)(self.get_queryset())
+
+    async def aserialize(self, instance, **kwargs):
+        # Serializers follow relations and are CPU-bound: keep them off the event loop
+        return await sync_to_async(lambda: self.get_serializer(instance, **kwargs).data)()
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            # As get_object_or_404() words it
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset()
+        page = await sync_to_async(self.paginate_queryset)(queryset)
+        if page is not None:
+            return self.get_paginated_response(await self.aserialize(page, many=True))
+        return Response(await self.aserialize([obj async for obj in queryset], many=True))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return Response(await self.aserialize(await self.aget_object()))
@@ -0,0 +1,103 @@
+import hashlib
+from datetime import timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag/Last-Modified to list and retrieve responses and answers
+    If-None-Match / If-Modified-Since with 304 before the view queries or
+    serializes anything. Views provide ``get_validators(request)`` returning
+    ``(token, last_modified)``, where ``token`` changes whenever the response
+    body would and ``last_modified`` is an aware datetime or None.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aconditional_response(super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aconditional_response(super().aretrieve, request, *args, **kwargs)
+
+    async def aget_validators(self, request):
+        return await sync_to_async(self.get_validators)(request)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, timestamp = self.get_etag(request, *self.get_validators(request))
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.add_validators(response, etag, timestamp)
+
+    async def aconditional_response(self, handler, request, *args, **kwargs):
+        etag, timestamp = self.get_etag(request, *await self.aget_validators(request))
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.add_validators(response, etag, timestamp)
+
+    def get_etag(self, request, token, last_modified):
+        source = f'{self.basename}:{request.user.pk}:{token}:{request.build_absolute_uri()}'
+        etag = quote_etag(hashlib.md5(source.encode()).hexdigest())
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def add_validators(self, response, etag, timestamp):
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # Browsers may keep the body but must revalidate it before reuse
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class AggregateValidatorsMixin(ConditionalGetMixin):
+    """
+    Derives validators from the row count and the newest ``modified_field``
+    of the filtered queryset (or of the single row for retrieve), one
+    aggregate query that never loads the rows themselves. Relations the
+    response embeds go in ``embedded_relations``; the newest ``updated_at``
+    among the related rows counts as a modification too.
+    """
+    modified_field = 'updated_at'
+    embedded_relations = ()
+
+    def validators_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        if lookup in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup]})
+        return queryset
+
+    def aggregates(self):
+        return {
+            'count': Count('pk'),
+            'modified': Max(self.modified_field),
+            **{relation: Max(f'{relation}__updated_at') for relation in self.embedded_relations},
+        }
+
+    def get_validators(self, request):
+        return self.validators_from(self.validators_queryset().aggregate(**self.aggregates()))
+
+    async def aget_validators(self, request):
+        queryset = await sync_to_async(self.validators_queryset)()
+        return self.validators_from(await queryset.aaggregate(**self.aggregates()))
+
+    def validators_from(self, stats):
+        times = [stats['modified'], *(stats[relation] for relation in self.embedded_relations)]
+        token = ':'.join([str(stats['count'])] + [
+            modified.astimezone(dt_timezone.utc).isoformat() if modified else '' for modified in times
+        ])
+        return token, max(filter(None, times), default=None)
@@ -0,0 +1,301 @@
+"""
+Connection pooling for the MySQL and SQLite backends.
+
+Django pools connections natively only on PostgreSQL. The backends in
+company_sys_backend.db.mysql and company_sys_backend.db.sqlite3 accept the
+same ``OPTIONS['pool']`` setting (True or a dict of the options below) and
+keep one ConnectionPool per database alias and process:
+
+    'OPTIONS': {'pool': {'max_size': 20, 'timeout': 10, 'max_lifetime': 1800}}
+
+With a pool, closing a Django connection returns it to the pool instead of
+disconnecting. Django closes connections at the end of every request and
+Celery task when CONN_MAX_AGE is 0. The next connect() takes the most
+recently returned idle connection, so only pool growth pays for a network
+and authentication handshake. A reused connection keeps its session
+settings, so Django does not initialize it again.
+
+Health: a connection idle for ``check_after`` seconds is pinged before reuse
+and replaced if the ping fails. A connection is closed instead of reused
+once it is older than ``max_lifetime`` or has been idle longer than
+``max_idle``. Keep both below MySQL's wait_timeout. When ``max_size``
+connections are checked out, connect() waits up to ``timeout`` seconds for
+one to be returned, then raises PoolTimeout.
+
+Pools are keyed by process id. A forked Celery or web worker therefore opens
+its own connections and never touches sockets inherited from its parent.
+"""
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+from django.db.backends.base.base import NO_DB_ALIAS
+
+DEFAULTS = {
+    'max_size': 10,
+    'timeout': 10.0,
+    'check_after': 5.0,
+    'max_idle': 300.0,
+    'max_lifetime': 1800.0,
+}
+EVENTS = ('created', 'reused', 'waits', 'timeouts', 'discarded')
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+@dataclass
+class PooledConnection:
+    connection: object
+    created: float
+    released: float = 0.0
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    def __init__(self, max_size, timeout, check_after, max_idle, max_lifetime):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.lock = threading.Condition()
+        # Most recently returned last
+        self.idle = deque()
+        self.checked_out = {}
+        self.opening = 0
+        self.events = dict.fromkeys(EVENTS, 0)
+
+    def acquire(self, connect, check):
+        """
+        A connection from the pool, or a new one from ``connect()`` while
+        the pool has room. ``check(connection)`` must raise if the
+        connection is dead.
+        """
+        while True:
+            pooled, expired = self.take()
+            for stale in expired:
+                close_quietly(stale.connection)
+            if pooled is None:
+                break
+            if time.monotonic() - pooled.released < self.check_after:
+                return self.hand_out(pooled, 'reused')
+            try:
+                check(pooled.connection)
+            except Exception:
+                self.discard(pooled)
+            else:
+                return self.hand_out(pooled, 'reused')
+
+        try:
+            connection = connect()
+        except BaseException:
+            with self.lock:
+                self.opening -= 1
+                self.lock.notify()
+            raise
+        pooled = PooledConnection(connection, time.monotonic())
+        with self.lock:
+            self.opening -= 1
+            self.checked_out[id(connection)] = pooled
+        return self.hand_out(pooled, 'created')
+
+    def take(self):
+        """
+        Check out an idle connection, or reserve room for a new one
+        (returning None), waiting up to ``timeout`` when neither is possible.
+        """
+        deadline = None
+        with self.lock:
+            while True:
+                expired = self.expire()
+                if self.idle:
+                    pooled = self.idle.pop()
+                    self.checked_out[id(pooled.connection)] = pooled
+                    return pooled, expired
+                if len(self.checked_out) + self.opening < self.max_size:
+                    self.opening += 1
+                    return None, expired
+                now = time.monotonic()
+                if deadline is None:
+                    self.events['waits'] += 1
+                    deadline = now + self.timeout
+                if now >= deadline:
+                    self.events['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'No database connection was returned to the pool within {self.timeout}s '
+                        f'({self.max_size} checked out).'
+                    )
+                self.lock.wait(deadline - now)
+
+    def expire(self):
+        """Remove idle connections past max_idle or max_lifetime; the caller closes them outside the lock."""
+        now = time.monotonic()
+        expired = [
+            pooled for pooled in self.idle
+            if now - pooled.released > self.max_idle or now - pooled.created > self.max_lifetime
+        ]
+        for pooled in expired:
+            self.idle.remove(pooled)
+        self.events['discarded'] += len(expired)
+        return expired
+
+    def hand_out(self, pooled, event):
+        with self.lock:
+            self.events[event] += 1
+        return pooled.connection, event == 'reused'
+
+    def discard(self, pooled):
+        close_quietly(pooled.connection)
+        with self.lock:
+            self.checked_out.pop(id(pooled.connection), None)
+            self.events['discarded'] += 1
+            self.lock.notify()
+
+    def release(self, connection, reusable=True):
+        with self.lock:
+            pooled = self.checked_out.pop(id(connection), None)
+            if pooled is None:
+                # Not ours, e.g. inherited through fork(): never touch it
+                return
+            now = time.monotonic()
+            keep = reusable and now - pooled.created < self.max_lifetime
+            if keep:
+                pooled.released = now
+                self.idle.append(pooled)
+            else:
+                self.events['discarded'] += 1
+            self.lock.notify()
+        if not keep:
+            close_quietly(connection)
+
+    def close(self):
+        """Close the idle connections; checked-out ones are closed when released."""
+        with self.lock:
+            idle, self.idle = list(self.idle), deque()
+            self.max_lifetime = 0
+        for pooled in idle:
+            close_quietly(pooled.connection)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'max_size': self.max_size,
+                'checked_out': len(self.checked_out),
+                'idle': len(self.idle),
+                **self.events,
+            }
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    DatabaseWrapper mixin that takes connections from a ConnectionPool when
+    ``OPTIONS['pool']`` is set. Backends implement check_connection().
+    """
+    _connection_pools = {}
+
+    @property
+    def pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if self.alias == NO_DB_ALIAS or not options:
+            return None
+        key = (self.alias, os.getpid())
+        if key not in self._connection_pools:
+            if self.settings_dict.get('CONN_MAX_AGE', 0) != 0:
+                raise ImproperlyConfigured("Pooling doesn't support persistent connections.")
+            options = {} if options is True else options
+            unknown = set(options) - set(DEFAULTS)
+            if unknown:
+                raise ImproperlyConfigured(f'Unknown pool options: {", ".join(sorted(unknown))}.')
+            # Threads starting at once may build several; the first one wins
+            self._connection_pools.setdefault(key, ConnectionPool(**{**DEFAULTS, **options}))
+        return self._connection_pools[key]
+
+    def close_pool(self):
+        pool = self._connection_pools.pop((self.alias, os.getpid()), None)
+        if pool is not None:
+            pool.close()
+
+    @staticmethod
+    def check_connection(connection):
+        raise NotImplementedError
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        self.connection_reused = False
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        connect = super().get_new_connection
+        connection, self.connection_reused = pool.acquire(lambda: connect(conn_params), self.check_connection)
+        return connection
+
+    def init_connection_state(self):
+        # A pooled session keeps the state set when it was created
+        if not self.connection_reused:
+            super().init_connection_state()
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        connection, self.connection = self.connection, None
+        pool.release(connection, self.reset_for_reuse(connection))
+
+    def reset_for_reuse(self, connection):
+        """Roll back anything left open; False if the connection is not fit for reuse."""
+        try:
+            if self.errors_occurred:
+                self.check_connection(connection)
+            if self.in_atomic_block or not self.autocommit:
+                connection.rollback()
+        except Exception:
+            return False
+        return True
+
+
+def pool_stats():
+    """Stats of this process's pools by database alias."""
+    pid = os.getpid()
+    return {
+        alias: pool.stats()
+        for (alias, owner), pool in list(PooledDatabaseWrapperMixin._connection_pools.items())
+        if owner == pid
+    }
+
+
+def prometheus_text(prefix):
+    stats = pool_stats()
+    if not stats:
+        return ''
+    pid = os.getpid()
+    lines = [
+        f'# HELP {prefix}db_pool_connections Pooled database connections of the answering worker process.',
+        f'# TYPE {prefix}db_pool_connections gauge',
+    ]
+    for alias, values in sorted(stats.items()):
+        for state in ('checked_out', 'idle', 'max_size'):
+            lines.append(f'{prefix}db_pool_connections{{alias="{alias}",pid="{pid}",state="{state}"}} {values[state]}')
+    lines += [
+        f'# HELP {prefix}db_pool_events_total Connections created, reused and discarded, waits and timeouts.',
+        f'# TYPE {prefix}db_pool_events_total counter',
+    ]
+    for alias, values in sorted(stats.items()):
+        for event in EVENTS:
+            lines.append(f'{prefix}db_pool_events_total{{alias="{alias}",pid="{pid}",event="{event}"}} {values[event]}')
+    return '\n'.join(lines) + '\n'
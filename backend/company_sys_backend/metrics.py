@@ -0,0 +1,22 @@
+"""
+Process-independent counters kept in the default cache (Redis in
+deployments), for cheap operational metrics shared by all workers.
+"""
+from django.core.cache import cache
+
+KEY = 'metrics:{}'
+
+
+def incr(name, amount=1):
+    key = KEY.format(name)
+    try:
+        return cache.incr(key, amount)
+    except ValueError:
+        if cache.add(key, amount, None):
+            return amount
+        return cache.incr(key, amount)
+
+
+def read(*names):
+    values = cache.get_many([KEY.format(name) for name in names])
+    return {name: values.get(KEY.format(name), 0) for name in names}
@@ -0,0 +1,22 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (created_at, id), newest first.
+
+    Each page is a single indexed range scan, so the cost of a request does not
+    grow with how deep the client has paged, unlike LIMIT/OFFSET pagination.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class OldestFirstCursorPagination(CreatedAtCursorPagination):
+    ordering = ('created_at', 'id')
+
+
+class DateJoinedCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-date_joined', '-id')
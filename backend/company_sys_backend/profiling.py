@@ -0,0 +1,297 @@
+"""
+Per-request profiling: SQL query count and time, serializer time, total
+latency and response size.
+
+ProfilingMiddleware profiles a PROFILING_SAMPLE_RATE share of requests; the
+rest pay for one random() call. A profiled response gets a Server-Timing
+header, and its figures are added to histograms per endpoint (method and URL
+name). Histograms live in each process and, with PROFILING_STORE = 'cache',
+are added to shared counters in the default cache (Redis in deployments)
+every PROFILING_FLUSH_INTERVAL seconds, so all workers report one set.
+MetricsView serves them, with estimated percentiles, in the Prometheus text
+format.
+"""
+import bisect
+import contextvars
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import permissions
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from projects.permissions import IsAdminUser
+from . import metrics as counters
+from .db import pool
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# name: (help, bucket upper bounds, scale of the integer sums kept in the cache)
+HISTOGRAMS = {
+    'request_duration_seconds': ('Time to produce the response.', TIME_BUCKETS, 1_000_000),
+    'db_duration_seconds': ('Time spent executing SQL.', TIME_BUCKETS, 1_000_000),
+    'serialize_duration_seconds': ('Time spent in serializers, SQL excluded.', TIME_BUCKETS, 1_000_000),
+    'db_queries': ('SQL queries executed.', (1, 2, 5, 10, 20, 50, 100, 200, 500), 1),
+    'response_bytes': ('Response body size.', (1_000, 10_000, 100_000, 1_000_000, 10_000_000), 1),
+}
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_PREFIX = 'companysys_'
+ENDPOINTS_KEY = 'profiling:endpoints'
+
+
+@dataclass
+class Profile:
+    started: float
+    queries: int = 0
+    db: float = 0.0
+    serialize: float = 0.0
+
+
+# Copied into the threads sync_to_async runs ORM calls in, so async views
+# are profiled too
+current = contextvars.ContextVar('profile', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    profile = current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db += time.perf_counter() - start
+
+
+def install(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install)
+
+
+class ProfiledSerializerMixin:
+    """
+    Generic view mixin that adds the time the view's serializers spend
+    producing ``.data``, less the SQL they trigger, to the request profile.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if current.get() is None:
+            return serializer
+        to_representation = serializer.to_representation
+
+        def timed(instance):
+            profile = current.get()
+            start, db = time.perf_counter(), profile.db
+            try:
+                return to_representation(instance)
+            finally:
+                profile.serialize += time.perf_counter() - start - (profile.db - db)
+
+        # Only the top-level serializer; nested ones run inside it
+        serializer.to_representation = timed
+        return serializer
+
+
+def observe(series, endpoint, name, value):
+    buckets, scale = HISTOGRAMS[name][1:]
+    # Per-bucket counts (the last one is +Inf), then the sum and the count
+    row = series.setdefault((endpoint, name), [0] * (len(buckets) + 3))
+    row[bisect.bisect_left(buckets, value)] += 1
+    row[-2] += round(value * scale)
+    row[-1] += 1
+
+
+def counter_name(endpoint, name, index):
+    return f'profile:{endpoint}:{name}:{index}'
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+        self.pending = {}
+        self.flushed_at = time.monotonic()
+
+    def record(self, endpoint, values):
+        with self.lock:
+            for name, value in values.items():
+                if value is not None:
+                    observe(self.series, endpoint, name, value)
+                    observe(self.pending, endpoint, name, value)
+            due = time.monotonic() - self.flushed_at >= settings.PROFILING_FLUSH_INTERVAL
+        if due and settings.PROFILING_STORE == 'cache':
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.flushed_at = time.monotonic()
+        if not pending:
+            return
+        registered = set(cache.get(ENDPOINTS_KEY) or ())
+        endpoints = {endpoint for endpoint, _ in pending}
+        if endpoints - registered:
+            # A concurrent flush may drop a name; the next flush restores it
+            cache.set(ENDPOINTS_KEY, sorted(registered | endpoints), None)
+        for (endpoint, name), row in pending.items():
+            for index, value in enumerate(row):
+                if value:
+                    counters.incr(counter_name(endpoint, name, index), value)
+
+    def snapshot(self):
+        """Every endpoint's histograms: this process's, or all workers' with PROFILING_STORE = 'cache'."""
+        if settings.PROFILING_STORE != 'cache':
+            with self.lock:
+                return {key: list(row) for key, row in self.series.items()}
+        self.flush()
+        endpoints = cache.get(ENDPOINTS_KEY) or ()
+        names = {
+            (endpoint, name): [counter_name(endpoint, name, index) for index in range(len(buckets) + 3)]
+            for endpoint in endpoints for name, (_, buckets, _) in HISTOGRAMS.items()
+        }
+        values = counters.read(*(counter for row in names.values() for counter in row))
+        return {
+            key: [values[counter] for counter in row]
+            for key, row in names.items() if values[row[-1]]
+        }
+
+
+recorder = Recorder()
+
+
+def quantile(q, row, buckets):
+    """Estimate the ``q`` quantile from bucket counts as Prometheus' histogram_quantile() does."""
+    rank = q * row[-1]
+    cumulative = 0
+    for index, count in enumerate(row[:len(buckets) + 1]):
+        if count and cumulative + count >= rank:
+            if index == len(buckets):
+                return buckets[-1]
+            lower = buckets[index - 1] if index else 0
+            return lower + (buckets[index] - lower) * (rank - cumulative) / count
+        cumulative += count
+    return None
+
+
+def prometheus_text(series):
+    lines = []
+    for name, (help_text, buckets, scale) in HISTOGRAMS.items():
+        metric = METRIC_PREFIX + name
+        rows = sorted((endpoint, row) for (endpoint, row_name), row in series.items() if row_name == name)
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+        for endpoint, row in rows:
+            method, view = endpoint.split(':', 1)
+            labels = f'method="{method}",view="{view}"'
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), row):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{{labels}}} {row[-2] / scale:g}')
+            lines.append(f'{metric}_count{{{labels}}} {row[-1]}')
+        lines += [
+            f'# HELP {metric}_quantile {help_text} Percentiles estimated from the buckets.',
+            f'# TYPE {metric}_quantile gauge',
+        ]
+        for endpoint, row in rows:
+            method, view = endpoint.split(':', 1)
+            for q in QUANTILES:
+                lines.append(
+                    f'{metric}_quantile{{method="{method}",view="{view}",quantile="{q}"}} {quantile(q, row, buckets):g}'
+                )
+    return '\n'.join(lines) + '\n'
+
+
+def sampled():
+    rate = settings.PROFILING_SAMPLE_RATE
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def finish(request, response, profile):
+    total = time.perf_counter() - profile.started
+    size = None if response.streaming else len(response.content)
+    response['Server-Timing'] = (
+        f'db;dur={profile.db * 1000:.1f};desc="{profile.queries} queries", '
+        f'serialize;dur={profile.serialize * 1000:.1f}, total;dur={total * 1000:.1f}'
+    )
+    match = getattr(request, 'resolver_match', None)
+    recorder.record(f'{request.method}:{match.view_name if match else "unresolved"}', {
+        'request_duration_seconds': total,
+        'db_duration_seconds': profile.db,
+        'serialize_duration_seconds': profile.serialize,
+        'db_queries': profile.queries,
+        # Streamed bodies are sent after the middleware returns
+        'response_bytes': size,
+    })
+    return response
+
+
+class ProfilingMiddleware:
+    """Place first in MIDDLEWARE so the total covers the other middleware too."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not sampled():
+            return self.get_response(request)
+        # Connections opened before this module was imported missed the signal
+        for connection in connections.all(initialized_only=True):
+            install(connection)
+        profile = Profile(time.perf_counter())
+        token = current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not sampled():
+            return await self.get_response(request)
+        profile = Profile(time.perf_counter())
+        token = current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        return await sync_to_async(finish)(request, response, profile)
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data if isinstance(data, str) else str(data)
+
+
+class MetricsView(APIView):
+    """
+    ``GET /api/metrics/``: the profiling histograms, and the connection pool
+    figures of the answering process, for a Prometheus scrape job (admin token).
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request):
+        return Response(prometheus_text(recorder.snapshot()) + pool.prometheus_text(METRIC_PREFIX))
@@ -0,0 +1,92 @@
+"""
+Read replicas.
+
+ReplicaRouter sends reads to a random alias of DATABASE_REPLICAS while
+replica reads are switched on for the current context, and sends every
+write, and every other read, to the primary. Two things switch them on:
+
+- ReplicaReadMixin, for safe-method requests to a viewset. A user who sent
+  an unsafe request is pinned to the primary for REPLICA_PIN_SECONDS, so
+  they read their own writes even while the replicas lag.
+- ReplicaReadTask, for Celery tasks that only read (reports), and
+  read_from_replica() for any other block of code.
+
+The switch is a context variable, so it follows a request through
+sync_to_async() hops and never leaks into the next request on a thread.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from celery import Task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = 'replicas:pin:{}'
+
+reading_replica = contextvars.ContextVar('reading_replica', default=False)
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    token = reading_replica.set(enabled)
+    try:
+        yield
+    finally:
+        reading_replica.reset(token)
+
+
+def pin_to_primary(user):
+    cache.set(PIN_KEY.format(user.pk), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    return cache.get(PIN_KEY.format(user.pk), False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and reading_replica.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Also for objects that were read from a replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Viewset mixin: safe-method requests read from the replicas unless the
+    user is pinned to the primary; unsafe ones pin the user. Authentication
+    and permission checks always read the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not settings.DATABASE_REPLICAS or not request.user.is_authenticated:
+            return
+        if request.method in SAFE_METHODS:
+            reading_replica.set(not is_pinned(request.user))
+        else:
+            pin_to_primary(request.user)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        reading_replica.set(False)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaReadTask(Task):
+    """Base for Celery tasks that only read: ``@shared_task(base=ReplicaReadTask)``."""
+
+    def __call__(self, *args, **kwargs):
+        with read_from_replica():
+            return super().__call__(*args, **kwargs)
@@ -38,6 +38,7 @@ load_dotenv()
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -47,11 +48,13 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     'django_filters',
+    'channels',
     'users',
     'projects',
 ]
 
 MIDDLEWARE = [
+    'company_sys_backend.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -80,46 +83,186 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'company_sys_backend.wsgi.application'
+ASGI_APPLICATION = 'company_sys_backend.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
 if os.environ.get('DB_HOST'):
+    # Each worker process keeps up to DB_POOL_SIZE connections open and hands
+    # them to requests and Celery tasks in turn (company_sys_backend.db.pool).
+    # With DB_POOL_SIZE = 0, connections persist in their thread for
+    # DB_CONN_MAX_AGE seconds instead.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '10'))
+    DB_POOL = {
+        'max_size': DB_POOL_SIZE,
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        'check_after': float(os.environ.get('DB_POOL_CHECK_AFTER', '5')),
+        'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+        'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800')),
+    }
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.mysql',
+            'ENGINE': 'company_sys_backend.db.mysql' if DB_POOL_SIZE else 'django.db.backends.mysql',
             'NAME': os.environ.get('DB_NAME', 'company_sys'),
             'USER': os.environ.get('DB_USER', 'root'),
             'PASSWORD': os.environ.get('DB_PASS', 'rootpassword'),
             'HOST': os.environ.get('DB_HOST', 'localhost'),
             'PORT': os.environ.get('DB_PORT', '3306'),
+            'CONN_MAX_AGE': 0 if DB_POOL_SIZE else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'pool': DB_POOL} if DB_POOL_SIZE else {},
         }
     }
+    # Read replicas as comma-separated host[:port], with the primary's credentials
+    for index, replica in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+        host, _, port = replica.strip().partition(':')
+        DATABASES[f'replica_{index}'] = {
+            **DATABASES['default'],
+            'HOST': host,
+            'PORT': port or DATABASES['default']['PORT'],
+            'TEST': {'MIRROR': 'default'},
+        }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
-        }
+        },
     }
 
+# Safe-method reads of the projects and users APIs, and ReplicaReadTask
+# tasks, go to the replicas (company_sys_backend.replicas). A user who wrote
+# reads from the primary for the next REPLICA_PIN_SECONDS, which must exceed
+# the replication lag.
+DATABASE_ROUTERS = ['company_sys_backend.replicas.ReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '5'))
+
 AUTH_USER_MODEL = 'users.User'
 
+# Cache
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', '300'))
+
+# WebSocket channel layer
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [REDIS_URL]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        }
+    }
+
 # Celery
 CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
+CELERY_BEAT_SCHEDULE = {
+    'sweep-due-date-reminders': {
+        'task': 'projects.tasks.sweep_due_date_reminders',
+        'schedule': float(os.environ.get('REMINDER_SWEEP_INTERVAL', '900')),
+    },
+    'apply-retention': {
+        'task': 'projects.tasks.apply_retention',
+        'schedule': float(os.environ.get('RETENTION_INTERVAL', '86400')),
+    },
+    'refresh-overdue-rollups': {
+        'task': 'projects.tasks.refresh_overdue_rollups',
+        'schedule': float(os.environ.get('ROLLUP_OVERDUE_INTERVAL', '3600')),
+    },
+}
+
+# Email: digests go out over one connection per sweep, in batches
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'no-reply@companysys.local')
+
+# Retention: rows older than these ages leave the hot tables (see apply_retention)
+RETENTION_NOTIFICATION_DAYS = int(os.environ.get('RETENTION_NOTIFICATION_DAYS', '90'))
+RETENTION_ACTIVITY_LOG_DAYS = int(os.environ.get('RETENTION_ACTIVITY_LOG_DAYS', '365'))
+# 'table' copies into the Archived* tables, 'jsonl' appends to RETENTION_ARCHIVE_DIR
+RETENTION_TARGET = os.environ.get('RETENTION_TARGET', 'table')
+RETENTION_ARCHIVE_DIR = os.environ.get('RETENTION_ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+RETENTION_BATCH_SIZE = int(os.environ.get('RETENTION_BATCH_SIZE', '1000'))
+
+# Due-date reminder sweep
+REMINDER_SWEEP_CHUNK_SIZE = int(os.environ.get('REMINDER_SWEEP_CHUNK_SIZE', '2000'))
+REMINDER_EMAIL_BATCH_SIZE = int(os.environ.get('REMINDER_EMAIL_BATCH_SIZE', '100'))
+
+# Activity log writer: 'celery', 'sync' or 'thread' (buffered in-process,
+# best effort; see projects.activity)
+ACTIVITY_LOG_BACKEND = os.environ.get('ACTIVITY_LOG_BACKEND', 'celery' if REDIS_URL else 'sync')
+ACTIVITY_LOG_BATCH_SIZE = int(os.environ.get('ACTIVITY_LOG_BATCH_SIZE', '100'))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_LOG_FLUSH_INTERVAL', '1.0'))
+ACTIVITY_LOG_BUFFER_MAX = int(os.environ.get('ACTIVITY_LOG_BUFFER_MAX', '10000'))
+
+# Notification fan-out
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', '1000'))
+NOTIFICATION_COALESCE_SECONDS = int(os.environ.get('NOTIFICATION_COALESCE_SECONDS', '60'))
+
+# Request profiling (see company_sys_backend.profiling): the share of requests
+# measured, and where histograms are aggregated ('cache' shares them between
+# workers through Redis, 'memory' keeps them per process)
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '1.0' if DEBUG else '0.01'))
+PROFILING_STORE = os.environ.get('PROFILING_STORE', 'cache')
+PROFILING_FLUSH_INTERVAL = float(os.environ.get('PROFILING_FLUSH_INTERVAL', '10'))
+
+# Authentication (see users.authentication): accounts are cached for
+# AUTH_USER_CACHE_LOCAL_TTL seconds in each process, which bounds how long
+# another process accepts tokens of a deactivated user
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', '10000'))
+AUTH_USER_CACHE_LOCAL_TTL = float(os.environ.get('AUTH_USER_CACHE_LOCAL_TTL', '10'))
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', '300'))
+
+# Serve GET list/retrieve of projects, tasks, notifications and activity logs
+# from async views under ASGI (see company_sys_backend.asyncviews)
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', '1') == '1'
 
 # REST Framework
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', '100'))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', '1000'))
+TASK_BULK_UPDATE_MAX = int(os.environ.get('TASK_BULK_UPDATE_MAX', '500'))
+# Streaming exports: rows fetched per keyset query
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', '2000'))
+# Bulk imports: rows validated and inserted per transaction, uploads up to
+# IMPORT_INLINE_MAX_BYTES run in the request, larger ones as a Celery job
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+IMPORT_INLINE_MAX_BYTES = int(os.environ.get('IMPORT_INLINE_MAX_BYTES', str(1024 * 1024)))
+IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS', '1000'))
+IMPORT_UPLOAD_DIR = os.environ.get('IMPORT_UPLOAD_DIR', str(BASE_DIR / 'imports'))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
-    )
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'company_sys_backend.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': API_PAGE_SIZE,
 }
 
 
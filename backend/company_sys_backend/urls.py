@@ -18,9 +18,11 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenRefreshView
 from users.views import CustomTokenObtainPairView
+from company_sys_backend.profiling import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
     path('api/', include('projects.urls')),
     path('api/', include('users.urls')),
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
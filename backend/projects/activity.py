@@ -0,0 +1,180 @@
+"""
+Buffered ActivityLog writer.
+
+Views call log_activity() instead of ActivityLog.objects.create(). Entries are
+handed over only once the surrounding transaction commits, so a rolled back
+write never leaves a log row behind, and are then written with bulk_create by
+one of the backends selected with settings.ACTIVITY_LOG_BACKEND:
+
+``celery``  send the entries to the write_activity_logs task, so the request
+            only pays for a broker publish and the broker keeps them durable.
+            The default when REDIS_URL is set.
+``sync``    bulk_create right after commit, in the request thread. The
+            default otherwise.
+``thread``  queue in this process; a daemon thread flushes every
+            ACTIVITY_LOG_FLUSH_INTERVAL seconds or once ACTIVITY_LOG_BATCH_SIZE
+            entries are waiting, and once more at interpreter exit. Best
+            effort only: entries still queued when the worker is killed are
+            lost, and past ACTIVITY_LOG_BUFFER_MAX entries the oldest are
+            dropped.
+
+A batch that the database rejects is retried row by row, and rows that are
+invalid on their own (DataError, IntegrityError) are logged and dropped, so
+one bad entry cannot hold back the others. Other errors, such as a lost
+connection, propagate.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+
+def log_activity(user, action, target_type, target_id=None):
+    log_activities(user, [(action, target_type, target_id)])
+
+
+def log_activities(user, items):
+    """Queue one ActivityLog per ``(action, target_type, target_id)`` item."""
+    now = timezone.now()
+    user_id = getattr(user, 'pk', None)
+    # Actions embed user-supplied titles; keep them within the column
+    max_length = ActivityLog._meta.get_field('action').max_length
+    entries = [
+        {
+            'user_id': user_id, 'action': action[:max_length], 'target_type': target_type,
+            'target_id': target_id, 'created_at': now,
+        }
+        for action, target_type, target_id in items
+    ]
+    if entries:
+        transaction.on_commit(lambda: dispatch(entries))
+
+
+def dispatch(entries):
+    backend = settings.ACTIVITY_LOG_BACKEND
+    if backend == 'thread':
+        buffer.add(entries)
+        return
+    if backend == 'celery':
+        from .tasks import write_activity_logs
+        try:
+            write_activity_logs.delay([serialize(entry) for entry in entries])
+            return
+        except Exception:
+            logger.exception('Could not enqueue %d activity log entries; writing them inline', len(entries))
+    write_entries(entries)
+
+
+def write_entries(entries):
+    """Write the entries and return how many were written."""
+    try:
+        with transaction.atomic():
+            ActivityLog.objects.bulk_create(
+                [ActivityLog(**entry) for entry in entries],
+                batch_size=settings.ACTIVITY_LOG_BATCH_SIZE,
+            )
+        return len(entries)
+    except (DataError, IntegrityError):
+        pass
+    written = 0
+    for entry in entries:
+        try:
+            with transaction.atomic():
+                ActivityLog.objects.create(**entry)
+            written += 1
+        except (DataError, IntegrityError):
+            logger.exception('Dropping an activity log entry the database rejects: %r', entry)
+    return written
+
+
+def serialize(entry):
+    return {**entry, 'created_at': entry['created_at'].isoformat()}
+
+
+def deserialize(entry):
+    return {**entry, 'created_at': parse_datetime(entry['created_at'])}
+
+
+class ActivityLogBuffer:
+    def __init__(self):
+        self._entries = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, entries):
+        with self._lock:
+            self._entries.extend(entries)
+            self._trim()
+            full = len(self._entries) >= settings.ACTIVITY_LOG_BATCH_SIZE
+        self._ensure_flusher()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if not entries:
+            return 0
+        try:
+            return write_entries(entries)
+        except Exception:
+            # The database is unreachable: put the batch back so the next flush retries it
+            with self._lock:
+                self._entries[:0] = entries
+                self._trim()
+            raise
+
+    def _trim(self):
+        # Called with the lock held: bound memory while the database is away
+        excess = len(self._entries) - settings.ACTIVITY_LOG_BUFFER_MAX
+        if excess > 0:
+            del self._entries[:excess]
+            logger.error('Activity log buffer full; dropped the %d oldest entries', excess)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _ensure_flusher(self):
+        # A forked worker inherits the buffer but not the thread
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='activity-log-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.ACTIVITY_LOG_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Activity log flush failed; %d entries kept for retry', len(self))
+            finally:
+                close_old_connections()
+
+
+buffer = ActivityLogBuffer()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        buffer.flush()
+    except Exception:
+        logger.exception('Dropping %d activity log entries at exit', len(buffer))
@@ -1,7 +1,10 @@
 from django.contrib import admin
-from .models import Project, Task, AssetLink, Notification
+from .models import Project, ProjectMembership, Task, AssetLink, Notification, DueDateReminder, ImportJob
 
 admin.site.register(Project)
 admin.site.register(Task)
+admin.site.register(ProjectMembership)
 admin.site.register(AssetLink)
 admin.site.register(Notification)
+admin.site.register(DueDateReminder)
+admin.site.register(ImportJob)
@@ -0,0 +1,327 @@
+"""
+In-process API benchmarks.
+
+Each flow replays one of the main user journeys through the DRF test client,
+with no web server or network involved, so the numbers reflect the
+application and the database alone. Every request's latency and SQL query
+count are recorded, and run() returns a JSON-serializable report:
+
+    {"meta": {...},
+     "flows": {"dashboard": {"requests": 300, "errors": 0, "rps": 412.3,
+                             "latency_ms": {"p50": 2.1, "p99": 6.8, "mean": 2.4, "max": 9.0},
+                             "queries": {"mean": 4.0, "max": 6}}, ...}}
+
+Requests are issued one at a time by a single client, so ``rps`` is the
+throughput of one worker.
+
+run_concurrent() measures concurrent throughput instead. It calls the ASGI
+application directly, as an ASGI server would, with a number of connections
+issuing read requests at once. It does this twice, once with the sync views
+(ASYNC_READ_VIEWS off) and once with the async ones.
+"""
+import asyncio
+import math
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import User
+from users.views import CustomTokenObtainPairSerializer
+from .models import ActivityLog, Notification, Project, Task, TaskComment
+
+
+@dataclass
+class Actors:
+    """Who the flows act as: a sample of users of each role, and tasks per developer."""
+    pms: list
+    devs: list
+    executives: list
+    tasks: dict
+
+    @classmethod
+    def load(cls, rng, per_role=50):
+        def sample(users):
+            users = list(users)
+            return rng.sample(users, min(per_role, len(users)))
+
+        pms = sample(User.objects.filter(role=User.Role.PM, managed_projects__isnull=False).distinct().order_by('id'))
+        devs = sample(User.objects.filter(role=User.Role.DEVELOPER, assigned_tasks__isnull=False).distinct().order_by('id'))
+        executives = sample(User.objects.filter(role__in=[User.Role.ADMIN, User.Role.CEO]).order_by('id'))
+        tasks = {}
+        for task_id, dev_id in Task.objects.filter(assigned_to__in=devs).values_list('id', 'assigned_to_id').order_by('id'):
+            tasks.setdefault(dev_id, []).append(task_id)
+        return cls(pms, devs, executives, tasks)
+
+
+def dashboard(rng, actors):
+    user = rng.choice(actors.pms + actors.devs + actors.executives)
+    return user, [
+        ('get', '/api/projects/', None),
+        ('get', '/api/tasks/stats/', None),
+        ('get', '/api/notifications/unread-count/', None),
+    ]
+
+
+def kanban_move(rng, actors):
+    dev = rng.choice(actors.devs)
+    task_id = rng.choice(actors.tasks[dev.id])
+    return dev, [('patch', f'/api/tasks/{task_id}/', {'status': rng.choice(Task.Status.values)})]
+
+
+def comment_post(rng, actors):
+    dev = rng.choice(actors.devs)
+    task_id = rng.choice(actors.tasks[dev.id])
+    return dev, [
+        ('post', '/api/task-comments/', {'task': task_id, 'content': 'Benchmark comment'}),
+        ('get', f'/api/task-comments/?task={task_id}', None),
+    ]
+
+
+def notification_list(rng, actors):
+    user = rng.choice(actors.pms + actors.devs + actors.executives)
+    return user, [
+        ('get', '/api/notifications/', None),
+        ('get', '/api/notifications/unread-count/', None),
+    ]
+
+
+FLOWS = {
+    'dashboard': dashboard,
+    'kanban_move': kanban_move,
+    'comment_post': comment_post,
+    'notification_list': notification_list,
+}
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+def run_flow(flow, actors, rng, iterations, warmup):
+    client = APIClient()
+    counter = QueryCounter()
+    latencies, queries, errors = [], [], 0
+    # Every flow starts from a cold response cache
+    cache.clear()
+    with connection.execute_wrapper(counter):
+        for iteration in range(warmup + iterations):
+            user, requests = flow(rng, actors)
+            client.force_authenticate(user)
+            for method, path, data in requests:
+                counter.count = 0
+                start = time.perf_counter()
+                if method == 'get':
+                    response = client.get(path)
+                else:
+                    response = getattr(client, method)(path, data, format='json')
+                elapsed = time.perf_counter() - start
+                if iteration < warmup:
+                    continue
+                latencies.append(elapsed * 1000)
+                queries.append(counter.count)
+                errors += response.status_code >= 400
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / (sum(latencies) / 1000), 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'max': round(max(latencies), 3),
+        },
+        'queries': {
+            'mean': round(sum(queries) / len(queries), 2),
+            'max': max(queries),
+        },
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def run(flows=None, iterations=100, warmup=10, seed=42):
+    """Run ``flows`` (names from FLOWS, all by default) and return the report."""
+    rng = random.Random(seed)
+    actors = Actors.load(rng)
+    if not actors.devs or not actors.pms:
+        raise ValueError('The database needs PMs with projects and developers with tasks; run generate_dataset.')
+
+    report = {
+        'meta': {
+            'started_at': timezone.now().isoformat(),
+            'git_commit': git_commit(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'seed': seed,
+            'iterations': iterations,
+            'warmup': warmup,
+            'dataset': {
+                model._meta.label: model.objects.count()
+                for model in (User, Project, Task, TaskComment, Notification, ActivityLog)
+            },
+        },
+        'flows': {},
+    }
+    for name in flows or FLOWS:
+        report['flows'][name] = run_flow(FLOWS[name], actors, rng, iterations, warmup)
+    return report
+
+
+def read_requests(rng, actors, count):
+    """``count`` (path, access token) pairs over the async-capable read endpoints."""
+    users = actors.pms + actors.devs + actors.executives
+    tokens = {user.id: str(CustomTokenObtainPairSerializer.get_token(user).access_token) for user in users}
+    task_ids = [task_id for ids in actors.tasks.values() for task_id in ids]
+    requests = []
+    for _ in range(count):
+        user = rng.choice(users)
+        # Varying page sizes make most project and task reads miss the response cache
+        page_size = rng.randrange(20, 101)
+        paths = [
+            f'/api/projects/?page_size={page_size}',
+            f'/api/tasks/?page_size={page_size}',
+            f'/api/notifications/?page_size={page_size}',
+            f'/api/activity-logs/?page_size={page_size}',
+        ]
+        if user.role == User.Role.DEVELOPER:
+            paths.append(f'/api/tasks/{rng.choice(actors.tasks[user.id])}/')
+        elif user.role != User.Role.PM:
+            paths.append(f'/api/tasks/{rng.choice(task_ids)}/')
+        requests.append((rng.choice(paths), tokens[user.id]))
+    return requests
+
+
+async def asgi_get(application, path, token):
+    """Send one GET through ``application`` and return the response status."""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+        'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode())],
+    }
+    pending = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    finished = asyncio.Event()
+    status = []
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            finished.set()
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+async def drive(application, requests, concurrency):
+    pending = iter(requests)
+    latencies, errors = [], 0
+
+    async def connection_loop():
+        nonlocal errors
+        # Each connection sends its next request once the previous one is answered
+        for path, token in pending:
+            start = time.perf_counter()
+            status = await asgi_get(application, path, token)
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += status >= 400
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connection_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(max(latencies), 3),
+        },
+    }
+
+
+def run_concurrent(levels=(1, 10, 50), requests=500, warmup=20, seed=42):
+    """Read throughput of the sync and async views at each concurrency level."""
+    from company_sys_backend.asgi import application
+
+    rng = random.Random(seed)
+    actors = Actors.load(rng)
+    if not actors.devs or not actors.pms:
+        raise ValueError('The database needs PMs with projects and developers with tasks; run generate_dataset.')
+    batches = read_requests(rng, actors, warmup + requests)
+    results = {}
+    for concurrency in levels:
+        results[str(concurrency)] = {}
+        for mode in ('sync', 'async'):
+            cache.clear()
+            with override_settings(ASYNC_READ_VIEWS=mode == 'async'):
+                asyncio.run(drive(application, batches[:warmup], concurrency))
+                results[str(concurrency)][mode] = asyncio.run(drive(application, batches[warmup:], concurrency))
+    return results
+
+
+def compare(baseline, report):
+    """Lines describing how each flow in ``report`` moved against ``baseline``."""
+    def change(before, after):
+        return f'{(after - before) / before * 100:+.1f}%' if before else 'n/a'
+
+    lines = []
+    for name, result in report['flows'].items():
+        before = baseline.get('flows', {}).get(name)
+        if not before:
+            lines.append(f'{name}: not in the baseline')
+            continue
+        lines.append(
+            f'{name}: rps {before["rps"]} -> {result["rps"]} ({change(before["rps"], result["rps"])}), '
+            f'p99 {before["latency_ms"]["p99"]} -> {result["latency_ms"]["p99"]} ms '
+            f'({change(before["latency_ms"]["p99"], result["latency_ms"]["p99"])}), '
+            f'queries {before["queries"]["mean"]} -> {result["queries"]["mean"]}'
+        )
+    for level, modes in report.get('concurrency', {}).items():
+        for mode, result in modes.items():
+            before = baseline.get('concurrency', {}).get(level, {}).get(mode)
+            if before:
+                lines.append(
+                    f'{mode} x{level}: rps {before["rps"]} -> {result["rps"]} ({change(before["rps"], result["rps"])}), '
+                    f'p99 {before["latency_ms"]["p99"]} -> {result["latency_ms"]["p99"]} ms'
+                )
+    return lines
@@ -0,0 +1,157 @@
+"""
+Response cache for project and task reads.
+
+Cache keys embed a version number per visibility scope: ``all`` for ADMIN and
+CEO users, ``pm:<id>`` and ``dev:<id>`` for the role-scoped querysets. Model
+signals (see signals.py) bump the version of every scope that can see a
+changed row, so cached responses are replaced as soon as anything they contain
+changes instead of when a TTL runs out. API_CACHE_TIMEOUT only bounds how long
+unused entries linger.
+
+Versions are the wall clock time of the last change in nanoseconds, which
+makes them unique and doubles as the Last-Modified time for conditional GETs.
+A miss in a scope that changed within REPLICA_PIN_SECONDS is served from the
+primary, as a lagging replica could still return the rows from before the
+change.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from company_sys_backend import metrics as counters
+from company_sys_backend.replicas import reading_replica
+from .models import Project, ProjectMembership
+
+VERSION_KEY = 'api-cache:version:{}'
+
+
+def scope_for(user):
+    role = getattr(user, 'role', None)
+    if role == 'PM':
+        return f'pm:{user.pk}'
+    if role == 'DEV':
+        return f'dev:{user.pk}'
+    return 'all'
+
+
+def get_version(scope):
+    key = VERSION_KEY.format(scope)
+    version = cache.get(key)
+    if version is None:
+        # An evicted version restarts from the clock, so it never repeats
+        version = time.time_ns()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump(scopes):
+    version = time.time_ns()
+    cache.set_many({VERSION_KEY.format(scope): version for scope in scopes}, None)
+
+
+def settled(scope):
+    """Whether the scope last changed long enough ago for the read replicas to have caught up."""
+    return time.time_ns() - get_version(scope) > settings.REPLICA_PIN_SECONDS * 1_000_000_000
+
+
+def invalidate(scopes):
+    """
+    Bump now, and again once the transaction commits, so a response cached
+    from the old rows between the write and the commit cannot outlive it.
+    """
+    scopes = set(scopes)
+    if scopes:
+        bump(scopes)
+        transaction.on_commit(lambda: bump(scopes))
+
+
+def scopes_for_projects(project_ids, user_ids=()):
+    """
+    Every scope that can see the given projects: everyone in ``all``, their
+    PMs, and every developer with a task in them (a developer's project list
+    embeds all tasks of the project). ``user_ids`` adds developers or PMs who
+    may just have lost access, such as a task's previous assignee.
+    """
+    project_ids = {pk for pk in project_ids if pk is not None}
+    scopes = {'all'}
+    if project_ids:
+        pm_ids = Project.objects.filter(id__in=project_ids).exclude(pm=None).values_list('pm_id', flat=True)
+        dev_ids = ProjectMembership.objects.filter(project_id__in=project_ids).values_list('user_id', flat=True)
+        scopes.update(f'pm:{pk}' for pk in pm_ids)
+        scopes.update(f'dev:{pk}' for pk in dev_ids)
+    for pk in user_ids:
+        if pk is not None:
+            scopes.update((f'pm:{pk}', f'dev:{pk}'))
+    return scopes
+
+
+def metrics():
+    values = counters.read('api_cache_hits', 'api_cache_misses')
+    hits, misses = values['api_cache_hits'], values['api_cache_misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
+
+
+class CachedResponseMixin:
+    """Serves list/retrieve from the cache, keyed per visibility scope."""
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(super().aretrieve, request, *args, **kwargs)
+
+    def get_validators(self, request):
+        version = get_version(scope_for(request.user))
+        return version, datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc)
+
+    def get_cache_key(self, request):
+        scope = scope_for(request.user)
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        return f'api-cache:{self.basename}:{scope}:{get_version(scope)}:{url}'
+
+    def cache_lookup(self, request):
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        counters.incr('api_cache_misses' if data is None else 'api_cache_hits')
+        if data is None and reading_replica.get() and not settled(scope_for(request.user)):
+            # The response will be cached under the new version: build it from the primary
+            reading_replica.set(False)
+        return key, data
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key, data = self.cache_lookup(request)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        key, data = await sync_to_async(self.cache_lookup)(request)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            await cache.aset(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,54 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .models import Project
+from .realtime import user_group, project_group
+
+
+class LiveUpdatesConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Pushes notification and task events to the connected user.
+
+    Clients send ``{"action": "subscribe", "project": <id>}`` (or
+    ``unsubscribe``) to follow task changes of a project they can see.
+    """
+
+    async def connect(self):
+        self.user = self.scope.get('user')
+        if not getattr(self.user, 'is_authenticated', False):
+            await self.close(code=4401)
+            return
+        self.groups_joined = {user_group(self.user.pk)}
+        await self.channel_layer.group_add(user_group(self.user.pk), self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        for group in getattr(self, 'groups_joined', ()):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        action, project_id = content.get('action'), content.get('project')
+        if action not in ('subscribe', 'unsubscribe') or not isinstance(project_id, int):
+            await self.send_json({'error': 'Expected {"action": "subscribe"|"unsubscribe", "project": <id>}.'})
+            return
+
+        group = project_group(project_id)
+        if action == 'unsubscribe':
+            self.groups_joined.discard(group)
+            await self.channel_layer.group_discard(group, self.channel_name)
+            await self.send_json({'event': 'unsubscribed', 'project': project_id})
+            return
+
+        if not await self.can_see_project(project_id):
+            await self.send_json({'error': 'Project not found.', 'project': project_id})
+            return
+        self.groups_joined.add(group)
+        await self.channel_layer.group_add(group, self.channel_name)
+        await self.send_json({'event': 'subscribed', 'project': project_id})
+
+    async def live_event(self, event):
+        await self.send_json(event['payload'])
+
+    @database_sync_to_async
+    def can_see_project(self, project_id):
+        return Project.objects.visible_to(self.user).filter(id=project_id).exists()
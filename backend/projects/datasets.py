@@ -0,0 +1,131 @@
+"""
+Synthetic datasets for benchmarks and load tests.
+
+generate() bulk-inserts users, projects, tasks, comments, notifications and
+activity logs in batched transactions. The same seed always produces the
+same shape of data (due dates are relative to today). Bulk inserts skip
+post_save, so the derived state is brought up to date explicitly: project
+memberships and the search index through the bulk-created signals, and the
+unread notification counters through User.adjust_unread_notifications().
+"""
+import datetime
+import random
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import User
+from . import search
+from .imports import bulk_insert
+from .models import ActivityLog, Notification, Project, Task, TaskComment
+from .signals import projects_bulk_created, tasks_bulk_created
+
+SPRINTS = [f'Sprint {i}' for i in range(1, 21)]
+STATUS_WEIGHTS = {Task.Status.TODO: 4, Task.Status.IN_PROGRESS: 3, Task.Status.REVIEW: 1, Task.Status.DONE: 4}
+
+
+def chunks(count, size):
+    for offset in range(0, count, size):
+        yield offset, min(size, count - offset)
+
+
+def generate(pms=5, devs=50, projects=20, tasks=2000, comments=4000, notifications=5000, activity_logs=10000,
+             seed=42, batch_size=2000, prefix='bench', log=None):
+    """
+    Create the given number of rows of each kind, plus one admin and one CEO,
+    with usernames starting ``<prefix>_``. Returns the counts created.
+    ``log``, if given, is called with a progress line after every batch.
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    today = timezone.localdate()
+
+    with transaction.atomic():
+        # No passwords: benchmarks authenticate with force_authenticate()
+        users = bulk_insert(User, [
+            User(username=f'{prefix}_admin', role=User.Role.ADMIN),
+            User(username=f'{prefix}_ceo', role=User.Role.CEO),
+            *(User(username=f'{prefix}_pm_{i}', role=User.Role.PM) for i in range(pms)),
+            *(User(username=f'{prefix}_dev_{i}', role=User.Role.DEVELOPER) for i in range(devs)),
+        ])
+        pm_users = [user for user in users if user.role == User.Role.PM]
+        dev_users = [user for user in users if user.role == User.Role.DEVELOPER]
+        project_objs = bulk_insert(Project, [
+            Project(
+                name=f'{prefix.title()} project {i}',
+                description=f'Synthetic project {i} for load testing.',
+                start_date=today - datetime.timedelta(days=rng.randrange(365)),
+                pm=rng.choice(pm_users) if pm_users else None,
+            )
+            for i in range(projects)
+        ])
+        projects_bulk_created.send(sender=Project, projects=project_objs)
+    log(f'{len(users)} users, {len(project_objs)} projects')
+
+    task_ids = []
+    statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    for offset, size in chunks(tasks if project_objs else 0, batch_size):
+        with transaction.atomic():
+            batch = bulk_insert(Task, [
+                Task(
+                    project=rng.choice(project_objs),
+                    title=f'Task {offset + i}',
+                    description=f'Synthetic task {offset + i}.',
+                    # One in ten is unassigned
+                    assigned_to=rng.choice(dev_users) if dev_users and rng.random() > 0.1 else None,
+                    status=rng.choices(statuses, weights)[0],
+                    priority=rng.choice(Task.Priority.values),
+                    sprint=rng.choice(SPRINTS),
+                    due_date=today + datetime.timedelta(days=rng.randrange(-30, 60)) if rng.random() > 0.2 else None,
+                )
+                for i in range(size)
+            ])
+            tasks_bulk_created.send(sender=Task, tasks=batch)
+        task_ids.extend(task.id for task in batch)
+        log(f'{offset + size} tasks')
+
+    authors = pm_users + dev_users
+    for offset, size in chunks(comments if task_ids and authors else 0, batch_size):
+        with transaction.atomic():
+            batch = bulk_insert(TaskComment, [
+                TaskComment(task_id=rng.choice(task_ids), user=rng.choice(authors), content=f'Comment {offset + i}.')
+                for i in range(size)
+            ])
+            # The search documents need each comment's project
+            project_ids = dict(Task.objects.filter(id__in={c.task_id for c in batch}).values_list('id', 'project_id'))
+            for comment in batch:
+                comment.task = Task(id=comment.task_id, project_id=project_ids[comment.task_id])
+            search.index(batch)
+        log(f'{offset + size} comments')
+
+    for offset, size in chunks(notifications if users else 0, batch_size):
+        with transaction.atomic():
+            batch = Notification.objects.bulk_create(
+                Notification(user=rng.choice(users), message=f'Notification {offset + i}', is_read=rng.random() < 0.7)
+                for i in range(size)
+            )
+            User.adjust_unread_notifications(Counter(n.user_id for n in batch if not n.is_read))
+        log(f'{offset + size} notifications')
+
+    for offset, size in chunks(activity_logs if users else 0, batch_size):
+        with transaction.atomic():
+            ActivityLog.objects.bulk_create(
+                ActivityLog(
+                    user=rng.choice(users),
+                    action=f'Updated Task: Task {offset + i}',
+                    target_type='Task',
+                    target_id=rng.choice(task_ids) if task_ids else None,
+                )
+                for i in range(size)
+            )
+        log(f'{offset + size} activity logs')
+
+    return {
+        'users': len(users),
+        'projects': len(project_objs),
+        'tasks': len(task_ids),
+        'comments': comments if task_ids and authors else 0,
+        'notifications': notifications if users else 0,
+        'activity_logs': activity_logs if users else 0,
+    }
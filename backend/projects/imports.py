@@ -0,0 +1,262 @@
+"""
+Bulk import of projects and tasks from CSV, JSON Lines or JSON files.
+
+Rows are parsed as a stream (a JSON array, having no streaming parser in the
+standard library, is the exception and is read whole) and handled in batches
+of IMPORT_BATCH_SIZE. For every batch the importer:
+
+1. validates each row with TaskImportRowSerializer / ProjectImportRowSerializer,
+2. resolves the project names and usernames of the whole batch with one
+   query each,
+3. inserts the valid rows with one bulk_create in one transaction, then sends
+   tasks_bulk_created / projects_bulk_created (bulk_create skips post_save)
+   and queues one activity log batch.
+
+Invalid rows are reported by line and skipped; the rest of the file is still
+imported. A dry run does everything but the writes.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.models import User
+from .activity import log_activities
+from .models import ImportJob, Project, Task
+from .serializers import ProjectImportRowSerializer, TaskImportRowSerializer
+from .signals import projects_bulk_created, tasks_bulk_created
+
+
+def read_rows(file, format):
+    """
+    Yield ``(line, row, error)`` for every record of a binary ``file``:
+    ``row`` is a dict of strings, or None when the record could not be
+    parsed, in which case ``error`` says why.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        if format == ImportJob.Format.CSV:
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Cells past the header land under the None key
+                row.pop(None, None)
+                yield reader.line_num, row, None
+        elif format == ImportJob.Format.JSONL:
+            for line, record in enumerate(text, 1):
+                if record.strip():
+                    yield (line, *parse_record(record))
+        else:
+            try:
+                records = json.load(text)
+            except ValueError as exc:
+                yield 1, None, f'Invalid JSON: {exc}.'
+                return
+            if not isinstance(records, list):
+                yield 1, None, 'Expected a JSON array of objects.'
+                return
+            for number, record in enumerate(records, 1):
+                yield (number, record, None) if isinstance(record, dict) else (number, None, 'Expected an object.')
+    finally:
+        # Leave the underlying file open for its owner
+        text.detach()
+
+
+def parse_record(record):
+    try:
+        row = json.loads(record)
+    except ValueError as exc:
+        return None, f'Invalid JSON: {exc}.'
+    if not isinstance(row, dict):
+        return None, 'Expected an object.'
+    return row, None
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def bulk_insert(model, objs):
+    """
+    ``bulk_create`` that leaves primary keys set on every backend. MySQL does
+    not return ids from a multi-row INSERT, but a single such statement is an
+    InnoDB "simple insert" and gets consecutive auto-increment values starting
+    at LAST_INSERT_ID().
+    """
+    model.objects.bulk_create(objs, batch_size=len(objs))
+    if objs and objs[0].pk is None:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT LAST_INSERT_ID(), @@auto_increment_increment')
+            first, step = cursor.fetchone()
+        for offset, obj in enumerate(objs):
+            obj.pk = first + offset * step
+            obj._state.adding = False
+    return objs
+
+
+class Importer:
+    """
+    Imports rows from read_rows() for ``user``, who must be an admin or a PM;
+    a PM may only add tasks to their own projects and becomes the PM of
+    projects that name none. ``progress``, if given, is called with the
+    running report after every batch.
+    """
+    row_serializers = {
+        ImportJob.Kind.PROJECTS: ProjectImportRowSerializer,
+        ImportJob.Kind.TASKS: TaskImportRowSerializer,
+    }
+
+    def __init__(self, user, kind, batch_size=None, dry_run=False, progress=None):
+        self.user = user
+        self.kind = kind
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.dry_run = dry_run
+        self.progress = progress
+        self.report = {'processed': 0, 'imported': 0, 'failed': 0, 'errors': []}
+
+    def run(self, rows):
+        for batch in batches(rows, self.batch_size):
+            self.import_batch(batch)
+            if self.progress:
+                self.progress(self.report)
+        return self.report
+
+    def import_batch(self, batch):
+        self.batch_errors = []
+        valid = []
+        serializer_class = self.row_serializers[self.kind]
+        for line, row, error in batch:
+            if error:
+                self.fail(line, {'non_field_errors': [error]})
+                continue
+            # Empty CSV cells mean "not given", not an empty date or URL
+            serializer = serializer_class(data={key: value for key, value in row.items() if value not in ('', None)})
+            if serializer.is_valid():
+                valid.append((line, serializer.validated_data))
+            else:
+                self.fail(line, serializer.errors)
+
+        if self.kind == ImportJob.Kind.TASKS:
+            objs, log_items = self.build_tasks(valid)
+        else:
+            objs, log_items = self.build_projects(valid)
+
+        self.report['processed'] += len(batch)
+        self.report['failed'] += len(self.batch_errors)
+        room = settings.IMPORT_MAX_ERRORS - len(self.report['errors'])
+        self.report['errors'].extend(sorted(self.batch_errors, key=lambda error: error['line'])[:max(room, 0)])
+        if self.dry_run or not objs:
+            self.report['imported'] += len(objs)
+            return
+        model = Task if self.kind == ImportJob.Kind.TASKS else Project
+        with transaction.atomic():
+            bulk_insert(model, objs)
+            if model is Task:
+                tasks_bulk_created.send(sender=Task, tasks=objs)
+            else:
+                projects_bulk_created.send(sender=Project, projects=objs)
+            log_activities(self.user, [(action, model.__name__, obj.id) for obj, action in zip(objs, log_items)])
+        self.report['imported'] += len(objs)
+
+    def build_tasks(self, valid):
+        project_names = {data['project'] for _, data in valid}
+        projects = {}
+        for name, pk in Project.objects.visible_to(self.user).filter(name__in=project_names).values_list('name', 'id'):
+            projects.setdefault(name, set()).add(pk)
+        assignees = dict(
+            User.objects.filter(
+                username__in={data['assigned_to'] for _, data in valid if data['assigned_to']},
+                role=User.Role.DEVELOPER,
+            ).values_list('username', 'id')
+        )
+
+        objs, log_items = [], []
+        for line, data in valid:
+            errors = {}
+            project_ids = projects.get(data['project'], set())
+            if not project_ids:
+                errors['project'] = [f'No project named "{data["project"]}" visible to you.']
+            elif len(project_ids) > 1:
+                errors['project'] = [f'Several projects are named "{data["project"]}".']
+            assignee = data['assigned_to']
+            if assignee and assignee not in assignees:
+                errors['assigned_to'] = [f'No developer with username "{assignee}".']
+            if errors:
+                self.fail(line, errors)
+                continue
+            objs.append(Task(
+                project_id=next(iter(project_ids)),
+                title=data['title'],
+                description=data['description'],
+                status=data['status'],
+                priority=data['priority'],
+                sprint=data['sprint'],
+                due_date=data['due_date'],
+                assigned_to_id=assignees.get(assignee),
+                github_pr_url=data['github_pr_url'],
+            ))
+            log_items.append(f"Imported Task: {data['title']} under Project: {data['project']}")
+        return objs, log_items
+
+    def build_projects(self, valid):
+        pms = dict(
+            User.objects.filter(
+                username__in={data['pm'] for _, data in valid if data['pm']}, role=User.Role.PM,
+            ).values_list('username', 'id')
+        )
+        default_pm = self.user.id if self.user.role == User.Role.PM else None
+
+        objs, log_items = [], []
+        for line, data in valid:
+            pm = data['pm']
+            if pm and pm not in pms:
+                self.fail(line, {'pm': [f'No PM with username "{pm}".']})
+                continue
+            if default_pm and pm and pms[pm] != default_pm:
+                self.fail(line, {'pm': ['You can only import projects you manage.']})
+                continue
+            objs.append(Project(
+                name=data['name'],
+                description=data['description'],
+                start_date=data['start_date'],
+                end_date=data['end_date'],
+                pm_id=pms.get(pm, default_pm),
+            ))
+            log_items.append(f"Imported Project: {data['name']}")
+        return objs, log_items
+
+    def fail(self, line, errors):
+        self.batch_errors.append({'line': line, 'errors': errors})
+
+
+def run_job(job):
+    """Run ``job`` to completion, saving its counters after every batch."""
+    def progress(report):
+        job.rows_processed = report['processed']
+        job.rows_imported = report['imported']
+        job.rows_failed = report['failed']
+        job.errors = report['errors']
+        job.save(update_fields=['rows_processed', 'rows_imported', 'rows_failed', 'errors'])
+
+    job.status = ImportJob.Status.RUNNING
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+    importer = Importer(job.user, job.kind, dry_run=job.dry_run, progress=progress)
+    job.status = ImportJob.Status.FAILED
+    try:
+        with job.file.open('rb') as file:
+            importer.run(read_rows(file, job.format))
+        job.status = ImportJob.Status.DONE
+    except (UnicodeDecodeError, csv.Error) as exc:
+        # The file itself is unreadable past this point; batches before it stay imported
+        importer.report['errors'].append({'line': None, 'errors': {'file': [f'Could not read the file: {exc}.']}})
+    finally:
+        progress(importer.report)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'finished_at'])
+    return job
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.retention import POLICIES, archive_expired, table_sizes
+
+
+class Command(BaseCommand):
+    help = (
+        "Move Notification and ActivityLog rows older than RETENTION_NOTIFICATION_DAYS / "
+        "RETENTION_ACTIVITY_LOG_DAYS into archive tables or gzipped JSONL files, in chunked "
+        "transactions, and report table sizes before and after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=['table', 'jsonl'], help='Archive destination (default RETENTION_TARGET).')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction (default RETENTION_BATCH_SIZE).')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between chunks to spare the primary.')
+        parser.add_argument('--model', action='append', dest='models', help='Only these models, e.g. projects.ActivityLog.')
+        parser.add_argument('--dry-run', action='store_true', help='Count expired rows without moving them.')
+        parser.add_argument('--report-only', action='store_true', help='Only print table sizes.')
+
+    def handle(self, *args, **options):
+        policies = POLICIES
+        if options['models']:
+            policies = [policy for policy in POLICIES if policy.label in options['models']]
+            unknown = set(options['models']) - {policy.label for policy in policies}
+            if unknown:
+                raise CommandError(f'No retention policy for: {", ".join(sorted(unknown))}')
+
+        models = [model for policy in policies for model in (policy.model, policy.archive_model)]
+        before = table_sizes(models)
+        if options['report_only']:
+            self.report(before, None)
+            return
+
+        for policy in policies:
+            moved = archive_expired(
+                policy,
+                target=options['target'],
+                batch_size=options['batch_size'],
+                pause=options['pause'],
+                dry_run=options['dry_run'],
+            )
+            verb = 'would move' if options['dry_run'] else 'moved'
+            self.stdout.write(f'{policy.label}: {verb} {moved} rows older than {policy.days} days')
+
+        self.report(before, None if options['dry_run'] else table_sizes(models))
+
+    def report(self, before, after):
+        self.stdout.write(self.style.MIGRATE_HEADING('Table sizes'))
+        for table, size in before.items():
+            line = f'  {table:<36} {size["rows"]:>10} rows {self.format_bytes(size["bytes"]):>10}'
+            if after:
+                line += f'  ->  {after[table]["rows"]:>10} rows {self.format_bytes(after[table]["bytes"]):>10}'
+                free = after[table]['free']
+                if free:
+                    # InnoDB keeps freed pages in the tablespace until OPTIMIZE TABLE
+                    line += f'  ({self.format_bytes(free)} reclaimable)'
+            self.stdout.write(line)
+
+    @staticmethod
+    def format_bytes(value):
+        if value is None:
+            return 'n/a'
+        for unit in ('B', 'KB', 'MB', 'GB'):
+            if value < 1024 or unit == 'GB':
+                return f'{value:.0f} {unit}' if unit == 'B' else f'{value:.1f} {unit}'
+            value /= 1024
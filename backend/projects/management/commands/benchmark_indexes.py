@@ -0,0 +1,108 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from projects.datasets import generate
+from projects.models import Project, Task, Notification, ActivityLog
+
+
+class Command(BaseCommand):
+    help = (
+        "Print EXPLAIN plans and timings for the hot list queries with and without "
+        "the composite indexes declared in Meta.indexes. Indexes are dropped and "
+        "re-created during the run, so point this at a development database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Number of tasks to generate before benchmarking.')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query; the best time is reported.')
+        parser.add_argument('--limit', type=int, default=100, help='Rows fetched per query, like one API page.')
+        parser.add_argument('--skip-drop', action='store_true', help='Only measure with the current indexes.')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'])
+
+        queries = self.hot_queries(options['limit'])
+        if not queries:
+            self.stderr.write('No data to benchmark; run with --seed N first.')
+            return
+
+        models = [Project, Task, Notification, ActivityLog]
+        if not options['skip_drop']:
+            self.set_indexes(models, present=False)
+            try:
+                before = self.measure('before (no composite indexes)', queries, options['repeat'])
+            finally:
+                self.set_indexes(models, present=True)
+        after = self.measure('after (composite indexes)', queries, options['repeat'])
+
+        if not options['skip_drop']:
+            self.stdout.write(self.style.MIGRATE_HEADING('Summary'))
+            for label in after:
+                self.stdout.write(f'  {label:<40} {before[label]:>9.2f} ms -> {after[label]:>9.2f} ms')
+
+    def hot_queries(self, limit):
+        task = Task.objects.order_by('?').values('project_id', 'assigned_to_id', 'sprint').first()
+        notification = Notification.objects.values('user_id').first()
+        log = ActivityLog.objects.exclude(target_id=None).values('target_type', 'target_id', 'user_id').first()
+        if not task:
+            return {}
+
+        queries = {
+            'tasks by project': Task.objects.filter(project_id=task['project_id']),
+            'tasks by assignee': Task.objects.filter(assigned_to_id=task['assigned_to_id']),
+            'tasks by status': Task.objects.filter(status=Task.Status.REVIEW),
+            'tasks by sprint': Task.objects.filter(sprint=task['sprint']),
+            'projects by pm': Project.objects.filter(pm_id=Project.objects.values_list('pm_id', flat=True).first()),
+        }
+        if notification:
+            queries['notifications by user'] = Notification.objects.filter(user_id=notification['user_id'])
+        if log:
+            queries['activity by target'] = ActivityLog.objects.filter(
+                target_type=log['target_type'], target_id=log['target_id']
+            )
+            queries['activity by user'] = ActivityLog.objects.filter(user_id=log['user_id'])
+            queries['activity latest'] = ActivityLog.objects.all()
+        return {label: qs.order_by('-created_at', '-id')[:limit] for label, qs in queries.items()}
+
+    def measure(self, heading, queries, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(heading))
+        timings = {}
+        for label, queryset in queries.items():
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = best
+            self.stdout.write(f'  {label}: {best:.2f} ms')
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f'      {line}')
+        return timings
+
+    def set_indexes(self, models, present):
+        with connection.schema_editor() as editor:
+            for model in models:
+                for index in model._meta.indexes:
+                    if present:
+                        editor.add_index(model, index)
+                    else:
+                        editor.remove_index(model, index)
+
+    def seed(self, task_count):
+        self.stdout.write(f'Seeding {task_count} tasks...')
+        # One PM per 5000 tasks, one developer per 200, one project per 500
+        generate(
+            pms=max(task_count // 5000, 2),
+            devs=max(task_count // 200, 5),
+            projects=max(task_count // 500, 2),
+            tasks=task_count,
+            comments=0,
+            notifications=task_count,
+            activity_logs=task_count,
+            batch_size=5000,
+            prefix=f'bench_{task_count}',
+        )
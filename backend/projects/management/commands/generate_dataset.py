@@ -0,0 +1,46 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.datasets import generate
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-insert a reproducible synthetic dataset of users, projects, tasks, comments, "
+        "notifications and activity logs for benchmarks and load tests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pms', type=int, default=5)
+        parser.add_argument('--devs', type=int, default=50)
+        parser.add_argument('--projects', type=int, default=20)
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=4000)
+        parser.add_argument('--notifications', type=int, default=5000)
+        parser.add_argument('--activity-logs', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same data.')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per INSERT and transaction.')
+        parser.add_argument('--prefix', default='bench', help='Username prefix, so datasets can coexist.')
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=f'{options["prefix"]}_').exists():
+            raise CommandError(f'Users named {options["prefix"]}_* already exist; pass another --prefix.')
+        start = time.perf_counter()
+        counts = generate(
+            pms=options['pms'],
+            devs=options['devs'],
+            projects=options['projects'],
+            tasks=options['tasks'],
+            comments=options['comments'],
+            notifications=options['notifications'],
+            activity_logs=options['activity_logs'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            prefix=options['prefix'],
+            log=lambda message: self.stderr.write(f'  {message}'),
+        )
+        self.stderr.write(self.style.SUCCESS(f'Generated in {time.perf_counter() - start:.1f}s'))
+        self.stdout.write(json.dumps(counts))
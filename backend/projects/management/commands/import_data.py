@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.imports import Importer, read_rows
+from projects.models import ImportJob
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Import projects or tasks from a CSV, JSON Lines or JSON file in batched transactions, "
+        "as the given admin or PM, and report the rows that failed validation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='A .csv, .jsonl/.ndjson or .json file.')
+        parser.add_argument('--kind', required=True, choices=['projects', 'tasks'])
+        parser.add_argument('--user', required=True, help='Username of the admin or PM the rows are imported as.')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction (default IMPORT_BATCH_SIZE).')
+        parser.add_argument('--dry-run', action='store_true', help='Validate and resolve rows without writing them.')
+
+    def handle(self, *args, **options):
+        format = ImportJob.format_for(options['path'])
+        if format is None:
+            raise CommandError('Expected a .csv, .jsonl, .ndjson or .json file.')
+        try:
+            user = User.objects.get(username=options['user'], role__in=[User.Role.ADMIN, User.Role.PM])
+        except User.DoesNotExist:
+            raise CommandError(f'No admin or PM named "{options["user"]}".')
+
+        importer = Importer(
+            user,
+            ImportJob.Kind(options['kind'].upper()),
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            progress=lambda report: self.stdout.write(
+                f'{report["processed"]} rows processed, {report["imported"]} imported, {report["failed"]} failed'
+            ),
+        )
+        try:
+            with open(options['path'], 'rb') as file:
+                report = importer.run(read_rows(file, format))
+        except OSError as exc:
+            raise CommandError(exc)
+
+        for error in report['errors']:
+            self.stderr.write(f'line {error["line"]}: {error["errors"]}')
+        if report['failed'] > len(report['errors']):
+            self.stderr.write(f'... and {report["failed"] - len(report["errors"])} more')
+        verb = 'would import' if options['dry_run'] else 'imported'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {report["imported"]} of {report["processed"]} rows'))
@@ -0,0 +1,69 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from projects.models import ActivityLog
+from projects.retention import month_start, next_month, partition_name, partition_statements
+
+
+class Command(BaseCommand):
+    help = (
+        "MySQL only: range-partition the activity log by month on created_at, keep "
+        "--months-ahead empty partitions ready, and with --drop-expired drop whole "
+        "partitions past RETENTION_ACTIVITY_LOG_DAYS once apply_retention has archived them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3, help='Future monthly partitions to keep ready.')
+        parser.add_argument('--drop-expired', action='store_true', help='Drop partitions that are past retention and empty.')
+        parser.add_argument('--dry-run', action='store_true', help='Print the SQL without running it.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'mysql':
+            self.stdout.write(f'Partitioning is only supported on MySQL; {connection.vendor} tables are left as they are.')
+            return
+
+        table = ActivityLog._meta.db_table
+        today = timezone.now().date()
+        last_month = month_start(today)
+        for _ in range(options['months_ahead']):
+            last_month = next_month(last_month)
+        oldest = ActivityLog.objects.order_by('created_at').values_list('created_at', flat=True).first()
+        first_month = month_start(oldest.date() if oldest else today)
+
+        existing = self.partitions(table)
+        expired_before = None
+        if options['drop_expired']:
+            cutoff = today - datetime.timedelta(days=settings.RETENTION_ACTIVITY_LOG_DAYS)
+            expired_before = month_start(cutoff)
+            expired = [name for name in existing if name != 'pmax' and name < partition_name(expired_before)]
+            # apply_retention archives the rows first; never drop a partition that still has data
+            if any(self.has_rows(table, name) for name in expired):
+                self.stderr.write('Some expired partitions still hold rows; run apply_retention first.')
+                expired_before = None
+
+        statements = partition_statements(table, existing, first_month, last_month, expired_before)
+        if not statements:
+            self.stdout.write('Partitions are up to date.')
+        with connection.cursor() as cursor:
+            for statement in statements:
+                self.stdout.write(statement)
+                if not options['dry_run']:
+                    cursor.execute(statement)
+
+    def partitions(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT partition_name FROM information_schema.partitions '
+                'WHERE table_schema = DATABASE() AND table_name = %s AND partition_name IS NOT NULL',
+                [table],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def has_rows(self, table, partition):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT 1 FROM `{table}` PARTITION (`{partition}`) LIMIT 1')
+            return cursor.fetchone() is not None
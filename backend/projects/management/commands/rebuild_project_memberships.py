@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.models import ProjectMembership
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the ProjectMembership task counts that scope developers' project lists from the "
+        "tasks themselves, dropping rows that have fallen to zero. Signals keep them current; run this "
+        "after writes that bypass them, such as QuerySet.update() on tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report rows that differ.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            expected = ProjectMembership.expected_counts()
+            actual = {
+                (row.user_id, row.project_id): row.task_count
+                for row in ProjectMembership.objects.select_for_update()
+            }
+            drifted = sorted(
+                pair for pair in expected.keys() | actual.keys() if expected.get(pair, 0) != actual.get(pair, 0)
+            )
+            for user_id, project_id in drifted:
+                self.stdout.write(
+                    f'user {user_id} in project {project_id}: {actual.get((user_id, project_id), 0)} '
+                    f'recorded, {expected.get((user_id, project_id), 0)} tasks'
+                )
+            if options['check']:
+                self.stdout.write(f'{len(drifted)} memberships differ')
+                return
+
+            ProjectMembership.objects.all().delete()
+            ProjectMembership.objects.bulk_create(
+                [
+                    ProjectMembership(user_id=user_id, project_id=project_id, task_count=count)
+                    for (user_id, project_id), count in expected.items()
+                ],
+                batch_size=1000,
+            )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(expected)} memberships, {len(drifted)} had drifted'))
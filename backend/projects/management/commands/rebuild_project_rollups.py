@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects import cache as response_cache
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the task rollups on every project (tasks by status, overdue tasks) from the tasks "
+        "themselves, and move last_activity_at up to the newest task change where it lags. Signals keep "
+        "them current; run this after writes that bypass them, such as QuerySet.update() on tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report projects that differ.')
+
+    def handle(self, *args, **options):
+        fields = (*Project.counted_rollups, 'last_activity_at')
+        with transaction.atomic():
+            expected = Project.expected_rollups()
+            drifted = []
+            for project in Project.objects.select_for_update().only(*fields).order_by('id'):
+                row = expected.get(project.id, {})
+                changes = {
+                    field: (getattr(project, field), row.get(field, 0))
+                    for field in Project.counted_rollups if getattr(project, field) != row.get(field, 0)
+                }
+                newest = row.get('last_task_update')
+                if newest and (project.last_activity_at is None or project.last_activity_at < newest):
+                    changes['last_activity_at'] = (project.last_activity_at, newest)
+                if not changes:
+                    continue
+                self.stdout.write(f'project {project.id}: ' + ', '.join(
+                    f'{field} {recorded} recorded, {counted} counted' for field, (recorded, counted) in changes.items()
+                ))
+                for field, (_, counted) in changes.items():
+                    setattr(project, field, counted)
+                drifted.append(project)
+            if options['check']:
+                self.stdout.write(f'{len(drifted)} projects differ')
+                return
+
+            Project.objects.bulk_update(drifted, fields, batch_size=500)
+            response_cache.invalidate(response_cache.scopes_for_projects([project.id for project in drifted]))
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the rollups of {len(expected)} projects with tasks, {len(drifted)} had drifted'
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from projects import search
+from projects.models import Project, SearchDocument, Task, TaskComment
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the full-text search documents for all projects, tasks and comments. "
+        "Saves keep the index current; run this after bulk loads that bypass signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows indexed per upsert.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            SearchDocument.objects.all().delete()
+            for queryset in (
+                Project.objects.all(),
+                Task.objects.all(),
+                TaskComment.objects.select_related('task').only('id', 'content', 'task__project_id'),
+            ):
+                count = 0
+                batch = []
+                for instance in queryset.order_by('id').iterator(chunk_size=batch_size):
+                    batch.append(instance)
+                    if len(batch) >= batch_size:
+                        search.index(batch)
+                        count += len(batch)
+                        batch = []
+                search.index(batch)
+                count += len(batch)
+                self.stdout.write(f'{queryset.model._meta.label}: indexed {count}')
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute(f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}) VALUES ('optimize')")
@@ -0,0 +1,116 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from projects import benchmarks
+from projects.datasets import generate
+
+
+class RolledBack(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the main API flows (dashboard loads, Kanban moves, comment posting, notification "
+        "listing) in-process and print requests/sec, p50/p99 latency and query counts as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flow', action='append', dest='flows', choices=list(benchmarks.FLOWS),
+                            help='Only these flows (repeatable; default all).')
+        parser.add_argument('--iterations', type=int, default=100, help='Measured iterations per flow.')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured iterations per flow.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--concurrency', action='append', type=int,
+                            help='Also compare sync and async read views through the ASGI application '
+                                 'with this many concurrent connections (repeatable).')
+        parser.add_argument('--concurrent-requests', type=int, default=500,
+                            help='Measured requests per concurrency level and mode.')
+        parser.add_argument('--fresh', action='store_true',
+                            help='Benchmark a throwaway test database filled by generate_dataset defaults '
+                                 'times --scale, instead of the configured database.')
+        parser.add_argument('--scale', type=float, default=1.0, help='Dataset size multiplier for --fresh.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+        parser.add_argument('--compare', help='A previous JSON report to print changes against.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Could not read {options["compare"]}: {exc}')
+
+        # Measure what production runs: no debug cursor, no profiling overhead
+        with override_settings(DEBUG=False, PROFILING_SAMPLE_RATE=0):
+            if options['fresh']:
+                report = self.run_fresh(options)
+            else:
+                report = self.run_rolled_back(options)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + '\n')
+        else:
+            self.stdout.write(output)
+        if baseline:
+            for line in benchmarks.compare(baseline, report):
+                self.stderr.write(line)
+
+    def run(self, options):
+        report = self.run_flows(options)
+        if options['concurrency']:
+            report['concurrency'] = self.run_concurrent(options)
+        return report
+
+    def run_flows(self, options):
+        try:
+            return benchmarks.run(options['flows'], options['iterations'], options['warmup'], options['seed'])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+    def run_concurrent(self, options):
+        try:
+            return benchmarks.run_concurrent(
+                options['concurrency'], options['concurrent_requests'], options['warmup'], options['seed']
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+
+    def run_rolled_back(self, options):
+        # The flows write; undo it so runs stay comparable. on_commit work such
+        # as activity log writes never happens in this mode.
+        try:
+            with transaction.atomic():
+                report = self.run_flows(options)
+                raise RolledBack
+        except RolledBack:
+            pass
+        # Read-only, and served on other threads' connections, which could
+        # not see this one's transaction anyway
+        if options['concurrency']:
+            report['concurrency'] = self.run_concurrent(options)
+        return report
+
+    def run_fresh(self, options):
+        scale = options['scale']
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            generate(
+                pms=max(round(5 * scale), 1),
+                devs=max(round(50 * scale), 1),
+                projects=max(round(20 * scale), 1),
+                tasks=round(2000 * scale),
+                comments=round(4000 * scale),
+                notifications=round(5000 * scale),
+                activity_logs=round(10000 * scale),
+                seed=options['seed'],
+                log=lambda message: self.stderr.write(f'  {message}'),
+            )
+            return self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DueDateReminder',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('DUE_SOON', 'Due soon'), ('OVERDUE', 'Overdue')], max_length=20)),
+                ('due_date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'due_date', 'id'], name='task_status_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='duedatereminder',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='projects.task'),
+        ),
+        migrations.AddField(
+            model_name='duedatereminder',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='due_date_reminders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='duedatereminder',
+            index=models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['user', 'id'], name='reminder_pending_user_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='duedatereminder',
+            constraint=models.UniqueConstraint(fields=('task', 'kind', 'due_date'), name='reminder_task_kind_due_uniq'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Notification = apps.get_model('projects', 'Notification')
+    unread = (
+        Notification.objects.filter(user=OuterRef('pk'), is_read=False)
+        .order_by().values('user').annotate(count=Count('pk')).values('count')
+    )
+    User.objects.update(unread_notifications=Coalesce(Subquery(unread), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_due_date_reminders'),
+        ('users', '0003_user_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
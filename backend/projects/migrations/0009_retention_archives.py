@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_backfill_unread_notifications'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activitylog',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='ArchivedActivityLog',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('user_id', models.IntegerField(null=True)),
+                ('action', models.CharField(max_length=255)),
+                ('target_type', models.CharField(max_length=50)),
+                ('target_id', models.IntegerField(null=True)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['target_type', 'target_id', '-created_at'], name='archived_activity_target_idx'), models.Index(fields=['-created_at'], name='archived_activity_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('user_id', models.IntegerField()),
+                ('message', models.TextField()),
+                ('is_read', models.BooleanField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', '-created_at'], name='archived_notification_user_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:31
+
+import itertools
+
+from django.db import migrations, models
+
+FTS5_SQL = [
+    "CREATE VIRTUAL TABLE projects_searchdocument_fts USING fts5("
+    "title, body, content='projects_searchdocument', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER projects_searchdocument_ai AFTER INSERT ON projects_searchdocument BEGIN "
+    "INSERT INTO projects_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER projects_searchdocument_ad AFTER DELETE ON projects_searchdocument BEGIN "
+    "INSERT INTO projects_searchdocument_fts(projects_searchdocument_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER projects_searchdocument_au AFTER UPDATE ON projects_searchdocument BEGIN "
+    "INSERT INTO projects_searchdocument_fts(projects_searchdocument_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO projects_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+FTS5_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS projects_searchdocument_ai',
+    'DROP TRIGGER IF EXISTS projects_searchdocument_ad',
+    'DROP TRIGGER IF EXISTS projects_searchdocument_au',
+    'DROP TABLE IF EXISTS projects_searchdocument_fts',
+]
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        schema_editor.execute('ALTER TABLE projects_searchdocument ADD FULLTEXT INDEX search_fulltext_idx (title, body)')
+    elif vendor == 'sqlite':
+        for statement in FTS5_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        schema_editor.execute('ALTER TABLE projects_searchdocument DROP INDEX search_fulltext_idx')
+    elif vendor == 'sqlite':
+        for statement in FTS5_DROP_SQL:
+            schema_editor.execute(statement)
+
+
+def backfill(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    TaskComment = apps.get_model('projects', 'TaskComment')
+    SearchDocument = apps.get_model('projects', 'SearchDocument')
+    projects = Project.objects.values_list('id', 'name', 'description')
+    tasks = Task.objects.values_list('id', 'project_id', 'title', 'description', 'sprint')
+    comments = TaskComment.objects.values_list('id', 'task__project_id', 'task_id', 'content')
+    documents = itertools.chain(
+        (
+            SearchDocument(kind='PROJECT', object_id=pk, project_id=pk, title=name, body=description)
+            for pk, name, description in projects.iterator(chunk_size=2000)
+        ),
+        (
+            SearchDocument(kind='TASK', object_id=pk, project_id=project_id, task_id=pk, title=title,
+                           body=f'{description}\n{sprint}')
+            for pk, project_id, title, description, sprint in tasks.iterator(chunk_size=2000)
+        ),
+        (
+            SearchDocument(kind='COMMENT', object_id=pk, project_id=project_id, task_id=task_id, body=content)
+            for pk, project_id, task_id, content in comments.iterator(chunk_size=2000)
+        ),
+    )
+    while batch := list(itertools.islice(documents, 2000)):
+        SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_retention_archives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('PROJECT', 'Project'), ('TASK', 'Task'), ('COMMENT', 'Comment')], max_length=10)),
+                ('object_id', models.IntegerField()),
+                ('project_id', models.IntegerField()),
+                ('task_id', models.IntegerField(null=True)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project_id'], name='search_project_idx'), models.Index(fields=['task_id'], name='search_task_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_kind_object_uniq')],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
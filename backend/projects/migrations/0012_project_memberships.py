@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill(apps, schema_editor):
+    Task = apps.get_model('projects', 'Task')
+    ProjectMembership = apps.get_model('projects', 'ProjectMembership')
+    rows = (
+        Task.objects.exclude(assigned_to=None).values('assigned_to_id', 'project_id')
+        .annotate(count=Count('id')).order_by()
+    )
+    ProjectMembership.objects.bulk_create(
+        (
+            ProjectMembership(user_id=row['assigned_to_id'], project_id=row['project_id'], task_count=row['count'])
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_import_jobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectMembership',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_count', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='projects.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'project'), name='membership_user_project_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:16
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def backfill(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    tasks = Task.objects.filter(project=OuterRef('pk')).order_by().values('project')
+
+    def count(condition):
+        return Coalesce(Subquery(tasks.filter(condition).annotate(count=Count('pk')).values('count')), Value(0))
+
+    Project.objects.update(
+        tasks_todo=count(Q(status='TODO')),
+        tasks_in_progress=count(Q(status='IN_PROGRESS')),
+        tasks_review=count(Q(status='REVIEW')),
+        tasks_done=count(Q(status='DONE')),
+        tasks_overdue=count(Q(due_date__lt=timezone.localdate()) & ~Q(status='DONE')),
+        last_activity_at=Subquery(tasks.annotate(newest=Max('updated_at')).values('newest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0012_project_memberships'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='last_activity_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_done',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_in_progress',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_overdue',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_review',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_todo',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
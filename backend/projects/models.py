@@ -1,20 +1,166 @@
-from django.db import models
+import os
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import models, transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import Greatest
 from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = settings.AUTH_USER_MODEL
 
-class Project(models.Model):
+class TracksLoadedValues:
+    """
+    Remembers the column values a row was loaded or last saved with, so signal
+    handlers can tell what changed (e.g. the previous assignee) without
+    another query.
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save handlers have seen the old values; the saved ones are next
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields if field.attname not in deferred
+        }
+
+    def loaded_value(self, attname, default=None):
+        return getattr(self, '_loaded_values', {}).get(attname, default)
+
+class ProjectQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        role = getattr(user, 'role', None)
+        if role == 'PM':
+            return self.filter(pm=user)
+        elif role == 'DEV':
+            # One indexed lookup in ProjectMembership; (user, project) is
+            # unique, so unlike joining the tasks this needs no DISTINCT
+            return self.filter(memberships__user=user, memberships__task_count__gt=0)
+        return self
+
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        role = getattr(user, 'role', None)
+        if role == 'PM':
+            return self.filter(project__pm=user)
+        elif role == 'DEV':
+            return self.filter(assigned_to=user)
+        return self
+
+    def overdue(self):
+        return self.filter(due_date__lt=timezone.localdate()).exclude(status=Task.Status.DONE)
+
+class Project(TracksLoadedValues, models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     start_date = models.DateField()
     end_date = models.DateField(null=True, blank=True)
     pm = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='managed_projects', limit_choices_to={'role': 'PM'})
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Task rollups, kept current by the Task signal handlers in
+    # projects.signals through adjust_rollups(). Tasks also fall overdue as
+    # days pass, which refresh_overdue() catches up with;
+    # rebuild_project_rollups recounts everything.
+    tasks_todo = models.PositiveIntegerField(default=0, editable=False)
+    tasks_in_progress = models.PositiveIntegerField(default=0, editable=False)
+    tasks_review = models.PositiveIntegerField(default=0, editable=False)
+    tasks_done = models.PositiveIntegerField(default=0, editable=False)
+    tasks_overdue = models.PositiveIntegerField(default=0, editable=False)
+    last_activity_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
+
+    status_rollups = {
+        'TODO': 'tasks_todo',
+        'IN_PROGRESS': 'tasks_in_progress',
+        'REVIEW': 'tasks_review',
+        'DONE': 'tasks_done',
+    }
+    counted_rollups = (*status_rollups.values(), 'tasks_overdue')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='project_created_idx'),
+            models.Index(fields=['pm', '-created_at', '-id'], name='project_pm_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # A full save of a stale instance must not overwrite the rollups
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in (*self.counted_rollups, 'last_activity_at')
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def adjust_rollups(cls, deltas):
+        """
+        Apply ``{project_id: {field: delta}}`` and stamp last_activity_at, with
+        one UPDATE per distinct set of deltas. Projects whose deltas are all
+        zero are only stamped.
+        """
+        by_changes = defaultdict(list)
+        for project_id, fields in deltas.items():
+            if project_id is not None:
+                by_changes[tuple(sorted((field, delta) for field, delta in fields.items() if delta))].append(project_id)
+        now = timezone.now()
+        for changes, project_ids in by_changes.items():
+            cls.objects.filter(id__in=project_ids).update(
+                last_activity_at=now,
+                **{field: Greatest(F(field) + delta, 0) for field, delta in changes},
+            )
+
+    @classmethod
+    def refresh_overdue(cls):
+        """
+        Recount tasks_overdue where it differs from the tasks, with one UPDATE
+        per distinct new count. Returns the ids of the projects changed.
+        """
+        expected = dict(
+            Task.objects.overdue().values('project_id').annotate(count=Count('id'))
+            .values_list('project_id', 'count').order_by()
+        )
+        recorded = dict(cls.objects.filter(tasks_overdue__gt=0).values_list('id', 'tasks_overdue'))
+        by_count = defaultdict(list)
+        for project_id in expected.keys() | recorded.keys():
+            if expected.get(project_id, 0) != recorded.get(project_id, 0):
+                by_count[expected.get(project_id, 0)].append(project_id)
+        for count, project_ids in by_count.items():
+            cls.objects.filter(id__in=project_ids).update(tasks_overdue=count)
+        return [project_id for project_ids in by_count.values() for project_id in project_ids]
+
+    @classmethod
+    def expected_rollups(cls):
+        """
+        ``{project_id: {field: value}}`` computed from the tasks themselves,
+        with ``last_task_update`` for the newest task change. Projects without
+        tasks are left out.
+        """
+        aggregates = {field: Count('id', filter=Q(status=status)) for status, field in cls.status_rollups.items()}
+        aggregates['tasks_overdue'] = Count(
+            'id', filter=Q(due_date__lt=timezone.localdate()) & ~Q(status=Task.Status.DONE)
+        )
+        rows = Task.objects.values('project_id').annotate(**aggregates, last_task_update=Max('updated_at')).order_by()
+        return {row.pop('project_id'): row for row in rows}
 
     def __str__(self):
         return self.name
 
-class Task(models.Model):
+class Task(TracksLoadedValues, models.Model):
     class Status(models.TextChoices):
         TODO = 'TODO', 'To-Do'
         IN_PROGRESS = 'IN_PROGRESS', 'In Progress'
@@ -39,9 +185,80 @@ class Task(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     github_pr_url = models.URLField(blank=True, null=True)
 
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        # Match TaskViewSet.filterset_fields and the visible_to() scoping, each
+        # followed by the list ordering so filtered pages need no sort step.
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+            models.Index(fields=['project', '-created_at', '-id'], name='task_project_created_idx'),
+            models.Index(fields=['assigned_to', '-created_at', '-id'], name='task_assignee_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='task_status_created_idx'),
+            models.Index(fields=['sprint', '-created_at', '-id'], name='task_sprint_created_idx'),
+            # Due-date reminder sweep: open statuses, keyset over (due_date, id)
+            models.Index(fields=['status', 'due_date', 'id'], name='task_status_due_idx'),
+        ]
+
     def __str__(self):
         return f"{self.project.name} - {self.title}"
 
+class ProjectMembership(models.Model):
+    """
+    How many tasks of a project are assigned to a developer, kept current by
+    the Task signal handlers in projects.signals. A developer can see the
+    projects where the count is positive. Rows that drop to zero are kept,
+    not deleted, so a concurrent increment can never lose its row; the
+    rebuild_project_memberships command clears them out.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_memberships')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='memberships')
+    task_count = models.PositiveIntegerField(default=0)
+
+    users_per_update = 200
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'project'], name='membership_user_project_uniq'),
+        ]
+
+    @classmethod
+    def adjust(cls, deltas):
+        """
+        Apply ``{(user_id, project_id): delta}``: one INSERT for pairs that may
+        be new, then one UPDATE per distinct delta and up to
+        ``users_per_update`` users. Pairs without a user are ignored.
+        """
+        deltas = {pair: delta for pair, delta in deltas.items() if delta and None not in pair}
+        new_pairs = [pair for pair, delta in deltas.items() if delta > 0]
+        if new_pairs:
+            cls.objects.bulk_create(
+                [cls(user_id=user_id, project_id=project_id) for user_id, project_id in new_pairs],
+                ignore_conflicts=True,
+            )
+        by_delta = defaultdict(lambda: defaultdict(list))
+        for (user_id, project_id), delta in deltas.items():
+            by_delta[delta][user_id].append(project_id)
+        for delta, projects_by_user in by_delta.items():
+            conditions = [Q(user_id=user_id, project_id__in=ids) for user_id, ids in projects_by_user.items()]
+            # SQLite rejects expression trees deeper than 1000
+            for start in range(0, len(conditions), cls.users_per_update):
+                cls.objects.filter(reduce(or_, conditions[start:start + cls.users_per_update])).update(
+                    task_count=Greatest(F('task_count') + delta, 0)
+                )
+
+    @classmethod
+    def expected_counts(cls):
+        """``{(user_id, project_id): count}`` computed from the tasks themselves."""
+        rows = (
+            Task.objects.exclude(assigned_to=None).values('assigned_to_id', 'project_id')
+            .annotate(count=Count('id')).order_by()
+        )
+        return {(row['assigned_to_id'], row['project_id']): row['count'] for row in rows}
+
+    def __str__(self):
+        return f"{self.user_id} in project {self.project_id} ({self.task_count} tasks)"
+
 class AssetLink(models.Model):
     class AssetType(models.TextChoices):
         GITHUB = 'GITHUB', 'GitHub Repository'
@@ -58,11 +275,30 @@ class AssetLink(models.Model):
     def __str__(self):
         return f"{self.project.name} - {self.get_asset_type_display()}"
 
-class Notification(models.Model):
+class NotificationQuerySet(models.QuerySet):
+    def mark_read(self, user):
+        """
+        Mark ``user``'s unread rows in this queryset read with one UPDATE and
+        take them off the user's unread counter; returns the rows changed.
+        """
+        with transaction.atomic():
+            count = self.filter(user=user, is_read=False).update(is_read=True, updated_at=timezone.now())
+            get_user_model().adjust_unread_notifications({user.pk: -count})
+        return count
+
+class Notification(TracksLoadedValues, models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = NotificationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user.username} - Read: {self.is_read}"
@@ -72,16 +308,184 @@ class TaskComment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_comments')
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
-    
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at', 'id'], name='comment_task_created_idx'),
+        ]
+
     def __str__(self):
         return f"Comment by {self.user.username} on {self.task.title}"
 
 class ActivityLog(models.Model):
-    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    # No database constraint so the table can be range partitioned on MySQL
+    # (see partition_activity_log); SET_NULL is still applied by Django
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, db_constraint=False)
     action = models.CharField(max_length=255) # e.g., "Moved Task #12 to IN_PROGRESS", "Created Project X"
     target_type = models.CharField(max_length=50) # 'Project', 'Task', 'User'
     target_id = models.IntegerField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    
+    # Set when the event happens, not when the buffered row is written
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='activity_created_idx'),
+            models.Index(fields=['target_type', 'target_id', '-created_at', '-id'], name='activity_target_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='activity_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username if self.user else 'System'} - {self.action}"
+
+class ArchivedNotification(models.Model):
+    """Notification rows moved out of the hot table by projects.retention."""
+    id = models.BigIntegerField(primary_key=True)
+    user_id = models.IntegerField()
+    message = models.TextField()
+    is_read = models.BooleanField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', '-created_at'], name='archived_notification_user_idx'),
+        ]
+
+class ArchivedActivityLog(models.Model):
+    """ActivityLog rows moved out of the hot table by projects.retention."""
+    id = models.BigIntegerField(primary_key=True)
+    user_id = models.IntegerField(null=True)
+    action = models.CharField(max_length=255)
+    target_type = models.CharField(max_length=50)
+    target_id = models.IntegerField(null=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['target_type', 'target_id', '-created_at'], name='archived_activity_target_idx'),
+            models.Index(fields=['-created_at'], name='archived_activity_created_idx'),
+        ]
+
+class SearchDocument(models.Model):
+    """
+    Flattened searchable text of a project, task or comment, upserted by
+    projects.signals on every save. projects.search queries it through a
+    FULLTEXT index on MySQL or an FTS5 shadow table on SQLite.
+    """
+    class Kind(models.TextChoices):
+        PROJECT = 'PROJECT', 'Project'
+        TASK = 'TASK', 'Task'
+        COMMENT = 'COMMENT', 'Comment'
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.IntegerField()
+    # Plain ids for role scoping; rows are removed by the delete signals
+    project_id = models.IntegerField()
+    task_id = models.IntegerField(null=True)
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='search_kind_object_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['project_id'], name='search_project_idx'),
+            models.Index(fields=['task_id'], name='search_task_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}"
+
+class DueDateReminder(models.Model):
+    """
+    One row per reminder a task's assignee is owed. The unique constraint makes
+    repeated sweeps idempotent; sent_at stays empty until the digest carrying
+    it has been handed to the mail backend.
+    """
+    class Kind(models.TextChoices):
+        DUE_SOON = 'DUE_SOON', 'Due soon'
+        OVERDUE = 'OVERDUE', 'Overdue'
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='reminders')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='due_date_reminders')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    # The due date the reminder was for, so moving the deadline earns a new one
+    due_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'kind', 'due_date'], name='reminder_task_kind_due_uniq'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'id'], name='reminder_pending_user_idx', condition=models.Q(sent_at__isnull=True)
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} reminder for {self.task.title}"
+
+class ImportStorage(FileSystemStorage):
+    # Read IMPORT_UPLOAD_DIR on every access rather than once at startup
+    @property
+    def base_location(self):
+        return settings.IMPORT_UPLOAD_DIR
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+def import_storage():
+    return ImportStorage()
+
+class ImportJob(models.Model):
+    """
+    One bulk import of projects or tasks from an uploaded file (see
+    projects.imports). The counters and errors are saved after every batch,
+    so clients can poll a job the run_import Celery task is working on.
+    """
+    class Kind(models.TextChoices):
+        PROJECTS = 'PROJECTS', 'Projects'
+        TASKS = 'TASKS', 'Tasks'
+
+    class Format(models.TextChoices):
+        CSV = 'CSV', 'CSV'
+        JSONL = 'JSONL', 'JSON Lines'
+        JSON = 'JSON', 'JSON array'
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        DONE = 'DONE', 'Done'
+        FAILED = 'FAILED', 'Failed'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='import_jobs')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    format = models.CharField(max_length=20, choices=Format.choices)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    file = models.FileField(upload_to='%Y/%m/', storage=import_storage)
+    dry_run = models.BooleanField(default=False)
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_imported = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    # [{"line": 12, "errors": {"project": ["..."]}}], capped at IMPORT_MAX_ERRORS
+    errors = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @classmethod
+    def format_for(cls, filename):
+        """The Format a file name's extension implies, or None."""
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        return {'csv': cls.Format.CSV, 'jsonl': cls.Format.JSONL, 'ndjson': cls.Format.JSONL, 'json': cls.Format.JSON}.get(extension)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} import #{self.id} ({self.get_status_display()})"
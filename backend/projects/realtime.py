@@ -0,0 +1,59 @@
+"""
+Live updates pushed to WebSocket clients (see consumers.py).
+
+Every connection joins its user's group; clients can also subscribe to the
+projects they can see. Events are published only after the transaction that
+produced them commits, through whichever channel layer CHANNEL_LAYERS
+configures (Redis in deployments, in-memory in development and tests).
+"""
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+
+def user_group(user_id):
+    return f'user.{user_id}'
+
+
+def project_group(project_id):
+    return f'project.{project_id}'
+
+
+def publish(groups, payload):
+    groups = [group for group in groups if group]
+    if not groups:
+        return
+
+    def send():
+        layer = get_channel_layer()
+        if layer is None:
+            return
+        for group in groups:
+            async_to_sync(layer.group_send)(group, {'type': 'live.event', 'payload': payload})
+
+    transaction.on_commit(send)
+
+
+def notification_created(notification):
+    from .serializers import NotificationSerializer
+    publish(
+        [user_group(notification.user_id)],
+        {'event': 'notification.created', 'notification': NotificationSerializer(notification).data},
+    )
+
+
+def task_status_changed(task, previous_status):
+    publish(
+        [project_group(task.project_id), user_group(task.assigned_to_id) if task.assigned_to_id else None],
+        {
+            'event': 'task.status_changed',
+            'task': {
+                'id': task.id,
+                'project': task.project_id,
+                'title': task.title,
+                'status': task.status,
+                'previous_status': previous_status,
+                'assigned_to': task.assigned_to_id,
+            },
+        },
+    )
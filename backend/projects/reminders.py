@@ -0,0 +1,136 @@
+"""
+Due-date reminder sweep, run periodically by Celery beat.
+
+The sweep has two bounded-memory passes:
+
+1. Walk open tasks due by tomorrow that have no reminder yet for their
+   current due date and kind, in (due_date, id) keyset chunks over
+   task_status_due_idx, and record the reminders owed. A task overdue for
+   months is thus reminded about once, not re-inserted on every sweep. The
+   unique constraint on DueDateReminder, with
+   bulk_create(ignore_conflicts=True), covers sweeps that overlap.
+2. Walk unsent reminders in (user, id) order, build one digest per user and
+   send the digests over a single mail connection in batches, then stamp
+   sent_at. A failed send leaves the rows pending for the next sweep.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import DueDateReminder, Task
+
+OPEN_STATUSES = [status for status in Task.Status.values if status != Task.Status.DONE]
+
+
+def owed_reminders(today, chunk_size):
+    """Yield chunks of unsaved DueDateReminder rows for open, assigned tasks due by tomorrow."""
+    # A reminder's due_date is its task's, so the kind owed follows from it
+    reminded = DueDateReminder.objects.filter(task=OuterRef('pk'), due_date=OuterRef('due_date')).filter(
+        Q(kind=DueDateReminder.Kind.OVERDUE, due_date__lt=today)
+        | Q(kind=DueDateReminder.Kind.DUE_SOON, due_date__gte=today)
+    )
+    tasks = (
+        Task.objects.filter(status__in=OPEN_STATUSES, due_date__lte=today + datetime.timedelta(days=1))
+        .exclude(assigned_to=None)
+        .exclude(Exists(reminded))
+        .order_by('due_date', 'id')
+        .values_list('id', 'assigned_to_id', 'due_date')
+    )
+    after = Q()
+    while True:
+        chunk = list(tasks.filter(after)[:chunk_size])
+        if not chunk:
+            return
+        yield [
+            DueDateReminder(
+                task_id=task_id,
+                user_id=user_id,
+                due_date=due_date,
+                kind=DueDateReminder.Kind.OVERDUE if due_date < today else DueDateReminder.Kind.DUE_SOON,
+            )
+            for task_id, user_id, due_date in chunk
+        ]
+        last_id, _, last_due = chunk[-1]
+        after = Q(due_date__gt=last_due) | Q(due_date=last_due, id__gt=last_id)
+
+
+def pending_digests(chunk_size):
+    """Yield (user, [reminder, ...]) with every unsent reminder of a user in one digest."""
+    pending = (
+        DueDateReminder.objects.filter(sent_at=None)
+        .select_related('user', 'task__project')
+        .order_by('user_id', 'id')
+    )
+    user, reminders = None, []
+    after = Q()
+    while True:
+        chunk = list(pending.filter(after)[:chunk_size])
+        for reminder in chunk:
+            if user is not None and reminder.user_id != user.id:
+                yield user, reminders
+                reminders = []
+            user = reminder.user
+            reminders.append(reminder)
+        if len(chunk) < chunk_size:
+            break
+        last = chunk[-1]
+        after = Q(user_id__gt=last.user_id) | Q(user_id=last.user_id, id__gt=last.id)
+    if reminders:
+        yield user, reminders
+
+
+def build_digest(user, reminders):
+    lines = [f"Hi {user.first_name or user.username},", ""]
+    for kind, heading in ((DueDateReminder.Kind.OVERDUE, 'Overdue'), (DueDateReminder.Kind.DUE_SOON, 'Due within 24 hours')):
+        due = [reminder for reminder in reminders if reminder.kind == kind]
+        if due:
+            lines.append(f"{heading}:")
+            lines.extend(f"  - {r.task.title} ({r.task.project.name}), due {r.due_date:%Y-%m-%d}" for r in due)
+            lines.append("")
+    return EmailMessage(
+        subject=f"{len(reminders)} task{'s' if len(reminders) != 1 else ''} need your attention",
+        body="\n".join(lines),
+        to=[user.email],
+    )
+
+
+def send_batch(connection, batch, now):
+    messages = [message for message, _ in batch if message is not None]
+    if messages:
+        connection.send_messages(messages)
+    ids = [reminder_id for _, reminder_ids in batch for reminder_id in reminder_ids]
+    DueDateReminder.objects.filter(id__in=ids).update(sent_at=now)
+
+
+def sweep(today=None):
+    today = today or timezone.localdate()
+    chunk_size = settings.REMINDER_SWEEP_CHUNK_SIZE
+    batch_size = settings.REMINDER_EMAIL_BATCH_SIZE
+
+    recorded = 0
+    for reminders in owed_reminders(today, chunk_size):
+        # ignore_conflicts leaves no way to tell inserted rows apart, so count them
+        existing = DueDateReminder.objects.filter(task_id__in=[reminder.task_id for reminder in reminders])
+        before = existing.count()
+        DueDateReminder.objects.bulk_create(reminders, ignore_conflicts=True)
+        recorded += existing.count() - before
+
+    digests = 0
+    now = timezone.now()
+    batch = []
+    with get_connection() as connection:
+        for user, reminders in pending_digests(chunk_size):
+            # Users without an address are marked done so they are not retried forever
+            message = build_digest(user, reminders) if user.email else None
+            batch.append((message, [reminder.id for reminder in reminders]))
+            digests += message is not None
+            if len(batch) >= batch_size:
+                send_batch(connection, batch, now)
+                batch = []
+        if batch:
+            send_batch(connection, batch, now)
+
+    return {'reminders': recorded, 'digests': digests}
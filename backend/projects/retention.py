@@ -0,0 +1,199 @@
+"""
+Retention for the append-mostly tables.
+
+Rows older than their policy's age are moved out of the hot table in short
+chunked transactions, oldest first, each of which:
+
+1. reads at most ``batch_size`` rows via the (created_at, id) index,
+2. copies them to the archive table (``table`` target) or appends them to a
+   gzipped JSONL file per month (``jsonl`` target), and
+3. deletes them by primary key.
+
+Hot-table locks are held for one chunk only. A chunk that fails after
+archiving is archived again on the next run. Table archives keep primary
+keys and ignore conflicts, so that is harmless. JSONL archives are appended
+to, so they may then hold a row twice: deduplicate by id when reading them.
+"""
+import datetime
+import gzip
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from users.models import User
+from .models import ActivityLog, ArchivedActivityLog, ArchivedNotification, Notification
+
+
+@dataclass(frozen=True)
+class Policy:
+    model: type
+    archive_model: type
+    setting: str
+    fields: tuple
+
+    @property
+    def days(self):
+        return getattr(settings, self.setting)
+
+    @property
+    def label(self):
+        return self.model._meta.label
+
+
+POLICIES = (
+    Policy(Notification, ArchivedNotification, 'RETENTION_NOTIFICATION_DAYS',
+           ('id', 'user_id', 'message', 'is_read', 'created_at', 'updated_at')),
+    Policy(ActivityLog, ArchivedActivityLog, 'RETENTION_ACTIVITY_LOG_DAYS',
+           ('id', 'user_id', 'action', 'target_type', 'target_id', 'created_at')),
+)
+
+
+def archive_expired(policy, target=None, batch_size=None, pause=0.0, dry_run=False, now=None):
+    """Move ``policy.model`` rows past their retention age; returns the number moved."""
+    target = target or settings.RETENTION_TARGET
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    cutoff = (now or timezone.now()) - datetime.timedelta(days=policy.days)
+    expired = policy.model.objects.filter(created_at__lt=cutoff).order_by('created_at', 'id')
+
+    if dry_run:
+        return expired.count()
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(expired.values(*policy.fields)[:batch_size])
+            if not rows:
+                return moved
+            if target == 'jsonl':
+                write_jsonl(policy, rows)
+            else:
+                policy.archive_model.objects.bulk_create(
+                    [policy.archive_model(**row) for row in rows], ignore_conflicts=True
+                )
+            delete_rows(policy.model, [row['id'] for row in rows])
+            if policy.model is Notification:
+                User.adjust_unread_notifications(
+                    {user_id: -count for user_id, count in Counter(r['user_id'] for r in rows if not r['is_read']).items()}
+                )
+        moved += len(rows)
+        if len(rows) < batch_size:
+            return moved
+        if pause:
+            time.sleep(pause)
+
+
+def write_jsonl(policy, rows):
+    directory = Path(settings.RETENTION_ARCHIVE_DIR) / policy.model._meta.db_table
+    directory.mkdir(parents=True, exist_ok=True)
+    by_month = {}
+    for row in rows:
+        by_month.setdefault(row['created_at'].strftime('%Y-%m'), []).append(row)
+    for month, month_rows in by_month.items():
+        # Appending adds a gzip member; readers see one continuous stream
+        with gzip.open(directory / f'{month}.jsonl.gz', 'at', encoding='utf-8') as archive:
+            for row in month_rows:
+                archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+
+
+def delete_rows(model, ids):
+    # A plain DELETE: QuerySet.delete() would load every row to send
+    # post_delete, which the unread counter receiver listens to
+    table = connection.ops.quote_name(model._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE id IN ({placeholders})', ids)
+
+
+def table_sizes(models):
+    """
+    Return ``{table: {'rows', 'bytes', 'free'}}``. ``bytes`` is data plus
+    indexes and ``free`` the space that deletes left reclaimable, where the
+    database reports them.
+    """
+    sizes = {}
+    for model in models:
+        table = model._meta.db_table
+        sizes[table] = {'rows': model.objects.count(), 'bytes': None, 'free': None}
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute(
+                    'SELECT data_length + index_length, data_free FROM information_schema.tables '
+                    'WHERE table_schema = DATABASE() AND table_name = %s', [table]
+                )
+                row = cursor.fetchone()
+                if row:
+                    sizes[table].update(bytes=row[0], free=row[1])
+            elif connection.vendor == 'postgresql':
+                cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+                sizes[table]['bytes'] = cursor.fetchone()[0]
+            elif connection.vendor == 'sqlite':
+                try:
+                    cursor.execute(
+                        'SELECT SUM(pgsize) FROM dbstat WHERE name = %s OR name IN '
+                        '(SELECT name FROM sqlite_master WHERE type = %s AND tbl_name = %s)',
+                        [table, 'index', table],
+                    )
+                    sizes[table]['bytes'] = cursor.fetchone()[0]
+                except DatabaseError:
+                    # dbstat is an optional compile-time extension
+                    pass
+    return sizes
+
+
+def month_start(day):
+    return datetime.date(day.year, day.month, 1)
+
+
+def next_month(day):
+    return datetime.date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'p{month:%Y%m}'
+
+
+def partition_definitions(first_month, last_month):
+    """MySQL RANGE partition clauses, one per month from ``first_month`` to ``last_month``, then pmax."""
+    clauses, month = [], month_start(first_month)
+    while month <= last_month:
+        clauses.append(f"PARTITION {partition_name(month)} VALUES LESS THAN (TO_DAYS('{next_month(month):%Y-%m-%d}'))")
+        month = next_month(month)
+    clauses.append('PARTITION pmax VALUES LESS THAN MAXVALUE')
+    return clauses
+
+
+def partition_statements(table, existing, first_month, last_month, expired_before=None):
+    """
+    MySQL statements that range-partition ``table`` by month on created_at.
+    With no ``existing`` partitions the table is converted (the primary key
+    must include the partitioning column); otherwise months up to
+    ``last_month`` are split off pmax, and the partitions entirely before
+    ``expired_before`` are dropped.
+    """
+    if not existing:
+        return [
+            f'ALTER TABLE `{table}` DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `created_at`)',
+            f'ALTER TABLE `{table}` PARTITION BY RANGE (TO_DAYS(`created_at`)) '
+            f'({", ".join(partition_definitions(first_month, last_month))})',
+        ]
+
+    statements = []
+    months = sorted(name for name in existing if name != 'pmax')
+    newest = datetime.datetime.strptime(months[-1], 'p%Y%m').date() if months else None
+    start = next_month(newest) if newest else month_start(first_month)
+    if start <= last_month:
+        statements.append(
+            f'ALTER TABLE `{table}` REORGANIZE PARTITION pmax INTO ({", ".join(partition_definitions(start, last_month))})'
+        )
+    if expired_before:
+        expired = [name for name in months if name < partition_name(expired_before)]
+        if expired:
+            statements.append(f'ALTER TABLE `{table}` DROP PARTITION {", ".join(expired)}')
+    return statements
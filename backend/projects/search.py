@@ -0,0 +1,197 @@
+"""
+Full-text search over projects, tasks and comments.
+
+Every save upserts one SearchDocument row (see projects.signals). Matching
+and ranking run in the database through whichever index the backend has:
+
+- SQLite: the FTS5 table projects_searchdocument_fts, kept in sync by
+  triggers, ranked with bm25() (titles weigh more than bodies).
+- MySQL: the FULLTEXT index on (title, body), ranked by MATCH ... AGAINST.
+- Anything else: case-insensitive LIKE over title and body, newest first.
+
+Queries are reduced to word tokens, each matched as a prefix, all required.
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+from .models import Project, SearchDocument, Task
+
+FTS_TABLE = 'projects_searchdocument_fts'
+DOCUMENT_TABLE = SearchDocument._meta.db_table
+MAX_TERMS = 10
+
+
+def document_for(instance):
+    if isinstance(instance, Project):
+        return SearchDocument(
+            kind=SearchDocument.Kind.PROJECT, object_id=instance.id, project_id=instance.id,
+            title=instance.name, body=instance.description,
+        )
+    if isinstance(instance, Task):
+        return SearchDocument(
+            kind=SearchDocument.Kind.TASK, object_id=instance.id, project_id=instance.project_id, task_id=instance.id,
+            title=instance.title, body=f'{instance.description}\n{instance.sprint}',
+        )
+    # TaskComment; the project is copied from its task
+    return SearchDocument(
+        kind=SearchDocument.Kind.COMMENT, object_id=instance.id, project_id=instance.task.project_id,
+        task_id=instance.task_id, body=instance.content,
+    )
+
+
+def index(instances):
+    """
+    Upsert the documents of ``instances`` with one INSERT ... ON CONFLICT
+    (ON DUPLICATE KEY UPDATE on MySQL).
+    """
+    documents = [document_for(instance) for instance in instances]
+    if documents:
+        # MySQL names no conflict target; its unique key on (kind, object_id) is the target
+        unique_fields = ['kind', 'object_id'] if connection.features.supports_update_conflicts_with_target else None
+        SearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=['project_id', 'task_id', 'title', 'body', 'updated_at'],
+        )
+
+
+def engine():
+    if connection.vendor == 'mysql':
+        return 'mysql'
+    if connection.vendor == 'sqlite':
+        return 'fts5'
+    return None
+
+
+def terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def match_expression(words):
+    if engine() == 'mysql':
+        return ' '.join(f'+{word}*' for word in words)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def scope(user):
+    """SQL condition (and params) limiting documents to what ``user`` may see, or None for everything."""
+    projects = Project.objects.visible_to(user)
+    tasks = Task.objects.visible_to(user)
+    if not projects.query.has_filters() and not tasks.query.has_filters():
+        return None
+    project_sql, project_params = projects.values('id').query.sql_with_params()
+    task_sql, task_params = tasks.values('id').query.sql_with_params()
+    return (
+        f"((d.kind = %s AND d.object_id IN ({project_sql})) OR (d.kind <> %s AND d.task_id IN ({task_sql})))",
+        [SearchDocument.Kind.PROJECT, *project_params, SearchDocument.Kind.PROJECT, *task_params],
+    )
+
+
+def search(user, query, kinds=None, limit=20):
+    """
+    Return up to ``limit`` ranked hits visible to ``user`` as dicts with kind,
+    id, project, task, title, snippet and rank.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    expression = match_expression(words)
+    conditions, params = [], []
+    if kinds:
+        conditions.append(f"d.kind IN ({', '.join(['%s'] * len(kinds))})")
+        params.extend(kinds)
+    visible = scope(user)
+    if visible:
+        conditions.append(visible[0])
+        params.extend(visible[1])
+    where = ''.join(f' AND {condition}' for condition in conditions)
+
+    columns = 'd.kind, d.object_id, d.project_id, d.task_id, d.title'
+    if engine() == 'fts5':
+        sql = (
+            f"SELECT {columns}, snippet({FTS_TABLE}, 1, '<mark>', '</mark>', '…', 16), -bm25({FTS_TABLE}, 5.0, 1.0) AS rank "
+            f"FROM {FTS_TABLE} JOIN {DOCUMENT_TABLE} d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s{where} ORDER BY rank DESC LIMIT %s"
+        )
+        params = [expression, *params, limit]
+    elif engine() == 'mysql':
+        sql = (
+            f"SELECT {columns}, SUBSTRING(d.body, 1, 200), MATCH(d.title, d.body) AGAINST (%s IN BOOLEAN MODE) AS `rank` "
+            f"FROM {DOCUMENT_TABLE} d WHERE MATCH(d.title, d.body) AGAINST (%s IN BOOLEAN MODE){where} "
+            f"ORDER BY `rank` DESC LIMIT %s"
+        )
+        params = [expression, expression, *params, limit]
+    else:
+        like = ''.join(' AND (UPPER(d.title) LIKE UPPER(%s) OR UPPER(d.body) LIKE UPPER(%s))' for _ in words)
+        sql = (
+            f"SELECT {columns}, SUBSTRING(d.body, 1, 200), 0 AS rank FROM {DOCUMENT_TABLE} d "
+            f"WHERE 1 = 1{like}{where} ORDER BY d.updated_at DESC LIMIT %s"
+        )
+        params = [value for word in words for value in (f'%{word}%', f'%{word}%')] + params + [limit]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    # Comments have no title of their own; show their task's
+    comment_tasks = {row[3] for row in rows if row[0] == SearchDocument.Kind.COMMENT}
+    task_titles = dict(Task.objects.filter(id__in=comment_tasks).values_list('id', 'title')) if comment_tasks else {}
+    return [
+        {
+            'kind': kind,
+            'id': object_id,
+            'project': project_id,
+            'task': task_id,
+            'title': title or task_titles.get(task_id, ''),
+            'snippet': snippet,
+            'rank': round(rank, 4),
+        }
+        for kind, object_id, project_id, task_id, title, snippet, rank in rows
+    ]
+
+
+def matching_ids(kind, query):
+    """
+    SQL (and params) selecting the object ids of ``kind`` documents matching
+    ``query``, for use as ``id__in=RawSQL(...)`` by FullTextSearchFilter.
+    """
+    words = terms(query)
+    if not words:
+        return None
+    if engine() == 'fts5':
+        return (
+            f"SELECT d.object_id FROM {FTS_TABLE} JOIN {DOCUMENT_TABLE} d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND d.kind = %s",
+            [match_expression(words), kind],
+        )
+    if engine() == 'mysql':
+        return (
+            f"SELECT d.object_id FROM {DOCUMENT_TABLE} d "
+            f"WHERE MATCH(d.title, d.body) AGAINST (%s IN BOOLEAN MODE) AND d.kind = %s",
+            [match_expression(words), kind],
+        )
+    like = ''.join(' AND (UPPER(d.title) LIKE UPPER(%s) OR UPPER(d.body) LIKE UPPER(%s))' for _ in words)
+    return (
+        f"SELECT d.object_id FROM {DOCUMENT_TABLE} d WHERE d.kind = %s{like}",
+        [kind] + [value for word in words for value in (f'%{word}%', f'%{word}%')],
+    )
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    ``?search=`` backed by the full-text index instead of ``LIKE '%term%'``
+    over ``search_fields``. Views name their document kind in ``search_kind``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        subquery = matching_ids(view.search_kind, query)
+        if subquery is None:
+            return queryset
+        return queryset.filter(id__in=RawSQL(*subquery))
@@ -1,7 +1,39 @@
 from rest_framework import serializers
-from .models import Project, Task, AssetLink, Notification, TaskComment, ActivityLog
+from .models import Project, Task, AssetLink, Notification, TaskComment, ActivityLog, ImportJob
 from users.models import User
 
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that accepts ``fields`` and ``expand`` keyword arguments.
+
+    ``fields`` limits the top-level fields that are rendered. ``expand``, when
+    given, limits which of the ``expandable_fields`` relations are embedded;
+    dotted paths such as ``tasks.comments`` expand relations of nested
+    serializers. Leaving both as ``None`` renders the full representation.
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.restrict(fields=fields, expand=expand)
+
+    def restrict(self, fields=None, expand=None):
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if expand is None:
+            return
+        for name in self.expandable_fields:
+            if name not in self.fields:
+                continue
+            if name not in expand:
+                self.fields.pop(name)
+                continue
+            nested = getattr(self.fields[name], 'child', self.fields[name])
+            if isinstance(nested, DynamicFieldsModelSerializer):
+                prefix = f'{name}.'
+                nested.restrict(expand={path[len(prefix):] for path in expand if path.startswith(prefix)})
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -12,7 +44,18 @@ class TaskCommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = TaskComment
         fields = '__all__'
-        read_only_fields = ['user', 'task']
+        read_only_fields = ['user']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if self.instance is not None:
+            # Set on create only: a comment never moves to another task
+            fields['task'].read_only = True
+        elif request is not None:
+            # Tasks the author cannot see look like they do not exist
+            fields['task'].queryset = Task.objects.visible_to(request.user)
+        return fields
 
 class ActivityLogSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -20,7 +63,7 @@ class ActivityLogSerializer(serializers.ModelSerializer):
         model = ActivityLog
         fields = '__all__'
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(DynamicFieldsModelSerializer):
     assigned_to = UserSerializer(read_only=True)
     assigned_to_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.filter(role=User.Role.DEVELOPER),
@@ -31,16 +74,77 @@ class TaskSerializer(serializers.ModelSerializer):
     )
     comments = TaskCommentSerializer(many=True, read_only=True)
 
+    expandable_fields = ('comments',)
+
     class Meta:
         model = Task
         fields = '__all__'
 
+class TaskBulkUpdateItemSerializer(serializers.Serializer):
+    """
+    One entry of a bulk task update. Assignees are checked for the whole batch
+    in TaskViewSet.bulk_update, so assigned_to_id is a plain integer here.
+    """
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Task.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Task.Priority.choices, required=False)
+    sprint = serializers.CharField(max_length=100, allow_blank=True, required=False)
+    due_date = serializers.DateField(allow_null=True, required=False)
+    assigned_to_id = serializers.IntegerField(allow_null=True, required=False)
+
+class TaskImportRowSerializer(serializers.Serializer):
+    """
+    One row of a task import. The project and assignee are names; the
+    importer resolves them for a whole batch at once (see projects.imports).
+    """
+    title = serializers.CharField(max_length=255)
+    project = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_blank=True, required=False, default='')
+    status = serializers.ChoiceField(choices=Task.Status.choices, required=False, default=Task.Status.TODO)
+    priority = serializers.ChoiceField(choices=Task.Priority.choices, required=False, default=Task.Priority.MEDIUM)
+    sprint = serializers.CharField(max_length=100, allow_blank=True, required=False, default='')
+    due_date = serializers.DateField(allow_null=True, required=False, default=None)
+    assigned_to = serializers.CharField(max_length=150, required=False, default=None)
+    github_pr_url = serializers.URLField(allow_null=True, required=False, default=None)
+
+class ProjectImportRowSerializer(serializers.Serializer):
+    """One row of a project import; ``pm`` is a username."""
+    name = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_blank=True, required=False, default='')
+    start_date = serializers.DateField()
+    end_date = serializers.DateField(allow_null=True, required=False, default=None)
+    pm = serializers.CharField(max_length=150, required=False, default=None)
+
+    def validate(self, data):
+        if data['end_date'] and data['end_date'] < data['start_date']:
+            raise serializers.ValidationError({'end_date': ['Must not be before start_date.']})
+        return data
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    file = serializers.FileField(write_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'kind', 'format', 'status', 'file', 'dry_run', 'rows_processed', 'rows_imported', 'rows_failed',
+            'errors', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = [
+            'format', 'status', 'rows_processed', 'rows_imported', 'rows_failed', 'errors', 'created_at',
+            'started_at', 'finished_at',
+        ]
+
+    def validate_file(self, file):
+        if ImportJob.format_for(file.name) is None:
+            raise serializers.ValidationError('Upload a .csv, .jsonl or .json file.')
+        return file
+
 class AssetLinkSerializer(serializers.ModelSerializer):
     class Meta:
         model = AssetLink
         fields = '__all__'
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(DynamicFieldsModelSerializer):
     pm = UserSerializer(read_only=True)
     pm_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.filter(role=User.Role.PM),
@@ -52,6 +156,8 @@ class ProjectSerializer(serializers.ModelSerializer):
     tasks = TaskSerializer(many=True, read_only=True)
     assets = AssetLinkSerializer(many=True, read_only=True)
 
+    expandable_fields = ('tasks', 'assets')
+
     class Meta:
         model = Project
         fields = '__all__'
@@ -0,0 +1,256 @@
+from collections import Counter, defaultdict
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from users.models import User
+from . import cache as response_cache, realtime, search
+from .models import Project, ProjectMembership, Task, TaskComment, AssetLink, Notification, SearchDocument
+from .serializers import UserSerializer
+
+# Sent by bulk write paths that bypass Model.save(), with ``tasks`` being the
+# updated instances (their loaded_value() still holds the previous columns).
+tasks_bulk_updated = Signal()
+# Sent after Notification.objects.bulk_create() with the new ``notifications``.
+notifications_bulk_created = Signal()
+# Sent after Task/Project.objects.bulk_create() (see projects.imports) with
+# the new ``tasks`` / ``projects``, primary keys set.
+tasks_bulk_created = Signal()
+projects_bulk_created = Signal()
+
+EMBEDDED_USER_FIELDS = set(UserSerializer.Meta.fields)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project(sender, instance, **kwargs):
+    previous_pm = instance.loaded_value('pm_id')
+    response_cache.invalidate(response_cache.scopes_for_projects([instance.id], [instance.pm_id, previous_pm]))
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task(sender, instance, **kwargs):
+    invalidate_tasks([instance])
+
+
+@receiver(tasks_bulk_updated)
+@receiver(tasks_bulk_created)
+def invalidate_bulk_tasks(sender, tasks, **kwargs):
+    invalidate_tasks(tasks)
+
+
+@receiver(projects_bulk_created)
+def invalidate_bulk_projects(sender, projects, **kwargs):
+    response_cache.invalidate(response_cache.scopes_for_projects(
+        [project.id for project in projects], [project.pm_id for project in projects]
+    ))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user(sender, instance, created, update_fields=None, **kwargs):
+    # Projects and tasks embed their PM and assignees (UserSerializer); a new
+    # user is in nothing yet, and saves of other columns (last_login) show nowhere
+    if created or (update_fields is not None and not set(update_fields) & EMBEDDED_USER_FIELDS):
+        return
+    project_ids = {
+        *Project.objects.filter(pm=instance).values_list('id', flat=True),
+        *ProjectMembership.objects.filter(user=instance).values_list('project_id', flat=True),
+    }
+    response_cache.invalidate(response_cache.scopes_for_projects(project_ids, [instance.pk]))
+
+
+@receiver(post_save, sender=Task)
+def push_task_status(sender, instance, created, **kwargs):
+    previous = None if created else instance.loaded_value('status')
+    if created or previous != instance.status:
+        realtime.task_status_changed(instance, previous)
+
+
+@receiver(tasks_bulk_updated)
+def push_bulk_task_status(sender, tasks, **kwargs):
+    for task in tasks:
+        previous = task.loaded_value('status')
+        if previous != task.status:
+            realtime.task_status_changed(task, previous)
+
+
+@receiver(post_save, sender=Notification)
+def push_notification(sender, instance, created, **kwargs):
+    if created:
+        realtime.notification_created(instance)
+
+
+@receiver(notifications_bulk_created)
+def push_bulk_notifications(sender, notifications, **kwargs):
+    for notification in notifications:
+        realtime.notification_created(notification)
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_notification(sender, instance, created, **kwargs):
+    was_unread = False if created else not instance.loaded_value('is_read', instance.is_read)
+    delta = int(not instance.is_read) - int(was_unread)
+    if delta:
+        User.adjust_unread_notifications({instance.user_id: delta})
+
+
+@receiver(notifications_bulk_created)
+def count_unread_bulk_notifications(sender, notifications, **kwargs):
+    User.adjust_unread_notifications(Counter(n.user_id for n in notifications if not n.is_read))
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, origin=None, **kwargs):
+    # Deleting the user takes the counter with it
+    if not instance.is_read and not isinstance(origin, User):
+        User.adjust_unread_notifications({instance.user_id: -1})
+
+
+@receiver(post_save, sender=Task)
+def track_membership(sender, instance, created, **kwargs):
+    ProjectMembership.adjust(membership_deltas([instance], created))
+
+
+@receiver(tasks_bulk_updated)
+def track_bulk_memberships(sender, tasks, **kwargs):
+    ProjectMembership.adjust(membership_deltas(tasks))
+
+
+@receiver(tasks_bulk_created)
+def track_created_memberships(sender, tasks, **kwargs):
+    ProjectMembership.adjust(membership_deltas(tasks, created=True))
+
+
+@receiver(post_delete, sender=Task)
+def untrack_membership(sender, instance, **kwargs):
+    # Reassigning tasks when a user or project is deleted needs nothing:
+    # their memberships are deleted with them
+    ProjectMembership.adjust({(instance.assigned_to_id, instance.project_id): -1})
+
+
+@receiver(post_save, sender=Task)
+def roll_up_task(sender, instance, created, **kwargs):
+    Project.adjust_rollups(rollup_deltas([instance], created=created))
+
+
+@receiver(tasks_bulk_updated)
+def roll_up_bulk_tasks(sender, tasks, **kwargs):
+    Project.adjust_rollups(rollup_deltas(tasks))
+
+
+@receiver(tasks_bulk_created)
+def roll_up_created_tasks(sender, tasks, **kwargs):
+    Project.adjust_rollups(rollup_deltas(tasks, created=True))
+
+
+@receiver(post_delete, sender=Task)
+def roll_up_deleted_task(sender, instance, origin=None, **kwargs):
+    # Deleting the project takes its rollups with it
+    if not isinstance(origin, Project):
+        Project.adjust_rollups(rollup_deltas([instance], deleted=True))
+
+
+def rollup_deltas(tasks, created=False, deleted=False):
+    """``{project_id: {field: delta}}`` over every project the tasks were or are in."""
+    today = timezone.localdate()
+    due_date_field = Task._meta.get_field('due_date')
+    deltas = defaultdict(Counter)
+    for task in tasks:
+        current = (task.project_id, task.status, task.due_date)
+        if created:
+            states = [(current, 1)]
+        elif deleted:
+            states = [(current, -1)]
+        else:
+            # Columns that were never loaded cannot have changed
+            previous = (
+                task.loaded_value('project_id', task.project_id),
+                task.loaded_value('status', task.status),
+                task.loaded_value('due_date', task.due_date),
+            )
+            states = [(previous, -1), (current, 1)]
+        for (project_id, status, due_date), sign in states:
+            deltas[project_id][Project.status_rollups[status]] += sign
+            # Assigned values may still be strings
+            due_date = due_date_field.to_python(due_date)
+            if due_date is not None and due_date < today and status != Task.Status.DONE:
+                deltas[project_id]['tasks_overdue'] += sign
+    return deltas
+
+
+def membership_deltas(tasks, created=False):
+    deltas = Counter()
+    for task in tasks:
+        current = (task.assigned_to_id, task.project_id)
+        if created:
+            deltas[current] += 1
+            continue
+        # Columns that were never loaded cannot have changed
+        previous = (
+            task.loaded_value('assigned_to_id', task.assigned_to_id),
+            task.loaded_value('project_id', task.project_id),
+        )
+        if previous != current:
+            deltas[previous] -= 1
+            deltas[current] += 1
+    return deltas
+
+
+def invalidate_tasks(tasks):
+    project_ids, user_ids = set(), set()
+    for task in tasks:
+        project_ids.update((task.project_id, task.loaded_value('project_id')))
+        user_ids.update((task.assigned_to_id, task.loaded_value('assigned_to_id')))
+    response_cache.invalidate(response_cache.scopes_for_projects(project_ids, user_ids))
+
+
+@receiver(post_save, sender=TaskComment)
+@receiver(post_delete, sender=TaskComment)
+def invalidate_task_comment(sender, instance, **kwargs):
+    project_id = Task.objects.filter(id=instance.task_id).values_list('project_id', flat=True).first()
+    response_cache.invalidate(response_cache.scopes_for_projects([project_id]))
+
+
+@receiver(post_save, sender=AssetLink)
+@receiver(post_delete, sender=AssetLink)
+def invalidate_asset(sender, instance, **kwargs):
+    response_cache.invalidate(response_cache.scopes_for_projects([instance.project_id]))
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=TaskComment)
+def index_document(sender, instance, created, **kwargs):
+    search.index([instance])
+    if sender is Task and not created and instance.loaded_value('project_id') != instance.project_id:
+        # The task's comments move with it
+        SearchDocument.objects.filter(task_id=instance.id).update(project_id=instance.project_id)
+
+
+@receiver(tasks_bulk_updated)
+@receiver(tasks_bulk_created)
+def index_bulk_tasks(sender, tasks, **kwargs):
+    search.index(tasks)
+
+
+@receiver(projects_bulk_created)
+def index_bulk_projects(sender, projects, **kwargs):
+    search.index(projects)
+
+
+@receiver(post_delete, sender=Project)
+def unindex_project(sender, instance, **kwargs):
+    SearchDocument.objects.filter(project_id=instance.id).delete()
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task(sender, instance, **kwargs):
+    # The task's own document and its comments' share task_id
+    SearchDocument.objects.filter(task_id=instance.id).delete()
+
+
+@receiver(post_delete, sender=TaskComment)
+def unindex_comment(sender, instance, **kwargs):
+    SearchDocument.objects.filter(kind=SearchDocument.Kind.COMMENT, object_id=instance.id).delete()
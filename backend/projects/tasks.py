@@ -1,16 +1,22 @@
 from celery import shared_task
-from .models import Notification
+from .notifications import notify
 from users.models import User
 
 @shared_task
 def send_task_notification(user_id, message):
-    try:
-        user = User.objects.get(id=user_id)
-        Notification.objects.create(user=user, message=message)
-        # Ideally, we would also trigger a WebSocket event or send an email here.
-        return f"Notification created for {user.username}"
-    except User.DoesNotExist:
+    result = notify(message, user_ids=[user_id])
+    if not result['recipients']:
         return "User not found"
+    return f"Notification created for user {user_id}"
+
+@shared_task
+def send_bulk_notification(message, user_ids=(), project_id=None, roles=None):
+    """
+    Notify many users with one broker message: explicit ``user_ids`` plus,
+    when ``project_id`` is given, the project's PM and assignees, optionally
+    narrowed to ``roles``.
+    """
+    return notify(message, user_ids=user_ids, project_id=project_id, roles=roles)
 
 @shared_task
 def send_email_reminder(user_id, task_title, due_date):
@@ -21,3 +27,40 @@ def send_email_reminder(user_id, task_title, due_date):
         return f"Email sent to {user.email}"
     except User.DoesNotExist:
         return "User not found"
+
+@shared_task
+def sweep_due_date_reminders():
+    """Scheduled by CELERY_BEAT_SCHEDULE; see projects.reminders."""
+    from .reminders import sweep
+    result = sweep()
+    return f"Recorded {result['reminders']} reminders, sent {result['digests']} digests"
+
+@shared_task
+def apply_retention():
+    """Scheduled by CELERY_BEAT_SCHEDULE; see projects.retention."""
+    from .retention import POLICIES, archive_expired
+    moved = {policy.label: archive_expired(policy) for policy in POLICIES}
+    return f"Archived {moved}"
+
+@shared_task
+def refresh_overdue_rollups():
+    """Scheduled by CELERY_BEAT_SCHEDULE: tasks fall overdue without being saved."""
+    from . import cache as response_cache
+    from .models import Project
+    changed = Project.refresh_overdue()
+    response_cache.invalidate(response_cache.scopes_for_projects(changed))
+    return f"Recounted overdue tasks of {len(changed)} projects"
+
+@shared_task
+def write_activity_logs(entries):
+    from .activity import deserialize, write_entries
+    written = write_entries([deserialize(entry) for entry in entries])
+    return f"Wrote {written} of {len(entries)} activity log entries"
+
+@shared_task
+def run_import(job_id):
+    """Queued by ImportJobViewSet for uploads over IMPORT_INLINE_MAX_BYTES."""
+    from .imports import run_job
+    from .models import ImportJob
+    job = run_job(ImportJob.objects.select_related('user').get(id=job_id))
+    return f"Imported {job.rows_imported} of {job.rows_processed} rows ({job.rows_failed} failed)"
@@ -1,3 +1,1718 @@
-from django.test import TestCase
+import copy
+import csv
+import datetime
+import gzip
+import io
+import json
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import update_last_login
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import ConnectionHandler, OperationalError, connection, connections, transaction
+from asgiref.sync import iscoroutinefunction
+from celery import shared_task
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from company_sys_backend import profiling
+from company_sys_backend.asgi import application
+from company_sys_backend.db import pool
+from company_sys_backend.replicas import PIN_KEY, ReplicaReadTask, read_from_replica
+from users.models import User
+from users.views import CustomTokenObtainPairSerializer
+from .activity import ActivityLogBuffer, log_activity
+from .benchmarks import FLOWS, percentile, run_concurrent
+from .datasets import generate
+from .notifications import notify
+from .models import (
+    Project, Task, AssetLink, Notification, TaskComment, ActivityLog, DueDateReminder,
+    ArchivedNotification, ArchivedActivityLog, SearchDocument, ImportJob, ProjectMembership,
+)
+from .imports import Importer, read_rows
+from .signals import tasks_bulk_created
+from .reminders import owed_reminders, sweep
+from .retention import POLICIES, archive_expired, partition_statements
+
+
+class ListQueryCountTests(APITestCase):
+    """
+    List endpoints must run a fixed number of queries whatever the row count,
+    so the prefetch plans in the viewsets have to keep up with the serializers.
+    """
+    sizes = (10, 100, 1000)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='x', role=User.Role.ADMIN)
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+
+    def seed(self, count):
+        # bulk_create skips the signals that invalidate cached responses
+        cache.clear()
+        Project.objects.all().delete()
+        ActivityLog.objects.all().delete()
+        projects = Project.objects.bulk_create(
+            Project(name=f'Project {i}', start_date=datetime.date(2026, 1, 1), pm=self.pm)
+            for i in range(count)
+        )
+        AssetLink.objects.bulk_create(
+            AssetLink(project=project, asset_type=AssetLink.AssetType.GITHUB, url='https://github.com/example/repo')
+            for project in projects
+        )
+        tasks = Task.objects.bulk_create(
+            Task(project=project, title=f'Task {i}', assigned_to=self.dev)
+            for i, project in enumerate(projects)
+        )
+        tasks_bulk_created.send(sender=Task, tasks=tasks)
+        TaskComment.objects.bulk_create(
+            TaskComment(task=task, user=self.pm, content='Looks good') for task in tasks
+        )
+        ActivityLog.objects.bulk_create(
+            ActivityLog(user=self.pm, action=f'Created Task: {task.title}', target_type='Task', target_id=task.id)
+            for task in tasks
+        )
+
+    def assertListQueries(self, url, user, num, params=None):
+        self.client.force_authenticate(user)
+        for count in self.sizes:
+            with self.subTest(rows=count):
+                self.seed(count)
+                with self.assertNumQueries(num):
+                    response = self.client.get(url, {'page_size': count, **(params or {})})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), count)
+
+    def test_project_list(self):
+        # projects+pm, tasks+assignee, comments+author, assets
+        self.assertListQueries('/api/projects/', self.admin, 4)
+
+    def test_project_list_for_developer(self):
+        self.assertListQueries('/api/projects/', self.dev, 4)
+
+    def test_task_list(self):
+        # tasks+assignee, comments+author
+        self.assertListQueries('/api/tasks/', self.admin, 2)
+
+    def test_project_list_without_expansions(self):
+        self.assertListQueries('/api/projects/', self.admin, 1, {'expand': ''})
+
+    def test_task_list_sparse_fieldset(self):
+        self.assertListQueries('/api/tasks/', self.dev, 1, {'fields': 'id,title,status,priority,due_date'})
+
+    def test_task_comment_list(self):
+        # ETag aggregate, comments+author
+        self.assertListQueries('/api/task-comments/', self.admin, 2)
+
+    def test_activity_log_list(self):
+        # ETag aggregate, logs+user
+        self.assertListQueries('/api/activity-logs/', self.admin, 2)
+
+
+class SparseFieldsetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='x', role=User.Role.ADMIN)
+        project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1))
+        task = Task.objects.create(project=project, title='Launch')
+        TaskComment.objects.create(task=task, user=cls.admin, content='Go')
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def test_fields_limits_task_representation(self):
+        response = self.client.get('/api/tasks/', {'fields': 'id,title,status'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title', 'status'})
+
+    def test_expand_selects_nested_relations(self):
+        response = self.client.get('/api/projects/', {'expand': 'tasks'})
+        project = response.data['results'][0]
+        self.assertNotIn('assets', project)
+        self.assertNotIn('comments', project['tasks'][0])
+
+        response = self.client.get('/api/projects/', {'expand': 'tasks,tasks.comments'})
+        self.assertEqual(response.data['results'][0]['tasks'][0]['comments'][0]['content'], 'Go')
+
+    def test_full_representation_by_default(self):
+        project = self.client.get('/api/projects/').data['results'][0]
+        self.assertIn('assets', project)
+        self.assertIn('comments', project['tasks'][0])
+
+
+@override_settings(ACTIVITY_LOG_BACKEND='sync')
+class ActivityLogWriterTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1))
+        cls.task = Task.objects.create(project=project, title='Launch', assigned_to=cls.dev)
+
+    def test_entries_written_after_commit(self):
+        self.client.force_authenticate(self.dev)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/tasks/{self.task.id}/', {'status': 'IN_PROGRESS'})
+            self.assertFalse(ActivityLog.objects.exists())
+        log = ActivityLog.objects.get()
+        self.assertEqual(log.action, 'Moved Task: Launch from TODO to IN_PROGRESS')
+        self.assertEqual((log.user, log.target_type, log.target_id), (self.dev, 'Task', self.task.id))
+
+    def test_long_actions_fit_the_column(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            log_activity(self.dev, f'Created Task: {"x" * 255} under Project: Apollo', 'Task', self.task.id)
+        self.assertEqual(len(ActivityLog.objects.get().action), 255)
+
+    def test_entries_dropped_on_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                log_activity(self.dev, 'Doomed', 'Task', self.task.id)
+                raise RuntimeError
+        self.assertFalse(ActivityLog.objects.exists())
+
+
+class ActivityLogBufferTests(TestCase):
+    def entries(self, count, now):
+        return [
+            {'user_id': None, 'action': f'Event {i}', 'target_type': 'Task', 'target_id': i, 'created_at': now}
+            for i in range(count)
+        ]
+
+    def test_flush_writes_queued_entries_in_one_batch(self):
+        buffer = ActivityLogBuffer()
+        now = timezone.now()
+        with mock.patch.object(buffer, '_ensure_flusher'):
+            buffer.add(self.entries(5, now))
+        self.assertEqual(len(buffer), 5)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(buffer.flush(), 5)
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('INSERT')]), 1)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(ActivityLog.objects.filter(created_at=now).count(), 5)
+
+    def test_rejected_rows_are_dropped_and_the_rest_written(self):
+        buffer = ActivityLogBuffer()
+        now = timezone.now()
+        entries = self.entries(4, now)
+        # Rejected on its own, like an over-long action under MySQL strict mode
+        entries[1]['action'] = None
+        with mock.patch.object(buffer, '_ensure_flusher'):
+            buffer.add(entries)
+        with self.assertLogs('projects.activity', 'ERROR'):
+            self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(ActivityLog.objects.filter(created_at=now).count(), 3)
+
+    @override_settings(ACTIVITY_LOG_BUFFER_MAX=10)
+    def test_buffer_is_capped_while_the_database_is_away(self):
+        buffer = ActivityLogBuffer()
+        now = timezone.now()
+        with mock.patch.object(buffer, '_ensure_flusher'), self.assertLogs('projects.activity', 'ERROR'):
+            buffer.add(self.entries(8, now))
+            buffer.add(self.entries(8, now))
+        self.assertEqual(len(buffer), 10)
+        with mock.patch('projects.activity.write_entries', side_effect=OperationalError), self.assertRaises(OperationalError):
+            buffer.flush()
+        self.assertEqual(len(buffer), 10)
+
+
+@override_settings(ACTIVITY_LOG_BACKEND='sync')
+class TaskBulkUpdateTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        cls.other_dev = User.objects.create_user(username='dev2', password='x', role=User.Role.DEVELOPER)
+        project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        cls.tasks = Task.objects.bulk_create(
+            Task(project=project, title=f'Task {i}', assigned_to=cls.dev) for i in range(200)
+        )
+        tasks_bulk_created.send(sender=Task, tasks=cls.tasks)
+
+    def test_sprint_planning_in_one_request(self):
+        self.client.force_authenticate(self.pm)
+        payload = [
+            {'id': task.id, 'sprint': 'Sprint 7', 'status': 'IN_PROGRESS', 'assigned_to_id': self.other_dev.id}
+            for task in self.tasks
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.patch('/api/tasks/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        # Assignee check, locked SELECT, a few UPDATE batches, a search index
+        # upsert and the membership counters, never one per task
+        self.assertLess(len(queries), 15)
+        self.assertEqual(len(response.data['updated']), 200)
+        self.assertEqual(Task.objects.filter(sprint='Sprint 7', status='IN_PROGRESS', assigned_to=self.other_dev).count(), 200)
+        self.assertEqual(ActivityLog.objects.filter(action__startswith='Moved Task').count(), 200)
+
+    def test_scoping_applies_to_every_task(self):
+        self.client.force_authenticate(self.other_dev)
+        response = self.client.patch('/api/tasks/bulk/', [{'id': self.tasks[0].id, 'status': 'DONE'}], format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Task.objects.filter(status='DONE').exists())
+
+    def test_invalid_entries_reject_the_whole_batch(self):
+        self.client.force_authenticate(self.pm)
+        payload = [
+            {'id': self.tasks[0].id, 'status': 'DONE'},
+            {'id': self.tasks[1].id, 'assigned_to_id': self.pm.id},
+        ]
+        response = self.client.patch('/api/tasks/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('assigned_to_id', response.data)
+        self.assertFalse(Task.objects.filter(status='DONE').exists())
+
+
+class TaskStatsTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='x', role=User.Role.ADMIN)
+        cls.ceo = User.objects.create_user(username='ceo', password='x', role=User.Role.CEO)
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.other_pm = User.objects.create_user(username='pm2', password='x', role=User.Role.PM)
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        cls.other_dev = User.objects.create_user(username='dev2', password='x', role=User.Role.DEVELOPER)
+        cls.apollo = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        cls.zephyr = Project.objects.create(name='Zephyr', start_date=datetime.date(2026, 1, 1), pm=cls.other_pm)
+        Project.objects.create(name='Idle', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        today = timezone.localdate()
+        day = datetime.timedelta(days=1)
+        for project, title, assignee, status, priority, due_date in [
+            (cls.apollo, 'Late', cls.dev, 'TODO', 'HIGH', today - day),
+            (cls.apollo, 'Late but done', cls.dev, 'DONE', 'HIGH', today - day),
+            (cls.apollo, 'Next', cls.other_dev, 'IN_PROGRESS', 'MEDIUM', today + day),
+            (cls.zephyr, 'Very late', cls.other_dev, 'REVIEW', 'MEDIUM', today - 5 * day),
+            (cls.zephyr, 'Shipped', None, 'DONE', 'MEDIUM', None),
+        ]:
+            Task.objects.create(
+                project=project, title=title, assigned_to=assignee, status=status, priority=priority, due_date=due_date,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def stats(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/tasks/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_everything_for_ceo_and_admin(self):
+        for user in (self.ceo, self.admin):
+            stats = self.stats(user)
+            self.assertEqual((stats['projects'], stats['tasks'], stats['overdue']), (3, 5, 2))
+            self.assertEqual(stats['by_status'], {'TODO': 1, 'IN_PROGRESS': 1, 'REVIEW': 1, 'DONE': 2})
+            self.assertEqual(stats['project_completion'], [
+                {'project': self.apollo.id, 'name': 'Apollo', 'total': 3, 'done': 1},
+                {'project': self.zephyr.id, 'name': 'Zephyr', 'total': 2, 'done': 1},
+            ])
+
+    def test_pm_sees_their_projects(self):
+        stats = self.stats(self.pm)
+        # Projects without tasks count, but have no completion row
+        self.assertEqual((stats['projects'], stats['tasks'], stats['overdue']), (2, 3, 1))
+        self.assertEqual(stats['project_completion'], [{'project': self.apollo.id, 'name': 'Apollo', 'total': 3, 'done': 1}])
+
+    def test_developer_sees_assigned_tasks(self):
+        stats = self.stats(self.other_dev)
+        self.assertEqual((stats['projects'], stats['tasks'], stats['overdue']), (2, 2, 1))
+        self.assertEqual(stats['project_completion'], [
+            {'project': self.apollo.id, 'name': 'Apollo', 'total': 1, 'done': 0},
+            {'project': self.zephyr.id, 'name': 'Zephyr', 'total': 1, 'done': 0},
+        ])
+
+    def test_buckets_are_zero_filled(self):
+        stats = self.stats(self.dev)
+        self.assertEqual(stats['by_status'], {'TODO': 1, 'IN_PROGRESS': 0, 'REVIEW': 0, 'DONE': 1})
+        self.assertEqual(stats['by_priority'], {'LOW': 0, 'MEDIUM': 0, 'HIGH': 2, 'URGENT': 0})
+        # The late task that is done is not overdue
+        self.assertEqual(stats['overdue'], 1)
+
+        stats = self.stats(User.objects.create_user(username='new', password='x', role=User.Role.DEVELOPER))
+        self.assertEqual(stats['by_status'], dict.fromkeys(Task.Status.values, 0))
+        self.assertEqual(stats['by_priority'], dict.fromkeys(Task.Priority.values, 0))
+        self.assertEqual((stats['projects'], stats['tasks'], stats['overdue'], stats['project_completion']), (0, 0, 0, []))
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        self.client.force_authenticate(self.admin)
+        # by_status, by_priority, overdue, project_completion, projects
+        with self.assertNumQueries(5):
+            self.client.get('/api/tasks/stats/')
+        Task.objects.bulk_create(
+            Task(project=project, title=f'Task {i}', priority=priority)
+            for i in range(50)
+            for project, priority in ((self.apollo, 'LOW'), (self.zephyr, 'URGENT'))
+        )
+        cache.clear()
+        with self.assertNumQueries(5):
+            self.assertEqual(self.client.get('/api/tasks/stats/').data['tasks'], 105)
+
+
+class TaskCommentTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        cls.task = Task.objects.create(project=project, title='Launch', assigned_to=cls.dev)
+        cls.other = Task.objects.create(project=project, title='Land', assigned_to=cls.dev)
+        cls.hidden = Task.objects.create(project=project, title='Budget')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.dev)
+
+    def test_comments_go_on_visible_tasks(self):
+        response = self.client.post('/api/task-comments/', {'task': self.task.id, 'content': 'On it'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['task'], response.data['user']['id']), (self.task.id, self.dev.id))
+
+        response = self.client.post('/api/task-comments/', {'task': self.hidden.id, 'content': 'Peek'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('task', response.data)
+        self.assertFalse(TaskComment.objects.filter(task=self.hidden).exists())
+
+    def test_comments_cannot_be_moved(self):
+        comment = TaskComment.objects.create(task=self.task, user=self.dev, content='On it')
+        response = self.client.patch(f'/api/task-comments/{comment.id}/', {'task': self.other.id, 'content': 'Done'})
+        self.assertEqual(response.status_code, 200)
+        comment.refresh_from_db()
+        self.assertEqual((comment.task_id, comment.content), (self.task.id, 'Done'))
+
+
+class ResponseCacheTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='x', role=User.Role.ADMIN)
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        cls.other_dev = User.objects.create_user(username='dev2', password='x', role=User.Role.DEVELOPER)
+        cls.project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        cls.task = Task.objects.create(project=cls.project, title='Launch', assigned_to=cls.dev)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, user, url):
+        self.client.force_authenticate(user)
+        return self.client.get(url)
+
+    def test_repeated_reads_are_served_from_cache(self):
+        self.assertEqual(self.get(self.pm, '/api/projects/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.get(self.pm, '/api/projects/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['results'][0]['name'], 'Apollo')
+        self.assertEqual(self.get(self.admin, '/api/cache-stats/').data['hits'], 1)
+
+    def test_scopes_are_cached_separately(self):
+        self.get(self.admin, '/api/tasks/')
+        response = self.get(self.other_dev, '/api/tasks/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'], [])
+
+    def test_task_change_invalidates_every_affected_scope(self):
+        for user in (self.admin, self.pm, self.dev):
+            self.get(user, '/api/projects/')
+        self.client.force_authenticate(self.pm)
+        self.client.patch(f'/api/tasks/{self.task.id}/', {'assigned_to_id': self.other_dev.id})
+
+        for user in (self.admin, self.pm):
+            response = self.get(user, '/api/projects/')
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertEqual(response.data['results'][0]['tasks'][0]['assigned_to']['id'], self.other_dev.id)
+        self.assertEqual(self.get(self.dev, '/api/projects/').data['results'], [])
+        self.assertEqual(len(self.get(self.other_dev, '/api/projects/').data['results']), 1)
+
+    def test_user_change_invalidates_every_scope_showing_them(self):
+        for user in (self.admin, self.pm, self.dev):
+            self.get(user, '/api/projects/')
+        self.dev.username = 'dev-renamed'
+        self.dev.save()
+
+        for user in (self.admin, self.pm, self.dev):
+            response = self.get(user, '/api/projects/')
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertEqual(response.data['results'][0]['tasks'][0]['assigned_to']['username'], 'dev-renamed')
+
+    def test_saves_of_unshown_user_fields_leave_the_cache(self):
+        self.get(self.pm, '/api/projects/')
+        update_last_login(None, self.dev)
+        self.assertEqual(self.get(self.pm, '/api/projects/')['X-Cache'], 'HIT')
+
+    def test_comment_invalidates_cached_task(self):
+        self.get(self.dev, f'/api/tasks/{self.task.id}/')
+        TaskComment.objects.create(task=self.task, user=self.pm, content='Done?')
+        response = self.get(self.dev, f'/api/tasks/{self.task.id}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['comments'][0]['content'], 'Done?')
+
+
+class ConditionalGetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        cls.notification = Notification.objects.create(user=cls.pm, message='Welcome')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.pm)
+
+    def assertRevalidates(self, url, change, queries=None):
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(queries if queries is not None else 0 if url.startswith('/api/projects/') else 1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_project_list(self):
+        def rename():
+            self.project.name = 'Artemis'
+            self.project.save()
+        self.assertRevalidates('/api/projects/', rename)
+
+    def test_project_detail_after_task_added(self):
+        self.assertRevalidates(
+            f'/api/projects/{self.project.id}/',
+            lambda: Task.objects.create(project=self.project, title='Launch'),
+        )
+
+    def test_notification_list(self):
+        self.assertRevalidates(
+            '/api/notifications/',
+            lambda: self.client.post(f'/api/notifications/{self.notification.id}/mark_read/'),
+        )
+
+    def test_project_list_after_pm_renamed(self):
+        def rename():
+            self.pm.username = 'pm-renamed'
+            self.pm.save()
+        self.assertRevalidates('/api/projects/', rename)
+        self.assertEqual(self.client.get('/api/projects/').data['results'][0]['pm']['username'], 'pm-renamed')
+
+    def test_comment_list_after_author_renamed(self):
+        author = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        task = Task.objects.create(project=self.project, title='Launch', assigned_to=author)
+        TaskComment.objects.create(task=task, user=author, content='On it')
+
+        def rename():
+            author.email = 'dev@example.com'
+            author.save()
+        # The task filter checks the task exists, then one aggregate
+        self.assertRevalidates(f'/api/task-comments/?task={task.id}', rename, queries=2)
+
+
+class NotificationFanOutTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.ceo = User.objects.create_user(username='ceo', password='x', role=User.Role.CEO)
+        cls.devs = User.objects.bulk_create(
+            User(username=f'dev{i}', role=User.Role.DEVELOPER) for i in range(50)
+        )
+        cls.project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        Task.objects.bulk_create(
+            Task(project=cls.project, title=f'Task {i}', assigned_to=dev) for i, dev in enumerate(cls.devs)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_project_broadcast_runs_fixed_queries(self):
+        with self.assertNumQueries(5):  # audience SELECT, SAVEPOINT, INSERT, unread counter UPDATE, RELEASE
+            result = notify('Release moved', project_id=self.project.id)
+        self.assertEqual((result['recipients'], result['created']), (51, 51))
+        self.assertEqual(Notification.objects.filter(message='Release moved').count(), 51)
+
+    def test_roles_narrow_the_audience(self):
+        result = notify('PM sync', user_ids=[self.ceo.id], project_id=self.project.id, roles=[User.Role.PM, User.Role.CEO])
+        self.assertEqual(set(Notification.objects.values_list('user_id', flat=True)), {self.pm.id, self.ceo.id})
+        self.assertEqual(result['created'], 2)
+
+    def test_duplicates_within_window_are_coalesced(self):
+        notify('Build failed', user_ids=[self.ceo.id, self.pm.id])
+        result = notify('Build failed', user_ids=[self.ceo.id, self.devs[0].id])
+        self.assertEqual((result['created'], result['coalesced']), (1, 1))
+        self.assertEqual(Notification.objects.filter(user=self.ceo).count(), 1)
+
+    def test_concurrent_broadcasts_claim_each_recipient_once(self):
+        notify('Deploy started', user_ids=[self.ceo.id])
+        # A broadcast that read the cache before the first one claimed the CEO
+        with mock.patch.object(cache, 'get_many', return_value={}):
+            result = notify('Deploy started', user_ids=[self.ceo.id, self.pm.id])
+        self.assertEqual((result['created'], result['coalesced']), (1, 1))
+        self.assertEqual(Notification.objects.filter(user=self.ceo).count(), 1)
+
+    def test_failed_write_releases_the_recipients(self):
+        with mock.patch.object(Notification.objects, 'bulk_create', side_effect=OperationalError):
+            with self.assertRaises(OperationalError):
+                notify('Build failed', user_ids=[self.ceo.id])
+        self.assertEqual(notify('Build failed', user_ids=[self.ceo.id])['created'], 1)
+
+    @override_settings(NOTIFICATION_COALESCE_SECONDS=0)
+    def test_coalescing_can_be_disabled(self):
+        notify('Ping', user_ids=[self.ceo.id])
+        notify('Ping', user_ids=[self.ceo.id])
+        self.assertEqual(Notification.objects.filter(user=self.ceo).count(), 2)
+
+
+class UnreadNotificationCounterTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        cls.other = User.objects.create_user(username='other', password='x', role=User.Role.DEVELOPER)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.dev)
+        self.notifications = [Notification.objects.create(user=self.dev, message=f'n{i}') for i in range(5)]
+        Notification.objects.create(user=self.other, message='theirs')
+
+    def unread(self, user):
+        user.refresh_from_db()
+        return user.unread_notifications
+
+    def test_counter_follows_creates_updates_and_deletes(self):
+        self.assertEqual(self.unread(self.dev), 5)
+        notify('Broadcast', user_ids=[self.dev.id, self.other.id])
+        self.assertEqual((self.unread(self.dev), self.unread(self.other)), (6, 2))
+
+        first = Notification.objects.get(pk=self.notifications[0].pk)
+        first.is_read = True
+        first.save()
+        first.save()
+        self.assertEqual(self.unread(self.dev), 5)
+        first.delete()
+        Notification.objects.get(pk=self.notifications[1].pk).delete()
+        self.assertEqual(self.unread(self.dev), 4)
+
+    def test_stale_user_save_keeps_counter(self):
+        stale = User.objects.get(pk=self.dev.pk)
+        Notification.objects.create(user=self.dev, message='late')
+        stale.first_name = 'Dev'
+        stale.save()
+        self.assertEqual(self.unread(self.dev), 6)
+
+    def test_unread_count_does_not_touch_notifications(self):
+        # Authenticate for real so the user row is loaded per request
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.dev)}')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/notifications/unread-count/')
+        self.assertEqual(response.data, {'unread': 5})
+        self.assertFalse(any('projects_notification' in query['sql'] for query in queries))
+
+    def test_bulk_mark_read_is_one_update(self):
+        ids = [n.id for n in self.notifications[:3]] + [Notification.objects.get(user=self.other).id]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/notifications/mark-read/', {'ids': ids}, format='json')
+        self.assertEqual(response.data, {'updated': 3, 'unread': 2})
+        self.assertEqual(sum(query['sql'].startswith('UPDATE "projects_notification"') for query in queries), 1)
+        self.assertEqual(self.unread(self.other), 1)
+
+        response = self.client.post('/api/notifications/mark-read/', {'ids': ids}, format='json')
+        self.assertEqual(response.data, {'updated': 0, 'unread': 2})
+        self.assertEqual(self.client.post('/api/notifications/mark-read/', {'ids': 'all'}, format='json').status_code, 400)
+
+    def test_mark_all_read(self):
+        response = self.client.post('/api/notifications/mark-all-read/')
+        self.assertEqual(response.data, {'updated': 5, 'unread': 0})
+        self.assertFalse(Notification.objects.filter(user=self.dev, is_read=False).exists())
+
+    def test_mark_read_single(self):
+        response = self.client.post(f'/api/notifications/{self.notifications[0].id}/mark_read/')
+        self.assertEqual(response.status_code, 200)
+        self.client.post(f'/api/notifications/{self.notifications[0].id}/mark_read/')
+        self.assertEqual(self.unread(self.dev), 4)
+        other = Notification.objects.get(user=self.other)
+        self.assertEqual(self.client.post(f'/api/notifications/{other.id}/mark_read/').status_code, 404)
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    REMINDER_SWEEP_CHUNK_SIZE=3,
+    REMINDER_EMAIL_BATCH_SIZE=2,
+)
+class DueDateReminderSweepTests(TestCase):
+    today = datetime.date(2026, 3, 10)
+
+    @classmethod
+    def setUpTestData(cls):
+        pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.devs = [
+            User.objects.create_user(username=f'dev{i}', email=f'dev{i}@example.com', password='x', role=User.Role.DEVELOPER)
+            for i in range(3)
+        ]
+        project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=pm)
+        day = datetime.timedelta(days=1)
+        for dev in cls.devs:
+            Task.objects.bulk_create([
+                Task(project=project, title=f'{dev.username} overdue', assigned_to=dev, due_date=cls.today - day),
+                Task(project=project, title=f'{dev.username} today', assigned_to=dev, due_date=cls.today),
+                Task(project=project, title=f'{dev.username} tomorrow', assigned_to=dev, due_date=cls.today + day),
+                Task(project=project, title=f'{dev.username} later', assigned_to=dev, due_date=cls.today + 3 * day),
+                Task(project=project, title=f'{dev.username} done', assigned_to=dev, due_date=cls.today - day, status=Task.Status.DONE),
+            ])
+
+    def test_one_digest_per_user(self):
+        result = sweep(self.today)
+        self.assertEqual(result, {'reminders': 9, 'digests': 3})
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [dev.email for dev in self.devs])
+        body = mail.outbox[0].body
+        self.assertIn('overdue', body)
+        self.assertIn('tomorrow', body)
+        self.assertNotIn('later', body)
+        self.assertNotIn('done', body)
+        self.assertEqual(
+            dict(DueDateReminder.objects.values_list('task__title', 'kind').filter(user=self.devs[0])),
+            {'dev0 overdue': 'OVERDUE', 'dev0 today': 'DUE_SOON', 'dev0 tomorrow': 'DUE_SOON'},
+        )
+
+    def test_repeated_sweeps_are_idempotent(self):
+        sweep(self.today)
+        mail.outbox.clear()
+        self.assertEqual(sweep(self.today), {'reminders': 0, 'digests': 0})
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(DueDateReminder.objects.count(), 9)
+
+    def test_reminded_tasks_are_not_walked_again(self):
+        sweep(self.today)
+        self.assertEqual(list(owed_reminders(self.today, 100)), [])
+        # Due today, now overdue: owed the overdue reminder only
+        owed = [reminder for chunk in owed_reminders(self.today + datetime.timedelta(days=1), 100) for reminder in chunk]
+        self.assertEqual(
+            sorted((reminder.task.title, reminder.kind) for reminder in owed if reminder.user == self.devs[0]),
+            [('dev0 today', 'OVERDUE')],
+        )
+
+    def test_moved_deadline_earns_a_new_reminder(self):
+        sweep(self.today)
+        mail.outbox.clear()
+        Task.objects.filter(title='dev1 later').update(due_date=self.today)
+        self.assertEqual(sweep(self.today)['digests'], 1)
+        self.assertEqual(mail.outbox[0].to, [self.devs[1].email])
+
+    def test_failed_send_is_retried(self):
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError):
+            with self.assertRaises(OSError):
+                sweep(self.today)
+        self.assertEqual(DueDateReminder.objects.filter(sent_at=None).count(), 9)
+        self.assertEqual(sweep(self.today)['digests'], 3)
+
+
+@override_settings(RETENTION_NOTIFICATION_DAYS=30, RETENTION_ACTIVITY_LOG_DAYS=30)
+class RetentionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        old = timezone.now() - datetime.timedelta(days=45)
+        for i in range(7):
+            Notification.objects.create(user=cls.dev, message=f'old {i}', is_read=i % 2 == 0)
+            ActivityLog.objects.create(user=cls.dev, action=f'old {i}', target_type='Task', target_id=i, created_at=old)
+        Notification.objects.update(created_at=old)
+        Notification.objects.create(user=cls.dev, message='new')
+        ActivityLog.objects.create(user=cls.dev, action='new', target_type='Task', target_id=99)
+
+    def test_moves_expired_rows_to_archive_tables(self):
+        for policy in POLICIES:
+            self.assertEqual(archive_expired(policy, target='table', batch_size=3), 7)
+        self.assertEqual(list(Notification.objects.values_list('message', flat=True)), ['new'])
+        self.assertEqual(list(ActivityLog.objects.values_list('action', flat=True)), ['new'])
+        self.assertEqual(ArchivedNotification.objects.count(), 7)
+        self.assertEqual(ArchivedActivityLog.objects.filter(target_id=3).get().action, 'old 3')
+        self.dev.refresh_from_db()
+        # 3 of the archived rows were unread, plus the new one
+        self.assertEqual(self.dev.unread_notifications, 1)
+        self.assertEqual(archive_expired(POLICIES[0], target='table'), 0)
+
+    def test_archives_keep_large_ids(self):
+        big = ActivityLog.objects.create(
+            id=2**40, user=self.dev, action='big', target_type='Task', target_id=1,
+            created_at=timezone.now() - datetime.timedelta(days=45),
+        )
+        self.assertEqual(archive_expired(POLICIES[1], target='table'), 8)
+        self.assertEqual(ArchivedActivityLog.objects.get(id=big.id).action, 'big')
+
+    def test_writes_jsonl_archives(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(RETENTION_ARCHIVE_DIR=directory):
+            self.assertEqual(archive_expired(POLICIES[1], target='jsonl', batch_size=4), 7)
+            files = list(Path(directory, ActivityLog._meta.db_table).glob('*.jsonl.gz'))
+            self.assertEqual(len(files), 1)
+            with gzip.open(files[0], 'rt') as archive:
+                rows = [json.loads(line) for line in archive]
+        self.assertEqual(sorted(row['action'] for row in rows), [f'old {i}' for i in range(7)])
+        self.assertFalse(ArchivedActivityLog.objects.exists())
+
+    def test_dry_run_counts_without_moving(self):
+        self.assertEqual(archive_expired(POLICIES[1], dry_run=True), 7)
+        self.assertEqual(ActivityLog.objects.count(), 8)
+
+    def test_partition_statements(self):
+        convert = partition_statements('log', [], datetime.date(2026, 1, 15), datetime.date(2026, 3, 1))
+        self.assertIn('ADD PRIMARY KEY (`id`, `created_at`)', convert[0])
+        self.assertIn("PARTITION p202601 VALUES LESS THAN (TO_DAYS('2026-02-01'))", convert[1])
+        self.assertIn("PARTITION p202603 VALUES LESS THAN (TO_DAYS('2026-04-01')), PARTITION pmax", convert[1])
+
+        maintain = partition_statements(
+            'log', ['p202601', 'p202602', 'p202603', 'pmax'], datetime.date(2026, 1, 1), datetime.date(2026, 5, 1),
+            expired_before=datetime.date(2026, 3, 1),
+        )
+        self.assertEqual(maintain, [
+            "ALTER TABLE `log` REORGANIZE PARTITION pmax INTO ("
+            "PARTITION p202604 VALUES LESS THAN (TO_DAYS('2026-05-01')), "
+            "PARTITION p202605 VALUES LESS THAN (TO_DAYS('2026-06-01')), "
+            "PARTITION pmax VALUES LESS THAN MAXVALUE)",
+            'ALTER TABLE `log` DROP PARTITION p202601, p202602',
+        ])
+
+
+class SearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='x', role=User.Role.ADMIN)
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        cls.apollo = Project.objects.create(
+            name='Apollo launch', description='Rocket telemetry dashboard', start_date=datetime.date(2026, 1, 1), pm=cls.pm
+        )
+        cls.hermes = Project.objects.create(
+            name='Hermes', description='Courier telemetry', start_date=datetime.date(2026, 1, 1), pm=cls.admin
+        )
+        cls.task = Task.objects.create(project=cls.apollo, title='Telemetry ingest', assigned_to=cls.dev, sprint='Sprint 7')
+        cls.hidden = Task.objects.create(project=cls.hermes, title='Telemetry export')
+        cls.comment = TaskComment.objects.create(task=cls.task, user=cls.dev, content='Parser drops gyroscope frames')
+        TaskComment.objects.create(task=cls.hidden, user=cls.admin, content='Gyroscope calibration notes')
+
+    def setUp(self):
+        cache.clear()
+
+    def hits(self, user, query, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(hit['kind'], hit['id']) for hit in response.data['results']]
+
+    def test_ranks_across_kinds(self):
+        hits = self.hits(self.admin, 'telemetry')
+        self.assertEqual(set(hits), {('PROJECT', self.apollo.id), ('PROJECT', self.hermes.id), ('TASK', self.task.id), ('TASK', self.hidden.id)})
+        # Title matches outrank description matches
+        self.assertEqual(hits[0][0], 'TASK')
+        # Terms match as prefixes, and kind narrows the results
+        self.assertEqual(set(self.hits(self.admin, 'tele', kind='project')), {('PROJECT', self.apollo.id), ('PROJECT', self.hermes.id)})
+
+    def test_respects_role_scope(self):
+        self.assertEqual(set(self.hits(self.dev, 'gyroscope')), {('COMMENT', self.comment.id)})
+        self.assertEqual(set(self.hits(self.pm, 'telemetry')), {('PROJECT', self.apollo.id), ('TASK', self.task.id)})
+        self.client.force_authenticate(self.dev)
+        hit = self.client.get('/api/search/', {'q': 'gyroscope'}).data['results'][0]
+        self.assertEqual((hit['title'], hit['task']), ('Telemetry ingest', self.task.id))
+        self.assertIn('<mark>gyroscope</mark>', hit['snippet'])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.task.title = 'Navigation ingest'
+        self.task.save()
+        self.assertEqual(self.hits(self.admin, 'navigation'), [('TASK', self.task.id)])
+        self.assertNotIn(('TASK', self.task.id), self.hits(self.admin, 'telemetry'))
+
+        self.client.force_authenticate(self.admin)
+        self.client.patch('/api/tasks/bulk/', [{'id': self.hidden.id, 'sprint': 'Zephyr'}], format='json')
+        self.assertEqual(self.hits(self.admin, 'zephyr'), [('TASK', self.hidden.id)])
+
+        self.apollo.delete()
+        self.assertFalse(SearchDocument.objects.filter(project_id=self.apollo.id).exists())
+        self.assertEqual(self.hits(self.admin, 'parser'), [])
+
+    def test_list_search_uses_index(self):
+        self.client.force_authenticate(self.pm)
+        response = self.client.get('/api/tasks/', {'search': 'sprint 7'})
+        self.assertEqual([task['id'] for task in response.data['results']], [self.task.id])
+        response = self.client.get('/api/projects/', {'search': 'rocket', 'fields': 'id'})
+        self.assertEqual(response.data['results'], [{'id': self.apollo.id}])
+
+    def test_rejects_unknown_kind_and_ignores_syntax(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'x', 'kind': 'user'}).status_code, 400)
+        self.assertEqual(self.hits(self.admin, '"telemetry* ('), self.hits(self.admin, 'telemetry'))
+        self.assertEqual(self.hits(self.admin, '   '), [])
+
+    def test_upserts_without_a_conflict_target_where_unsupported(self):
+        # As on MySQL, whose ON DUPLICATE KEY UPDATE takes no target
+        features = connection.features
+        with mock.patch.object(features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(SearchDocument.objects, 'bulk_create') as bulk_create:
+            self.client.force_authenticate(self.pm)
+            response = self.client.patch(f'/api/tasks/{self.task.id}/', {'title': 'Telemetry replay'})
+        self.assertEqual(response.status_code, 200)
+        bulk_create.assert_called_once()
+        self.assertIsNone(bulk_create.call_args.kwargs['unique_fields'])
+        self.assertEqual(bulk_create.call_args.args[0][0].title, 'Telemetry replay')
+
+
+@override_settings(EXPORT_CHUNK_SIZE=7)
+class StreamingExportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        cls.project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        other = Project.objects.create(name='Hermes', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        # Same created_at for all rows, so chunk boundaries fall inside ties
+        tasks = Task.objects.bulk_create(
+            Task(project=cls.project, title=f'Task, "{i}"', assigned_to=cls.dev if i % 2 else None,
+                 status=Task.Status.DONE if i < 5 else Task.Status.TODO)
+            for i in range(30)
+        )
+        tasks_bulk_created.send(sender=Task, tasks=tasks)
+        Task.objects.create(project=other, title='Elsewhere')
+
+    def setUp(self):
+        cache.clear()
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        return b''.join(response.streaming_content).decode()
+
+    def test_tasks_csv_streams_every_filtered_row(self):
+        self.client.force_authenticate(self.pm)
+        with CaptureQueriesContext(connection) as queries:
+            body = self.read(self.client.get('/api/tasks/export/', {'project': self.project.id}))
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(len({row['id'] for row in rows}), 30)
+        self.assertEqual(rows[0]['project'], 'Apollo')
+        self.assertIn('Task, "7"', {row['title'] for row in rows})
+        # 30 rows in chunks of 7: five keyset queries, never one per row
+        self.assertEqual(sum('FROM "projects_task"' in query['sql'] for query in queries), 5)
+
+    def test_scoping_applies(self):
+        self.client.force_authenticate(self.dev)
+        body = self.read(self.client.get('/api/tasks/export/', {'export_format': 'jsonl'}))
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 15)
+        self.assertEqual({row['assigned_to'] for row in rows}, {'dev'})
+
+    def test_project_counts_are_not_narrowed_by_scope(self):
+        self.client.force_authenticate(self.dev)
+        body = self.read(self.client.get('/api/projects/export/', {'export_format': 'jsonl'}))
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([(row['name'], row['tasks'], row['tasks_done']) for row in rows], [('Apollo', 30, 5)])
+
+    async def test_streams_asynchronously_under_asgi(self):
+        token = await database_sync_to_async(AccessToken.for_user)(self.pm)
+        response = await self.async_client.get('/api/tasks/export/', headers={'Authorization': f'Bearer {token}'})
+        self.assertTrue(response.is_async)
+        body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertEqual(len(body.splitlines()), 32)
+
+    def test_activity_log_export_and_bad_format(self):
+        self.client.force_authenticate(self.pm)
+        ActivityLog.objects.create(user=self.pm, action='Created Project: Apollo', target_type='Project', target_id=1)
+        rows = list(csv.DictReader(io.StringIO(self.read(self.client.get('/api/activity-logs/export/')))))
+        self.assertEqual([(row['user'], row['action']) for row in rows], [('pm', 'Created Project: Apollo')])
+        self.assertEqual(self.client.get('/api/tasks/export/', {'export_format': 'xlsx'}).status_code, 400)
+
+
+class ProjectMembershipTests(APITestCase):
+    """Developer visibility through ProjectMembership must match the task join it replaced."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.devs = [User.objects.create_user(username=f'dev{i}', password='x', role=User.Role.DEVELOPER) for i in range(4)]
+        cls.projects = [
+            Project.objects.create(name=f'Project {i}', start_date=datetime.date(2026, 1, 1), pm=cls.pm) for i in range(5)
+        ]
+
+    def assertConsistent(self):
+        for dev in User.objects.filter(role=User.Role.DEVELOPER):
+            joined = set(Project.objects.filter(tasks__assigned_to=dev).distinct().values_list('id', flat=True))
+            self.assertEqual(set(Project.objects.visible_to(dev).values_list('id', flat=True)), joined, dev.username)
+        recorded = {
+            (row.user_id, row.project_id): row.task_count for row in ProjectMembership.objects.filter(task_count__gt=0)
+        }
+        self.assertEqual(recorded, ProjectMembership.expected_counts())
+
+    def test_random_task_changes(self):
+        rng = random.Random(18)
+        tasks = []
+        for step in range(300):
+            operation = rng.choice(['create', 'create', 'reassign', 'move', 'unassign', 'delete', 'partial'])
+            if operation == 'create' or not tasks:
+                tasks.append(Task.objects.create(
+                    project=rng.choice(self.projects), title=f'Task {step}', assigned_to=rng.choice(self.devs + [None])
+                ))
+            elif operation == 'delete':
+                Task.objects.get(id=tasks.pop(rng.randrange(len(tasks))).id).delete()
+            elif operation == 'partial':
+                # Saved from a fresh instance that never loaded project_id
+                task = Task.objects.only('id', 'assigned_to').get(id=rng.choice(tasks).id)
+                task.assigned_to = rng.choice(self.devs)
+                task.save(update_fields=['assigned_to'])
+            else:
+                task = Task.objects.get(id=rng.choice(tasks).id)
+                if operation == 'reassign':
+                    task.assigned_to = rng.choice(self.devs)
+                elif operation == 'move':
+                    task.project = rng.choice(self.projects)
+                else:
+                    task.assigned_to = None
+                task.save()
+            if step % 25 == 0:
+                self.assertConsistent()
+        self.assertConsistent()
+
+    def test_bulk_paths_and_deletions(self):
+        dev, other = self.devs[:2]
+        tasks = [Task.objects.create(project=self.projects[i % 2], title=f'Task {i}', assigned_to=dev) for i in range(6)]
+        self.client.force_authenticate(self.pm)
+        payload = [{'id': task.id, 'assigned_to_id': other.id} for task in tasks[:3]]
+        self.assertEqual(self.client.patch('/api/tasks/bulk/', payload, format='json').status_code, 200)
+        self.assertConsistent()
+
+        Importer(self.pm, ImportJob.Kind.TASKS).run(read_rows(io.BytesIO(task_rows_csv([
+            {'title': 'Imported', 'project': 'Project 4', 'assigned_to': 'dev3'},
+        ])), ImportJob.Format.CSV))
+        self.assertConsistent()
+
+        self.projects[0].delete()
+        self.assertConsistent()
+        other.delete()
+        self.assertConsistent()
+
+    def test_developer_project_list_needs_no_distinct(self):
+        Task.objects.create(project=self.projects[1], title='Mine', assigned_to=self.devs[0])
+        Task.objects.create(project=self.projects[1], title='Also mine', assigned_to=self.devs[0])
+        self.client.force_authenticate(self.devs[0])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/projects/', {'expand': ''})
+        self.assertEqual([project['id'] for project in response.data['results']], [self.projects[1].id])
+        self.assertNotIn('DISTINCT', queries[0]['sql'])
+        self.assertIn('projects_projectmembership', queries[0]['sql'])
+
+    def test_rebuild_repairs_writes_that_bypass_signals(self):
+        task = Task.objects.create(project=self.projects[0], title='Moved quietly', assigned_to=self.devs[0])
+        Task.objects.filter(id=task.id).update(project=self.projects[2])
+        out = io.StringIO()
+        call_command('rebuild_project_memberships', '--check', stdout=out)
+        self.assertIn('2 memberships differ', out.getvalue())
+        call_command('rebuild_project_memberships', stdout=io.StringIO())
+        self.assertConsistent()
+        self.assertFalse(ProjectMembership.objects.filter(task_count=0).exists())
+
+
+@override_settings(ACTIVITY_LOG_BACKEND='sync')
+class ProjectRollupTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.apollo = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        cls.gemini = Project.objects.create(name='Gemini', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+
+    def rollups(self, project):
+        return Project.objects.values(*Project.counted_rollups).get(id=project.id)
+
+    def assertRollupsMatchTasks(self):
+        expected = Project.expected_rollups()
+        for project in (self.apollo, self.gemini):
+            counted = {field: expected.get(project.id, {}).get(field, 0) for field in Project.counted_rollups}
+            self.assertEqual(self.rollups(project), counted, project.name)
+
+    def test_task_changes_keep_the_rollups_current(self):
+        yesterday = timezone.localdate() - datetime.timedelta(days=1)
+        task = Task.objects.create(project=self.apollo, title='Late', due_date=yesterday.isoformat())
+        Task.objects.create(project=self.apollo, title='Fine', status=Task.Status.REVIEW)
+        self.assertEqual(self.rollups(self.apollo)['tasks_overdue'], 1)
+        self.assertIsNotNone(Project.objects.get(id=self.apollo.id).last_activity_at)
+        self.assertRollupsMatchTasks()
+
+        task.status = Task.Status.DONE
+        task.save()
+        self.assertEqual((self.rollups(self.apollo)['tasks_done'], self.rollups(self.apollo)['tasks_overdue']), (1, 0))
+        task.project = self.gemini
+        task.save()
+        self.assertRollupsMatchTasks()
+        task.delete()
+        self.assertRollupsMatchTasks()
+
+        tasks = Task.objects.bulk_create(Task(project=self.gemini, title=f'Task {i}') for i in range(5))
+        tasks_bulk_created.send(sender=Task, tasks=tasks)
+        self.client.force_authenticate(self.pm)
+        payload = [{'id': task.id, 'status': 'IN_PROGRESS'} for task in tasks[:3]]
+        self.assertEqual(self.client.patch('/api/tasks/bulk/', payload, format='json').status_code, 200)
+        self.assertEqual(self.rollups(self.gemini)['tasks_in_progress'], 3)
+        self.assertRollupsMatchTasks()
+
+    def test_saving_a_stale_project_keeps_its_rollups(self):
+        stale = Project.objects.get(id=self.apollo.id)
+        Task.objects.create(project=self.apollo, title='New')
+        stale.name = 'Apollo 11'
+        stale.save()
+        self.assertEqual(self.rollups(self.apollo)['tasks_todo'], 1)
+
+    def test_project_lists_show_progress_without_reading_tasks(self):
+        Task.objects.create(project=self.apollo, title='Done', status=Task.Status.DONE)
+        self.client.force_authenticate(self.pm)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/projects/', {'expand': ''})
+        self.assertEqual({row['name']: row['tasks_done'] for row in response.data['results']}, {'Apollo': 1, 'Gemini': 0})
+        self.assertFalse([query for query in queries if 'projects_task' in query['sql']])
+
+    def test_overdue_counts_catch_up_and_rebuild_repairs_drift(self):
+        task = Task.objects.create(project=self.apollo, title='Soon', due_date=timezone.localdate())
+        # The day passes: nothing saves the task
+        Task.objects.filter(id=task.id).update(due_date=timezone.localdate() - datetime.timedelta(days=1))
+        self.assertEqual(Project.refresh_overdue(), [self.apollo.id])
+        self.assertEqual(self.rollups(self.apollo)['tasks_overdue'], 1)
+        self.assertEqual(Project.refresh_overdue(), [])
+
+        Task.objects.filter(id=task.id).update(status=Task.Status.DONE, project=self.gemini)
+        out = io.StringIO()
+        call_command('rebuild_project_rollups', check=True, stdout=out)
+        self.assertIn('2 projects differ', out.getvalue())
+        self.assertEqual(self.rollups(self.apollo)['tasks_todo'], 1)
+
+        call_command('rebuild_project_rollups', stdout=out)
+        self.assertRollupsMatchTasks()
+        out = io.StringIO()
+        call_command('rebuild_project_rollups', check=True, stdout=out)
+        self.assertIn('0 projects differ', out.getvalue())
+
+
+class ProfilingTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='x', role=User.Role.ADMIN)
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        Task.objects.create(project=project, title='Launch')
+
+    def setUp(self):
+        cache.clear()
+        self.enterContext(mock.patch.object(profiling, 'recorder', profiling.Recorder()))
+
+    def server_timing(self, response):
+        return {
+            part.split(';')[0].strip(): part for part in response['Server-Timing'].split(',')
+        }
+
+    def test_server_timing_reports_queries_and_phases(self):
+        self.client.force_authenticate(self.pm)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/')
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'db', 'serialize', 'total'})
+        self.assertIn(f'desc="{len(queries)} queries"', timing['db'])
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_measured(self):
+        self.client.force_authenticate(self.pm)
+        self.assertNotIn('Server-Timing', self.client.get('/api/tasks/'))
+        self.assertEqual(profiling.recorder.snapshot(), {})
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.client.force_authenticate(self.pm)
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 401)
+
+    def test_prometheus_histograms_per_endpoint(self):
+        for store in ('memory', 'cache'):
+            with self.subTest(store=store), override_settings(PROFILING_STORE=store):
+                cache.clear()
+                profiling.recorder = profiling.Recorder()
+                self.client.force_authenticate(self.pm)
+                for _ in range(3):
+                    self.client.get('/api/tasks/')
+                self.client.get('/api/projects/')
+                self.client.force_authenticate(self.admin)
+                response = self.client.get('/api/metrics/')
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['Content-Type'].startswith('text/plain'))
+                body = response.content.decode()
+                self.assertIn('# TYPE companysys_request_duration_seconds histogram', body)
+                self.assertIn(
+                    'companysys_request_duration_seconds_bucket{method="GET",view="task-list",le="+Inf"} 3', body
+                )
+                self.assertIn('companysys_db_queries_count{method="GET",view="project-list"} 1', body)
+                self.assertIn(
+                    'companysys_response_bytes_quantile{method="GET",view="task-list",quantile="0.95"}', body
+                )
+
+    def test_quantiles_interpolate_within_buckets(self):
+        buckets = (1, 2, 5)
+        # 10 observations: 5 in (0, 1], 4 in (1, 2], 1 in (2, 5]; sum unused
+        row = [5, 4, 1, 0, 0, 10]
+        self.assertEqual(profiling.quantile(0.5, row, buckets), 1)
+        self.assertAlmostEqual(profiling.quantile(0.7, row, buckets), 1.5)
+        self.assertAlmostEqual(profiling.quantile(0.95, row, buckets), 3.5)
+
+
+def task_rows_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=['title', 'project', 'status', 'priority', 'due_date', 'assigned_to'])
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+@override_settings(ACTIVITY_LOG_BACKEND='sync')
+class BulkImportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='x', role=User.Role.ADMIN)
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.other_pm = User.objects.create_user(username='pm2', password='x', role=User.Role.PM)
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        cls.project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        Project.objects.create(name='Hermes', start_date=datetime.date(2026, 1, 1), pm=cls.other_pm)
+
+    def setUp(self):
+        cache.clear()
+        upload_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(upload_dir.cleanup)
+        self.enterContext(override_settings(IMPORT_UPLOAD_DIR=upload_dir.name))
+
+    def test_batches_resolve_names_once_and_report_bad_rows(self):
+        rows = [
+            {'title': f'Task {i}', 'project': 'Apollo', 'status': 'DONE' if i % 3 else '', 'due_date': '2026-03-01',
+             'assigned_to': 'dev' if i % 2 else ''}
+            for i in range(250)
+        ]
+        rows[10]['status'] = 'SHIPPED'
+        rows[120]['project'] = 'Nowhere'
+        rows[200]['assigned_to'] = 'pm2'
+        rows[201]['project'] = 'Hermes'  # not visible to this PM
+        # Under SQLite's bound-parameter limit, so each batch is one INSERT
+        importer = Importer(self.pm, ImportJob.Kind.TASKS, batch_size=50)
+        with CaptureQueriesContext(connection) as queries:
+            report = importer.run(read_rows(io.BytesIO(task_rows_csv(rows)), ImportJob.Format.CSV))
+
+        self.assertEqual((report['processed'], report['imported'], report['failed']), (250, 246, 4))
+        # CSV line numbers count the header
+        self.assertEqual([error['line'] for error in report['errors']], [12, 122, 202, 203])
+        self.assertIn('status', report['errors'][0]['errors'])
+        self.assertIn('assigned_to', report['errors'][2]['errors'])
+        self.assertEqual(Task.objects.filter(project=self.project).count(), 246)
+        self.assertEqual(Task.objects.filter(assigned_to=self.dev).count(), 124)
+        self.assertEqual(Task.objects.get(title='Task 0').status, Task.Status.TODO)
+        # One INSERT and one lookup per name kind per batch, however many rows
+        self.assertEqual(sum(query['sql'].startswith('INSERT INTO "projects_task"') for query in queries), 5)
+        self.assertEqual(sum('FROM "users_user"' in query['sql'] for query in queries), 5)
+        # bulk_create skipped post_save; the bulk-created signal indexed them
+        self.assertEqual(SearchDocument.objects.filter(kind=SearchDocument.Kind.TASK).count(), 246)
+
+    def test_dry_run_writes_nothing(self):
+        importer = Importer(self.admin, ImportJob.Kind.TASKS, dry_run=True)
+        report = importer.run(read_rows(io.BytesIO(task_rows_csv([{'title': 'A', 'project': 'Hermes'}])), 'CSV'))
+        self.assertEqual(report['imported'], 1)
+        self.assertFalse(Task.objects.exists())
+
+    def test_upload_runs_small_files_inline(self):
+        self.client.force_authenticate(self.pm)
+        records = [
+            {'name': 'Zeus', 'start_date': '2026-02-01', 'description': 'Imported'},
+            {'name': 'Bad dates', 'start_date': '2026-02-01', 'end_date': '2026-01-01'},
+            {'name': 'Not mine', 'start_date': '2026-02-01', 'pm': 'pm2'},
+        ]
+        body = '\n'.join(map(json.dumps, records)) + '\n{not json\n'
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/imports/', {
+                'kind': 'PROJECTS', 'file': SimpleUploadedFile('projects.jsonl', body.encode()),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], ImportJob.Status.DONE)
+        self.assertEqual((response.data['rows_processed'], response.data['rows_imported']), (4, 1))
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 3, 4])
+        project = Project.objects.get(name='Zeus')
+        self.assertEqual(project.pm, self.pm)
+        self.assertTrue(ActivityLog.objects.filter(action='Imported Project: Zeus', target_id=project.id).exists())
+        self.assertEqual(self.client.get(f'/api/imports/{response.data["id"]}/').data['rows_failed'], 3)
+
+    @override_settings(IMPORT_INLINE_MAX_BYTES=10)
+    def test_large_uploads_are_queued(self):
+        self.client.force_authenticate(self.admin)
+        upload = SimpleUploadedFile('tasks.csv', task_rows_csv([{'title': 'Queued', 'project': 'Hermes'}]))
+        with mock.patch('projects.views.run_import.delay') as delay, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/imports/', {'kind': 'TASKS', 'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], ImportJob.Status.PENDING)
+        delay.assert_called_once_with(response.data['id'])
+
+        from .tasks import run_import
+        run_import(response.data['id'])
+        job = ImportJob.objects.get(id=response.data['id'])
+        self.assertEqual((job.status, job.rows_imported), (ImportJob.Status.DONE, 1))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_upload_validation_and_permissions(self):
+        self.client.force_authenticate(self.dev)
+        upload = SimpleUploadedFile('tasks.csv', b'title,project\n')
+        self.assertEqual(self.client.post('/api/imports/', {'kind': 'TASKS', 'file': upload}).status_code, 403)
+        self.client.force_authenticate(self.pm)
+        upload = SimpleUploadedFile('tasks.xlsx', b'x')
+        response = self.client.post('/api/imports/', {'kind': 'TASKS', 'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.data)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv') as file:
+            file.write(task_rows_csv([{'title': 'From the shell', 'project': 'Hermes'}]))
+            file.flush()
+            out = io.StringIO()
+            call_command('import_data', file.name, kind='tasks', user='admin', stdout=out)
+        self.assertIn('imported 1 of 1 rows', out.getvalue())
+        self.assertTrue(Task.objects.filter(title='From the shell').exists())
+
+
+@override_settings(ACTIVITY_LOG_BACKEND='sync')
+class BenchmarkTests(APITestCase):
+    def test_dataset_is_reproducible_and_consistent(self):
+        counts = generate(pms=2, devs=6, projects=4, tasks=120, comments=50, notifications=80, activity_logs=40,
+                          batch_size=32, prefix='a')
+        self.assertEqual(counts, {
+            'users': 10, 'projects': 4, 'tasks': 120, 'comments': 50, 'notifications': 80, 'activity_logs': 40,
+        })
+        self.assertEqual(ProjectMembership.objects.filter(task_count__gt=0).count(), len(ProjectMembership.expected_counts()))
+        self.assertEqual(
+            {(row.user_id, row.project_id): row.task_count for row in ProjectMembership.objects.filter(task_count__gt=0)},
+            ProjectMembership.expected_counts(),
+        )
+        for user in User.objects.filter(username__startswith='a_'):
+            self.assertEqual(user.unread_notifications, user.notifications.filter(is_read=False).count())
+        self.assertEqual(SearchDocument.objects.filter(kind=SearchDocument.Kind.COMMENT).count(), 50)
+
+        generate(pms=2, devs=6, projects=4, tasks=120, comments=0, notifications=0, activity_logs=0, prefix='b')
+        shape = lambda prefix: list(
+            Task.objects.filter(project__pm__username__startswith=prefix).order_by('id')
+            .values_list('title', 'status', 'priority', 'sprint', 'due_date')
+        )
+        self.assertEqual(shape('a_'), shape('b_'))
+
+    def test_run_benchmarks_reports_every_flow(self):
+        generate(pms=2, devs=4, projects=3, tasks=40, comments=20, notifications=30, activity_logs=10)
+        out, err = io.StringIO(), io.StringIO()
+        call_command('run_benchmarks', '--iterations', '3', '--warmup', '1', stdout=out, stderr=err)
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report['flows']), set(FLOWS))
+        self.assertEqual(report['meta']['dataset']['projects.Task'], 40)
+        for name, result in report['flows'].items():
+            self.assertEqual(result['errors'], 0, name)
+            self.assertGreater(result['rps'], 0)
+            self.assertLessEqual(result['latency_ms']['p50'], result['latency_ms']['p99'])
+            self.assertGreaterEqual(result['queries']['max'], 1)
+        self.assertEqual(report['flows']['dashboard']['requests'], 9)
+        # Comments posted by the run were rolled back
+        self.assertEqual(TaskComment.objects.count(), 20)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as baseline:
+            json.dump(report, baseline)
+            baseline.flush()
+            call_command('run_benchmarks', '--flow', 'kanban_move', '--iterations', '2', '--warmup', '0',
+                         '--compare', baseline.name, stdout=io.StringIO(), stderr=err)
+        self.assertIn('kanban_move: rps', err.getvalue())
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.99), 7)
+
+
+@override_settings(ACTIVITY_LOG_BACKEND='sync')
+class ConcurrentBenchmarkTests(TransactionTestCase):
+    """The ASGI requests run on other threads, so the dataset must be committed."""
+
+    def test_sync_and_async_views_serve_every_request(self):
+        generate(pms=2, devs=4, projects=3, tasks=30, comments=10, notifications=20, activity_logs=10)
+        results = run_concurrent(levels=(1, 4), requests=12, warmup=2)
+        self.assertEqual(set(results), {'1', '4'})
+        for level in results.values():
+            for mode in ('sync', 'async'):
+                self.assertEqual((level[mode]['requests'], level[mode]['errors']), (12, 0), mode)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """
+    The pool is backend-agnostic, so it is exercised through the pooled
+    SQLite backend on a temporary file; production uses the MySQL one.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(Path(directory.name) / 'pool.sqlite3')
+
+    def connections(self, conn_max_age=0, **options):
+        handler = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': self.path},
+            'pooled': {
+                'ENGINE': 'company_sys_backend.db.sqlite3',
+                'NAME': self.path,
+                'CONN_MAX_AGE': conn_max_age,
+                'OPTIONS': {'pool': options or True},
+            },
+        })
+        self.addCleanup(lambda: handler['pooled'].close_pool())
+        self.addCleanup(handler.close_all)
+        return handler
+
+    def query(self, wrapper, sql='SELECT 1'):
+        with wrapper.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchall()
+
+    def test_closed_connections_are_reused(self):
+        wrapper = self.connections()['pooled']
+        raw = set()
+        for _ in range(20):
+            self.query(wrapper)
+            raw.add(id(wrapper.connection))
+            wrapper.close()
+        self.assertEqual(len(raw), 1)
+        stats = wrapper.pool.stats()
+        self.assertEqual((stats['created'], stats['reused']), (1, 19))
+        self.assertEqual((stats['checked_out'], stats['idle']), (0, 1))
+        self.assertIn('db_pool_events_total{alias="pooled"', pool.prometheus_text('companysys_'))
+        self.assertIn('event="reused"} 19', pool.prometheus_text('companysys_'))
+
+    def test_threads_share_the_pool_and_wait_for_a_free_connection(self):
+        handler = self.connections(max_size=2)
+        errors = []
+
+        def worker():
+            wrapper = handler['pooled']
+            try:
+                for _ in range(5):
+                    self.query(wrapper)
+                    time.sleep(0.005)
+                    wrapper.close()
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        stats = handler['pooled'].pool.stats()
+        self.assertLessEqual(stats['created'], 2)
+        self.assertEqual(stats['created'] + stats['reused'], 30)
+        self.assertGreater(stats['waits'], 0)
+        self.assertEqual((stats['timeouts'], stats['checked_out']), (0, 0))
+
+    def test_an_exhausted_pool_times_out(self):
+        handler = self.connections(max_size=1, timeout=0.05)
+        self.query(handler['pooled'])
+        errors = []
+
+        def worker():
+            try:
+                self.query(handler['pooled'])
+            except pool.PoolTimeout as exc:
+                errors.append(exc)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(handler['pooled'].pool.stats()['timeouts'], 1)
+
+    def test_dead_and_expired_connections_are_replaced(self):
+        wrapper = self.connections(check_after=0)['pooled']
+        self.query(wrapper)
+        wrapper.close()
+        wrapper.pool.idle[0].connection.close()
+        self.assertEqual(self.query(wrapper), [(1,)])
+        wrapper.close()
+        stats = wrapper.pool.stats()
+        self.assertEqual((stats['created'], stats['discarded']), (2, 1))
+
+        wrapper.pool.max_lifetime = 0
+        self.query(wrapper)
+        wrapper.close()
+        self.assertEqual(wrapper.pool.stats()['idle'], 0)
+
+    def test_open_transactions_are_rolled_back_on_release(self):
+        wrapper = self.connections()['pooled']
+        self.query(wrapper, 'CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        wrapper.set_autocommit(False)
+        self.query(wrapper, 'INSERT INTO item VALUES (1)')
+        wrapper.close()
+        self.assertEqual(self.query(wrapper, 'SELECT COUNT(*) FROM item'), [(0,)])
+        self.assertTrue(wrapper.get_autocommit())
+        self.assertEqual(wrapper.pool.stats()['reused'], 1)
+
+    def test_forked_processes_open_their_own_connections(self):
+        wrapper = self.connections()['pooled']
+        self.query(wrapper)
+        inherited = wrapper.connection
+        with mock.patch('company_sys_backend.db.pool.os.getpid', return_value=-1):
+            self.addCleanup(wrapper.close_pool)
+            # Released into the child's pool, which must neither keep nor close it
+            wrapper.close()
+            self.query(wrapper)
+            self.assertIsNot(wrapper.connection, inherited)
+            self.assertEqual(wrapper.pool.stats()['created'], 1)
+            wrapper.close()
+        self.assertEqual(inherited.execute('SELECT 1').fetchall(), [(1,)])
+        inherited.close()
+
+    def test_pool_settings_are_validated(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.query(self.connections(conn_max_age=60)['pooled'])
+        with self.assertRaises(ImproperlyConfigured):
+            self.query(self.connections(size=5)['pooled'])
+
+
+@shared_task(base=ReplicaReadTask)
+def count_projects():
+    return Project.objects.count()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=0)
+class ReplicaRoutingTests(APITestCase):
+    """
+    'replica' is a second database, created for these tests only and holding
+    only the rows copied into it, so a read shows which database served it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Not in settings, so other runs don't get a second database; the
+        # runner checks the declared databases before set-up, hence not there
+        connections.settings.update(connections.configure_settings({
+            'default': connections.settings['default'],
+            'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ''},
+        }))
+        connections['replica'].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        cls.databases = {'default', 'replica'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].creation.destroy_test_db('', verbosity=0)
+        del connections['replica']
+        del connections.settings['replica']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='secret1', role=User.Role.ADMIN)
+        cls.apollo = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1))
+        for obj in (cls.admin, cls.apollo):
+            type(obj).objects.using('replica').bulk_create([copy.copy(obj)])
+        # Written after the replica's last sync
+        User.objects.create_user(username='dev', password='secret1', role=User.Role.DEVELOPER)
+        Project.objects.create(name='Lagging', start_date=datetime.date(2026, 1, 2))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def names(self, path, field='name'):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return sorted(row[field] for row in response.data['results'])
+
+    def test_safe_requests_read_a_replica(self):
+        self.assertEqual(self.names('/api/projects/?expand='), ['Apollo'])
+        self.assertEqual(self.names('/api/users/', 'username'), ['admin'])
+        export = self.client.get('/api/projects/export/')
+        rows = b''.join(export.streaming_content).decode()
+        self.assertIn('Apollo', rows)
+        self.assertNotIn('Lagging', rows)
+
+        with self.settings(DATABASE_REPLICAS=[]):
+            cache.clear()
+            self.assertEqual(self.names('/api/projects/?expand='), ['Apollo', 'Lagging'])
+
+    @override_settings(REPLICA_PIN_SECONDS=60)
+    def test_writers_read_from_the_primary_for_a_while(self):
+        self.assertEqual(self.names('/api/users/', 'username'), ['admin'])
+        self.assertEqual(self.client.post('/api/notifications/mark-all-read/').status_code, 200)
+        self.assertEqual(self.names('/api/users/', 'username'), ['admin', 'dev'])
+
+        cache.delete(PIN_KEY.format(self.admin.pk))
+        self.assertEqual(self.names('/api/users/', 'username'), ['admin'])
+
+    @override_settings(REPLICA_PIN_SECONDS=60)
+    def test_cache_misses_in_a_recently_changed_scope_read_the_primary(self):
+        self.assertEqual(self.names('/api/projects/?expand='), ['Apollo', 'Lagging'])
+
+    def test_tasks_and_blocks_can_read_a_replica(self):
+        self.assertEqual(Project.objects.count(), 2)
+        self.assertEqual(count_projects(), 1)
+        with read_from_replica():
+            self.assertEqual(Project.objects.count(), 1)
+            # Writes, even of rows read from a replica, go to the primary
+            apollo = Project.objects.get(name='Apollo')
+            apollo.description = 'Updated'
+            apollo.save()
+        self.assertEqual(Project.objects.get(name='Apollo').description, 'Updated')
+        self.assertEqual(Project.objects.using('replica').get(name='Apollo').description, '')
+
+
+class AsyncReadViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='x', role=User.Role.ADMIN)
+        cls.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        cls.other_pm = User.objects.create_user(username='pm2', password='x', role=User.Role.PM)
+        cls.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        cls.project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+        cls.hidden = Project.objects.create(name='Hermes', start_date=datetime.date(2026, 1, 1), pm=cls.other_pm)
+        cls.task = Task.objects.create(project=cls.project, title='Launch', assigned_to=cls.dev)
+        Task.objects.create(project=cls.hidden, title='Secret')
+        TaskComment.objects.create(task=cls.task, user=cls.pm, content='Go')
+        Notification.objects.create(user=cls.dev, message='Assigned')
+        ActivityLog.objects.create(user=cls.pm, action='Created Task: Launch', target_type='Task', target_id=cls.task.id)
+
+    def setUp(self):
+        cache.clear()
+
+    def auth(self, user):
+        return {'Authorization': f'Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}'}
+
+    def test_read_actions_resolve_to_async_views(self):
+        for path in ('/api/projects/', f'/api/tasks/{self.task.id}/', '/api/notifications/', '/api/activity-logs/'):
+            self.assertTrue(iscoroutinefunction(resolve(path).func), path)
+        self.assertFalse(iscoroutinefunction(resolve('/api/tasks/stats/').func))
+        self.assertFalse(iscoroutinefunction(resolve('/api/task-comments/').func))
+
+    def test_responses_match_the_sync_path(self):
+        paths = [
+            '/api/projects/', f'/api/projects/{self.project.id}/', '/api/projects/?fields=id,name&expand=',
+            f'/api/tasks/?project={self.project.id}', f'/api/tasks/{self.task.id}/', '/api/tasks/?search=launch',
+            '/api/notifications/', '/api/activity-logs/?target_type=Task',
+            f'/api/projects/{self.hidden.id}/', '/api/tasks/?project=999999',
+        ]
+        for user in (self.admin, self.pm, self.dev):
+            self.client.force_authenticate(user)
+            for path in paths:
+                responses = []
+                for enabled in (True, False):
+                    # Also resets the scope versions that ETags derive from
+                    cache.clear()
+                    with override_settings(ASYNC_READ_VIEWS=enabled):
+                        response = self.client.get(path)
+                    responses.append((response.status_code, response.content))
+                self.assertEqual(responses[0], responses[1], f'{user.username} {path}')
+
+    async def test_role_scoping_and_errors(self):
+        response = await self.async_client.get('/api/projects/', headers=self.auth(self.dev))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([project['name'] for project in response.json()['results']], ['Apollo'])
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        response = await self.async_client.get(f'/api/projects/{self.hidden.id}/', headers=self.auth(self.pm))
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(f'/api/tasks/{self.task.id}/', headers=self.auth(self.other_pm))
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get('/api/tasks/not-a-number/', headers=self.auth(self.admin))
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get('/api/notifications/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+
+        response = await self.async_client.get('/api/notifications/', headers=self.auth(self.dev))
+        self.assertEqual([item['message'] for item in response.json()['results']], ['Assigned'])
+        response = await self.async_client.get(
+            '/api/notifications/', headers={**self.auth(self.dev), 'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_writes_keep_the_sync_path(self):
+        response = await self.async_client.patch(
+            f'/api/tasks/{self.task.id}/', {'status': 'DONE'}, content_type='application/json', headers=self.auth(self.dev)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await Task.objects.aget(id=self.task.id)).status, 'DONE')
+
+
+class LiveUpdatesTests(TransactionTestCase):
+    def setUp(self):
+        self.pm = User.objects.create_user(username='pm', password='x', role=User.Role.PM)
+        self.dev = User.objects.create_user(username='dev', password='x', role=User.Role.DEVELOPER)
+        self.project = Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=self.pm)
+        self.task = Task.objects.create(project=self.project, title='Launch', assigned_to=self.dev)
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(application, f'/ws/live/?token={AccessToken.for_user(user)}')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_rejects_anonymous_connections(self):
+        communicator = WebsocketCommunicator(application, '/ws/live/')
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_rejects_inactive_users(self):
+        token = AccessToken.for_user(self.dev)
+        self.dev.is_active = False
+        await database_sync_to_async(self.dev.save)()
+        communicator = WebsocketCommunicator(application, f'/ws/live/?token={token}')
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_rejects_revoked_tokens(self):
+        token = await database_sync_to_async(lambda: str(CustomTokenObtainPairSerializer.get_token(self.dev).access_token))()
+        communicator = WebsocketCommunicator(application, f'/ws/live/?token={token}')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.disconnect()
+
+        await database_sync_to_async(self.dev.revoke_tokens)()
+        communicator = WebsocketCommunicator(application, f'/ws/live/?token={token}')
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_notification_is_pushed_to_its_user(self):
+        communicator = await self.connect(self.dev)
+        await database_sync_to_async(Notification.objects.create)(user=self.dev, message='Review requested')
+        message = await communicator.receive_json_from(timeout=1)
+        self.assertEqual(message['event'], 'notification.created')
+        self.assertEqual(message['notification']['message'], 'Review requested')
+        await communicator.disconnect()
+
+    async def test_project_subscribers_see_status_changes(self):
+        communicator = await self.connect(self.pm)
+        await communicator.send_json_to({'action': 'subscribe', 'project': self.project.id})
+        self.assertEqual(await communicator.receive_json_from(timeout=1), {'event': 'subscribed', 'project': self.project.id})
+
+        self.task.status = Task.Status.REVIEW
+        await database_sync_to_async(self.task.save)()
+        message = await communicator.receive_json_from(timeout=1)
+        self.assertEqual(message['event'], 'task.status_changed')
+        self.assertEqual((message['task']['previous_status'], message['task']['status']), ('TODO', 'REVIEW'))
+        await communicator.disconnect()
+
+    async def test_cannot_subscribe_to_invisible_project(self):
+        other_dev = await database_sync_to_async(User.objects.create_user)(username='dev2', password='x', role=User.Role.DEVELOPER)
+        communicator = await self.connect(other_dev)
+        await communicator.send_json_to({'action': 'subscribe', 'project': self.project.id})
+        self.assertIn('error', await communicator.receive_json_from(timeout=1))
+        await communicator.disconnect()
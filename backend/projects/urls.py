@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProjectViewSet, TaskViewSet, AssetLinkViewSet, NotificationViewSet, TaskCommentViewSet, ActivityLogViewSet
+from .views import ProjectViewSet, TaskViewSet, AssetLinkViewSet, NotificationViewSet, TaskCommentViewSet, ActivityLogViewSet, ImportJobViewSet, CacheStatsView, SearchView
 
 router = DefaultRouter()
 router.register(r'projects', ProjectViewSet, basename='project')
@@ -9,7 +9,10 @@ router.register(r'assets', AssetLinkViewSet, basename='asset')
 router.register(r'notifications', NotificationViewSet, basename='notification')
 router.register(r'task-comments', TaskCommentViewSet, basename='task-comment')
 router.register(r'activity-logs', ActivityLogViewSet, basename='activity-log')
+router.register(r'imports', ImportJobViewSet, basename='import')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('search/', SearchView.as_view(), name='search'),
 ]
@@ -1,56 +1,126 @@
-from rest_framework import viewsets, permissions, filters
+from rest_framework import mixins, permissions, status, viewsets
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, Q
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Project, Task, AssetLink, Notification, TaskComment, ActivityLog
-from .serializers import ProjectSerializer, TaskSerializer, AssetLinkSerializer, NotificationSerializer, TaskCommentSerializer, ActivityLogSerializer
+from .models import Project, Task, AssetLink, Notification, TaskComment, ActivityLog, SearchDocument, ImportJob
+from .serializers import ProjectSerializer, TaskSerializer, TaskBulkUpdateItemSerializer, AssetLinkSerializer, NotificationSerializer, TaskCommentSerializer, ActivityLogSerializer, ImportJobSerializer
+from .activity import log_activity, log_activities
+from .imports import run_job
+from .cache import CachedResponseMixin, metrics as cache_metrics
+from .notifications import metrics as notification_metrics
+from .search import FullTextSearchFilter, search
+from .signals import tasks_bulk_updated
+from .tasks import run_import
 from .permissions import IsAdminUser, IsCEOUser, IsPMUser, IsDeveloperUser
+from company_sys_backend.asyncviews import AsyncReadMixin
+from company_sys_backend.conditional import ConditionalGetMixin, AggregateValidatorsMixin
+from company_sys_backend.exports import StreamingExportMixin
+from company_sys_backend.pagination import OldestFirstCursorPagination
+from company_sys_backend.profiling import ProfiledSerializerMixin
+from company_sys_backend.replicas import ReplicaReadMixin
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
+from users.models import User
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class SparseFieldsetMixin:
+    """
+    Reads ``?fields=`` and ``?expand=`` on list/retrieve and hands them to the
+    serializer. get_queryset() uses renders() and only_columns() so columns
+    and prefetches that will not be rendered are never queried either.
+    """
+    # Always loaded: the primary key and the cursor pagination ordering column
+    required_columns = ('id', 'created_at')
+
+    def get_sparse_fieldset(self):
+        if self.action not in ('list', 'retrieve'):
+            return None, None
+        params = self.request.query_params
+        fields, expand = params.get('fields'), params.get('expand')
+        return (
+            {name for name in fields.split(',') if name} if fields is not None else None,
+            {path for path in expand.split(',') if path} if expand is not None else None,
+        )
+
+    def renders(self, path):
+        fields, expand = self.get_sparse_fieldset()
+        top = path.split('.', 1)[0]
+        if fields is not None and top not in fields:
+            return False
+        if expand is None:
+            return True
+        if '.' not in path and top not in self.get_serializer_class().expandable_fields:
+            return True
+        return path in expand
+
+    def only_columns(self, queryset):
+        fields, _ = self.get_sparse_fieldset()
+        if fields is None:
+            return queryset
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        return queryset.only(*self.required_columns, *(concrete & fields))
+
+    def get_serializer(self, *args, **kwargs):
+        fields, expand = self.get_sparse_fieldset()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if expand is not None:
+            kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
+
+class ProjectViewSet(ProfiledSerializerMixin, ReplicaReadMixin, StreamingExportMixin, ConditionalGetMixin, CachedResponseMixin, SparseFieldsetMixin, AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all().order_by('-created_at')
     serializer_class = ProjectSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     search_fields = ['name', 'description']
+    search_kind = SearchDocument.Kind.PROJECT
+    export_columns = {
+        'id': 'id',
+        'name': 'name',
+        'description': 'description',
+        'pm': 'pm__username',
+        'start_date': 'start_date',
+        'end_date': 'end_date',
+        # The maintained rollups, so the export never reads the tasks
+        'tasks': F('tasks_todo') + F('tasks_in_progress') + F('tasks_review') + F('tasks_done'),
+        'tasks_done': 'tasks_done',
+        'tasks_overdue': 'tasks_overdue',
+        'created_at': 'created_at',
+    }
     filterset_fields = ['pm', 'start_date', 'end_date']
 
     def get_queryset(self):
-        user = self.request.user
-        if getattr(user, 'role', None) == 'PM':
-            return Project.objects.filter(pm=user)
-        elif getattr(user, 'role', None) == 'DEV':
-            return Project.objects.filter(tasks__assigned_to=user).distinct()
-        return super().get_queryset()
+        # Mirrors ProjectSerializer -> TaskSerializer -> TaskCommentSerializer
+        queryset = Project.objects.visible_to(self.request.user).order_by('-created_at')
+        if self.renders('pm'):
+            queryset = queryset.select_related('pm')
+        if self.renders('tasks'):
+            tasks = Task.objects.select_related('assigned_to')
+            if self.renders('tasks.comments'):
+                comments = TaskComment.objects.select_related('user')
+                tasks = tasks.prefetch_related(Prefetch('comments', queryset=comments))
+            queryset = queryset.prefetch_related(Prefetch('tasks', queryset=tasks))
+        if self.renders('assets'):
+            queryset = queryset.prefetch_related('assets')
+        return self.only_columns(queryset)
 
     def perform_create(self, serializer):
         project = serializer.save()
-        ActivityLog.objects.create(
-            user=self.request.user,
-            action=f"Created Project: {project.name}",
-            target_type='Project',
-            target_id=project.id
-        )
+        log_activity(self.request.user, f"Created Project: {project.name}", 'Project', project.id)
 
     def perform_update(self, serializer):
         project = serializer.save()
-        ActivityLog.objects.create(
-            user=self.request.user,
-            action=f"Updated Project: {project.name}",
-            target_type='Project',
-            target_id=project.id
-        )
+        log_activity(self.request.user, f"Updated Project: {project.name}", 'Project', project.id)
 
     def perform_destroy(self, instance):
-        ActivityLog.objects.create(
-            user=self.request.user,
-            action=f"Deleted Project: {instance.name}",
-            target_type='Project',
-            target_id=instance.id
-        )
+        log_activity(self.request.user, f"Deleted Project: {instance.name}", 'Project', instance.id)
         instance.delete()
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'export']:
             permission_classes = [permissions.IsAuthenticated]
         elif self.action in ['create', 'update', 'partial_update']:
             permission_classes = [IsAdminUser | IsPMUser]
@@ -58,29 +128,38 @@ class ProjectViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAdminUser]
         return [permission() for permission in permission_classes]
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ProfiledSerializerMixin, ReplicaReadMixin, StreamingExportMixin, ConditionalGetMixin, CachedResponseMixin, SparseFieldsetMixin, AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all().order_by('-created_at')
     serializer_class = TaskSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     search_fields = ['title', 'description', 'sprint']
+    search_kind = SearchDocument.Kind.TASK
+    export_columns = {
+        'id': 'id',
+        'title': 'title',
+        'project': 'project__name',
+        'status': 'status',
+        'priority': 'priority',
+        'sprint': 'sprint',
+        'due_date': 'due_date',
+        'assigned_to': 'assigned_to__username',
+        'github_pr_url': 'github_pr_url',
+        'created_at': 'created_at',
+    }
     filterset_fields = ['project', 'assigned_to', 'status', 'sprint']
 
     def get_queryset(self):
-        user = self.request.user
-        if getattr(user, 'role', None) == 'PM':
-            return Task.objects.filter(project__pm=user)
-        elif getattr(user, 'role', None) == 'DEV':
-            return Task.objects.filter(assigned_to=user)
-        return super().get_queryset()
+        queryset = Task.objects.visible_to(self.request.user).order_by('-created_at')
+        if self.renders('assigned_to'):
+            queryset = queryset.select_related('assigned_to')
+        if self.renders('comments'):
+            comments = TaskComment.objects.select_related('user')
+            queryset = queryset.prefetch_related(Prefetch('comments', queryset=comments))
+        return self.only_columns(queryset)
 
     def perform_create(self, serializer):
         task = serializer.save()
-        ActivityLog.objects.create(
-            user=self.request.user,
-            action=f"Created Task: {task.title} under Project: {task.project.name}",
-            target_type='Task',
-            target_id=task.id
-        )
+        log_activity(self.request.user, f"Created Task: {task.title} under Project: {task.project.name}", 'Task', task.id)
 
     def perform_update(self, serializer):
         # Determine if status changed to mention it in the log
@@ -90,28 +169,110 @@ class TaskViewSet(viewsets.ModelViewSet):
         if old_status and old_status != task.status:
             action_text = f"Moved Task: {task.title} from {old_status} to {task.status}"
             
-        ActivityLog.objects.create(
-            user=self.request.user,
-            action=action_text,
-            target_type='Task',
-            target_id=task.id
-        )
+        log_activity(self.request.user, action_text, 'Task', task.id)
 
     def perform_destroy(self, instance):
-        ActivityLog.objects.create(
-            user=self.request.user,
-            action=f"Deleted Task: {instance.title}",
-            target_type='Task',
-            target_id=instance.id
-        )
+        log_activity(self.request.user, f"Deleted Task: {instance.title}", 'Task', instance.id)
         instance.delete()
 
+    @action(detail=False, methods=['patch'], url_path='bulk')
+    def bulk_update(self, request):
+        """
+        Apply a list of partial updates such as ``[{"id": 1, "status": "DONE"}]``
+        in one transaction, with one UPDATE batch and one activity log batch.
+        """
+        items = TaskBulkUpdateItemSerializer(
+            data=request.data, many=True, allow_empty=False, max_length=settings.TASK_BULK_UPDATE_MAX
+        )
+        items.is_valid(raise_exception=True)
+        changes = {item.pop('id'): item for item in items.validated_data}
+        if len(changes) != len(items.validated_data):
+            raise ValidationError({'id': ['Each task may appear only once per request.']})
+
+        assignee_ids = {item['assigned_to_id'] for item in changes.values() if item.get('assigned_to_id')}
+        valid_assignees = set(
+            User.objects.filter(id__in=assignee_ids, role=User.Role.DEVELOPER).values_list('id', flat=True)
+        )
+        if assignee_ids - valid_assignees:
+            raise ValidationError({'assigned_to_id': [
+                f'Not a developer: {", ".join(map(str, sorted(assignee_ids - valid_assignees)))}.'
+            ]})
+
+        now = timezone.now()
+        with transaction.atomic():
+            tasks = Task.objects.visible_to(request.user).filter(id__in=changes).select_for_update()
+            tasks = {task.id: task for task in tasks}
+            missing = sorted(set(changes) - set(tasks))
+            if missing:
+                raise NotFound(f'Tasks not found: {", ".join(map(str, missing))}.')
+
+            updated_fields = {'updated_at'}
+            log_items = []
+            for task_id, item in changes.items():
+                task = tasks[task_id]
+                old_status = task.status
+                for field, value in item.items():
+                    setattr(task, field, value)
+                    updated_fields.add(field)
+                task.updated_at = now
+                action_text = f"Updated Task: {task.title}"
+                if old_status != task.status:
+                    action_text = f"Moved Task: {task.title} from {old_status} to {task.status}"
+                log_items.append((action_text, 'Task', task.id))
+
+            Task.objects.bulk_update(tasks.values(), sorted(updated_fields), batch_size=500)
+            tasks_bulk_updated.send(sender=Task, tasks=list(tasks.values()))
+            log_activities(request.user, log_items)
+
+        return Response({'updated': sorted(tasks)})
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Dashboard KPIs aggregated in the database over the caller's visible
+        tasks, so the response size does not depend on the number of tasks.
+        """
+        tasks = self.filter_queryset(Task.objects.visible_to(request.user))
+
+        by_status = {choice: 0 for choice in Task.Status.values}
+        for row in tasks.values('status').annotate(count=Count('id')):
+            by_status[row['status']] = row['count']
+
+        by_priority = {choice: 0 for choice in Task.Priority.values}
+        for row in tasks.values('priority').annotate(count=Count('id')):
+            by_priority[row['priority']] = row['count']
+
+        overdue = tasks.overdue().count()
+
+        project_rows = (
+            tasks.values('project_id', 'project__name')
+            .annotate(total=Count('id'), done=Count('id', filter=Q(status=Task.Status.DONE)))
+            .order_by('project_id')
+        )
+
+        return Response({
+            'projects': Project.objects.visible_to(request.user).count(),
+            'tasks': sum(by_status.values()),
+            'by_status': by_status,
+            'by_priority': by_priority,
+            'overdue': overdue,
+            'project_completion': [
+                {
+                    'project': row['project_id'],
+                    'name': row['project__name'],
+                    'total': row['total'],
+                    'done': row['done'],
+                }
+                for row in project_rows
+            ],
+        })
+
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'stats', 'export']:
             permission_classes = [permissions.IsAuthenticated]
         elif self.action in ['create']:
             permission_classes = [IsAdminUser | IsPMUser]
-        elif self.action in ['update', 'partial_update']:
+        elif self.action in ['update', 'partial_update', 'bulk_update']:
             permission_classes = [permissions.IsAuthenticated]
         elif self.action == 'destroy':
             permission_classes = [IsAdminUser | IsPMUser]
@@ -119,46 +280,132 @@ class TaskViewSet(viewsets.ModelViewSet):
             permission_classes = [permissions.IsAuthenticated]
         return [permission() for permission in permission_classes]
 
-class AssetLinkViewSet(viewsets.ModelViewSet):
+class AssetLinkViewSet(ProfiledSerializerMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = AssetLink.objects.all().order_by('-created_at')
     serializer_class = AssetLinkSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['project', 'asset_type']
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ProfiledSerializerMixin, ReplicaReadMixin, AggregateValidatorsMixin, AsyncReadMixin, viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user).order_by('-created_at')
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def metrics(self, request):
+        return Response(notification_metrics())
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        # Served from the denormalized counter on the already-loaded user
+        return Response({'unread': request.user.unread_notifications})
+
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
-        notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        self.get_queryset().filter(pk=self.get_object().pk).mark_read(request.user)
         return Response({'status': 'notification marked as read'})
 
-class TaskCommentViewSet(viewsets.ModelViewSet):
-    queryset = TaskComment.objects.all().order_by('created_at')
+    @action(detail=False, methods=['post'], url_path='mark-read')
+    def mark_read_bulk(self, request):
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise ValidationError({'ids': ['Expected a list of notification ids.']})
+        updated = self.get_queryset().filter(id__in=ids).mark_read(request.user)
+        return Response({'updated': updated, 'unread': self.unread_after(request)})
+
+    @action(detail=False, methods=['post'], url_path='mark-all-read')
+    def mark_all_read(self, request):
+        updated = self.get_queryset().mark_read(request.user)
+        return Response({'updated': updated, 'unread': self.unread_after(request)})
+
+    def unread_after(self, request):
+        request.user.refresh_from_db(fields=['unread_notifications'])
+        return request.user.unread_notifications
+
+class TaskCommentViewSet(ProfiledSerializerMixin, ReplicaReadMixin, AggregateValidatorsMixin, viewsets.ModelViewSet):
+    queryset = TaskComment.objects.select_related('user').order_by('created_at')
     serializer_class = TaskCommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OldestFirstCursorPagination
+    embedded_relations = ('user',)
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['task']
 
     def perform_create(self, serializer):
         comment = serializer.save(user=self.request.user)
-        ActivityLog.objects.create(
-            user=self.request.user,
-            action=f"Commented on Task: {comment.task.title}",
-            target_type='Task',
-            target_id=comment.task.id
-        )
+        log_activity(self.request.user, f"Commented on Task: {comment.task.title}", 'Task', comment.task.id)
         
-class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ActivityLog.objects.all().order_by('-created_at')
+class ActivityLogViewSet(ProfiledSerializerMixin, ReplicaReadMixin, StreamingExportMixin, AggregateValidatorsMixin, AsyncReadMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = ActivityLog.objects.select_related('user').order_by('-created_at')
+    modified_field = 'created_at'
+    embedded_relations = ('user',)
+    export_columns = {
+        'id': 'id',
+        'created_at': 'created_at',
+        'user': 'user__username',
+        'action': 'action',
+        'target_type': 'target_type',
+        'target_id': 'target_id',
+    }
     serializer_class = ActivityLogSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['target_type', 'target_id', 'user']
+
+class ImportJobViewSet(ProfiledSerializerMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    ``POST /api/imports/`` (multipart: file, kind, dry_run) imports projects or
+    tasks from a CSV, JSON Lines or JSON file. Uploads up to
+    IMPORT_INLINE_MAX_BYTES run in the request and answer 201 with the
+    finished job; larger ones are queued for Celery and answer 202, after
+    which ``GET /api/imports/<id>/`` reports progress.
+    """
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAdminUser | IsPMUser]
+
+    def get_queryset(self):
+        jobs = ImportJob.objects.order_by('-created_at')
+        if self.request.user.role != User.Role.ADMIN:
+            jobs = jobs.filter(user=self.request.user)
+        return jobs
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        job = serializer.save(user=request.user, format=ImportJob.format_for(upload.name))
+
+        if upload.size <= settings.IMPORT_INLINE_MAX_BYTES:
+            run_job(job)
+            return Response(self.get_serializer(job).data, status=status.HTTP_201_CREATED)
+        transaction.on_commit(lambda: run_import.delay(job.id))
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+class CacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_metrics())
+
+class SearchView(APIView):
+    """
+    ``GET /api/search/?q=...&kind=task,comment&limit=20``: ranked hits across
+    projects, tasks and comments the caller can see.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_limit = 100
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        kinds = [kind.upper() for kind in request.query_params.get('kind', '').split(',') if kind]
+        unknown = set(kinds) - set(SearchDocument.Kind.values)
+        if unknown:
+            raise ValidationError({'kind': [f'Unknown kind: {", ".join(sorted(unknown))}.']})
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_limit)
+        except ValueError:
+            raise ValidationError({'limit': ['A number is required.']})
+        return Response({'query': query, 'results': search(request.user, query, kinds, max(limit, 1))})
@@ -0,0 +1,127 @@
+"""
+JWT authentication without a user query per request.
+
+simplejwt's JWTAuthentication loads the User row for every request, although
+permissions and queryset scoping only read ``id`` and ``role``, both already
+claims of the access token. StatelessJWTAuthentication builds the User from
+a cached copy of the account instead: AUTH_USER_CACHE_LOCAL_TTL seconds in a
+per-process LRU, then AUTH_USER_CACHE_TIMEOUT seconds in the shared cache.
+Unlike simplejwt's JWTStatelessUserAuthentication the result is a real User
+instance, so it can still be assigned to foreign keys.
+
+The token is checked against the cached account, so inactive users are
+rejected, and so are tokens whose ``ver`` claim is older than
+User.token_version (see User.revoke_tokens()) or whose ``role`` claim is out
+of date. The ``username`` claim is for display only: renaming an account
+keeps its sessions, and the built User carries the current username. Saving
+or deleting a user drops its cache entries; other processes notice within
+AUTH_USER_CACHE_LOCAL_TTL seconds.
+
+Password, last_login and the unread notification counter are never cached.
+They stay deferred and are read from the database only when accessed.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+CACHE_KEY = 'auth:user:{}'
+UNCACHED_FIELDS = {'password', 'last_login', 'unread_notifications'}
+# In concrete field order, as Model.from_db() expects
+CACHED_FIELDS = [field.attname for field in User._meta.concrete_fields if field.attname not in UNCACHED_FIELDS]
+
+
+class LRUCache:
+    """A thread-safe LRU mapping whose entries expire after a TTL."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, maxsize):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > maxsize:
+                self.entries.popitem(last=False)
+
+    def pop(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local = LRUCache()
+
+
+def account(user_id):
+    """The cached field values of a user, or None if there is no such user."""
+    user_id = str(user_id)
+    values = local.get(user_id)
+    if values is None:
+        key = CACHE_KEY.format(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = User.objects.filter(id=user_id).values(*CACHED_FIELDS).first()
+            if values is None:
+                return None
+            cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+        local.set(user_id, values, settings.AUTH_USER_CACHE_LOCAL_TTL, settings.AUTH_USER_CACHE_SIZE)
+    return values
+
+
+def forget(user_id):
+    """
+    Drop a user's cache entries now, and again once the transaction commits,
+    so an account read between the write and the commit cannot outlive it.
+    """
+    def drop():
+        local.pop(str(user_id))
+        cache.delete(CACHE_KEY.format(user_id))
+
+    drop()
+    transaction.on_commit(drop)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if 'ver' not in validated_token or 'role' not in validated_token:
+            # Issued before these claims existed
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        values = account(user_id)
+        if values is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not values['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if validated_token['ver'] != values['token_version'] or validated_token['role'] != values['role']:
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+        return User.from_db(DEFAULT_DB_ALIAS, CACHED_FIELDS, [values[name] for name in CACHED_FIELDS])
@@ -0,0 +1,33 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+
+from .authentication import StatelessJWTAuthentication
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates WebSocket connections from an access token passed as
+    ``?token=``, since browsers cannot set an Authorization header there.
+    """
+
+    async def __call__(self, scope, receive, send):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+        scope = dict(scope, user=await self.get_user(token))
+        return await super().__call__(scope, receive, send)
+
+    @database_sync_to_async
+    def get_user(self, raw_token):
+        if not raw_token:
+            return AnonymousUser()
+        # As for HTTP requests, so revoked tokens are refused here too
+        authentication = StatelessJWTAuthentication()
+        try:
+            return authentication.get_user(authentication.get_validated_token(raw_token))
+        # InvalidToken, and inactive or deleted users, raise AuthenticationFailed
+        except (AuthenticationFailed, TokenError):
+            return AnonymousUser()
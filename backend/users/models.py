@@ -1,5 +1,9 @@
+from collections import defaultdict
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 
 class User(AbstractUser):
     class Role(models.TextChoices):
@@ -13,6 +17,41 @@ class User(AbstractUser):
         choices=Role.choices,
         default=Role.DEVELOPER,
     )
+    updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized count of unread notifications, only ever changed with F()
+    # updates through adjust_unread_notifications()
+    unread_notifications = models.PositiveIntegerField(default=0, editable=False)
+    # Tokens carry the version they were issued under in their ``ver`` claim;
+    # users.authentication rejects older ones
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        # A full save of a stale instance must not overwrite the counter
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'unread_notifications' and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    def revoke_tokens(self):
+        """Invalidate every access token issued to this user so far."""
+        self.token_version = F('token_version') + 1
+        self.save(update_fields=['token_version'])
+        self.refresh_from_db(fields=['token_version'])
+
+    @classmethod
+    def adjust_unread_notifications(cls, deltas):
+        """Apply ``{user_id: delta}`` with one UPDATE per distinct delta."""
+        by_delta = defaultdict(list)
+        for user_id, delta in deltas.items():
+            if delta:
+                by_delta[delta].append(user_id)
+        for delta, user_ids in by_delta.items():
+            cls.objects.filter(id__in=user_ids).update(
+                unread_notifications=Greatest(F('unread_notifications') + delta, 0)
+            )
 
     def __str__(self):
         return f"{self.username} - {self.get_role_display()}"
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_cached_account(sender, instance, **kwargs):
+    forget(instance.pk)
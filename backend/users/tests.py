@@ -1,3 +1,101 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from projects.models import Notification, Project
+from .authentication import local
+from .models import User
+
+
+class StatelessJWTAuthenticationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = User.objects.create_user(username='pm', password='secret1', role=User.Role.PM, email='pm@example.com')
+        Project.objects.create(name='Apollo', start_date=datetime.date(2026, 1, 1), pm=cls.pm)
+
+    def setUp(self):
+        cache.clear()
+        local.clear()
+
+    def login(self, username='pm', password='secret1'):
+        response = self.client.post('/api/token/', {'username': username, 'password': password}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        return response.data
+
+    def user_queries(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        return response, [query['sql'] for query in queries if 'FROM "users_user"' in query['sql']]
+
+    def test_authenticated_requests_skip_the_user_query(self):
+        self.login()
+        response, user_queries = self.user_queries('/api/projects/?expand=')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(user_queries), 1)
+        response, user_queries = self.user_queries('/api/projects/?expand=')
+        self.assertEqual(response.data['results'][0]['name'], 'Apollo')
+        self.assertEqual(user_queries, [])
+
+        response, _ = self.user_queries('/api/users/me/')
+        self.assertEqual((response.data['username'], response.data['email']), ('pm', 'pm@example.com'))
+
+    def test_uncached_fields_are_read_from_the_database(self):
+        self.login()
+        self.client.get('/api/projects/')
+        Notification.objects.create(user=self.pm, message='Hello')
+        self.assertEqual(self.client.get('/api/notifications/unread-count/').data, {'unread': 1})
+        response = self.client.post(
+            '/api/users/change-password/', {'old_password': 'secret1', 'new_password': 'secret2'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.login(password='secret2')
+
+    def test_deactivated_users_are_rejected(self):
+        self.login()
+        self.assertEqual(self.client.get('/api/projects/').status_code, 200)
+        self.pm.is_active = False
+        self.pm.save()
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['code'], 'user_inactive')
+
+    def test_logout_all_revokes_earlier_tokens(self):
+        tokens = self.login()
+        self.assertEqual(self.client.post('/api/users/logout-all/').status_code, 200)
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['code'], 'token_revoked')
+
+        # Access tokens refreshed from an older refresh token are revoked too
+        access = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json').data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get('/api/projects/').status_code, 401)
+
+        self.login()
+        self.assertEqual(self.client.get('/api/projects/').status_code, 200)
+
+    def test_tokens_with_an_outdated_role_are_rejected(self):
+        self.login()
+        self.client.get('/api/projects/')
+        self.pm.role = User.Role.DEVELOPER
+        self.pm.save()
+        self.assertEqual(self.client.get('/api/projects/').status_code, 401)
+
+    def test_renaming_yourself_keeps_your_session(self):
+        self.login()
+        response = self.client.patch('/api/users/me/', {'username': 'pm-renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'pm-renamed')
+
+    def test_tokens_without_the_new_claims_load_the_user(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.pm)}')
+        response, user_queries = self.user_queries('/api/projects/?expand=')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(user_queries), 1)
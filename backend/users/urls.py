@@ -4,6 +4,10 @@ from rest_framework import viewsets, permissions, serializers, status
 from rest_framework.decorators import action, api_view, permission_classes as perm_classes
 from rest_framework.response import Response
 from users.models import User
+from company_sys_backend.conditional import AggregateValidatorsMixin
+from company_sys_backend.pagination import DateJoinedCursorPagination
+from company_sys_backend.profiling import ProfiledSerializerMixin
+from company_sys_backend.replicas import ReplicaReadMixin
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -29,9 +33,10 @@ class ChangePasswordSerializer(serializers.Serializer):
     old_password = serializers.CharField(required=True)
     new_password = serializers.CharField(required=True, min_length=6)
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ProfiledSerializerMixin, ReplicaReadMixin, AggregateValidatorsMixin, viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('-date_joined')
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DateJoinedCursorPagination
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -42,7 +47,8 @@ class UserViewSet(viewsets.ModelViewSet):
     def change_password(self, request):
         serializer = ChangePasswordSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = request.user
+        # request.user is built from cached fields; write through a fresh row
+        user = User.objects.get(pk=request.user.pk)
         if not user.check_password(serializer.validated_data['old_password']):
             return Response({'old_password': 'Wrong password.'}, status=status.HTTP_400_BAD_REQUEST)
         user.set_password(serializer.validated_data['new_password'])
@@ -53,11 +59,16 @@ class UserViewSet(viewsets.ModelViewSet):
     def me(self, request):
         if request.method == 'GET':
             return Response(UserSerializer(request.user).data)
-        serializer = UserSerializer(request.user, data=request.data, partial=True)
+        serializer = UserSerializer(User.objects.get(pk=request.user.pk), data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='logout-all')
+    def logout_all(self, request):
+        request.user.revoke_tokens()
+        return Response({'detail': 'Signed out on every device.'})
+
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
 
@@ -8,6 +8,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         # Add custom claims
         token['username'] = user.username
         token['role'] = user.role
+        token['ver'] = user.token_version
         return token
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -1,5 +1,8 @@
-import { NavLink, Outlet, useNavigate } from 'react-router-dom';
+import { useEffect, useState } from 'react';
+import { NavLink, Outlet, useLocation, useNavigate } from 'react-router-dom';
 import { useAuthStore } from '../store/authStore';
+import { getUnreadCount } from '../services/api';
+import { connectLive } from '../services/realtime';
 import {
     LayoutDashboard, FolderKanban, ListTodo, Bell, LogOut, Users, BarChart3, Link2, Settings
 } from 'lucide-react';
@@ -14,6 +17,14 @@ const roleLabels: Record<string, string> = {
 export default function DashboardLayout() {
     const { username, role, logout } = useAuthStore();
     const navigate = useNavigate();
+    const location = useLocation();
+    const [unread, setUnread] = useState(0);
+
+    const loadUnread = () => {
+        getUnreadCount().then((r) => setUnread(r.data.unread)).catch(() => { });
+    };
+    useEffect(loadUnread, [location.pathname]);
+    useEffect(() => connectLive((e) => { if (e.event === 'notification.created') loadUnread(); }), []);
 
     const handleLogout = () => {
         logout();
@@ -67,6 +78,12 @@ export default function DashboardLayout() {
                     )}
                     <NavLink to="/notifications" style={({ isActive }) => linkStyle(isActive)}>
                         <Bell size={18} /> Notifications
+                        {unread > 0 && (
+                            <span style={{
+                                marginLeft: 'auto', minWidth: 20, padding: '0 6px', borderRadius: 10, fontSize: '0.7rem',
+                                fontWeight: 700, lineHeight: '20px', textAlign: 'center', background: '#6366f1', color: '#fff',
+                            }}>{unread > 99 ? '99+' : unread}</span>
+                        )}
                     </NavLink>
                     {role === 'ADMIN' && (
                         <NavLink to="/users" style={({ isActive }) => linkStyle(isActive)}>
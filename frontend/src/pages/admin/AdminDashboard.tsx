@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuthStore } from '../../store/authStore';
-import { getProjects, getTasks, getNotifications, getActivityLogs } from '../../services/api';
+import { getTaskStats, getTasks, getUnreadCount, getActivityLogs } from '../../services/api';
 import {
     Users, FolderKanban, ListTodo, Bell, TrendingUp, Clock, CheckCircle2, AlertTriangle, Activity
 } from 'lucide-react';
@@ -16,16 +16,15 @@ export default function AdminDashboard() {
     const [activityLogs, setActivityLogs] = useState<any[]>([]);
 
     useEffect(() => {
-        Promise.all([getProjects(), getTasks(), getNotifications(), getActivityLogs()]).then(([pRes, tRes, nRes, aRes]) => {
-            const projects = pRes.data.results ?? pRes.data;
+        Promise.all([getTaskStats(), getTasks(), getUnreadCount(), getActivityLogs()]).then(([sRes, tRes, nRes, aRes]) => {
+            const taskStats = sRes.data;
             const tasks = tRes.data.results ?? tRes.data;
-            const notifs = nRes.data.results ?? nRes.data;
             const logs = aRes.data.results ?? aRes.data;
             setStats([
-                { label: 'Total Projects', value: projects.length, icon: <FolderKanban size={20} />, color: '#6366f1' },
-                { label: 'Total Tasks', value: tasks.length, icon: <ListTodo size={20} />, color: '#06b6d4' },
-                { label: 'Completed', value: tasks.filter((t: any) => t.status === 'DONE').length, icon: <CheckCircle2 size={20} />, color: '#22c55e' },
-                { label: 'Notifications', value: notifs.filter((n: any) => !n.is_read).length, icon: <Bell size={20} />, color: '#eab308' },
+                { label: 'Total Projects', value: taskStats.projects, icon: <FolderKanban size={20} />, color: '#6366f1' },
+                { label: 'Total Tasks', value: taskStats.tasks, icon: <ListTodo size={20} />, color: '#06b6d4' },
+                { label: 'Completed', value: taskStats.by_status.DONE, icon: <CheckCircle2 size={20} />, color: '#22c55e' },
+                { label: 'Notifications', value: nRes.data.unread, icon: <Bell size={20} />, color: '#eab308' },
             ]);
             setRecentTasks(tasks.slice(0, 5));
             setActivityLogs(logs.slice(0, 8));
@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
-import { getProjects, getTasks } from '../../services/api';
+import { getProjects, getTaskStats } from '../../services/api';
 import { BarChart3, FolderKanban, TrendingUp, Clock, Users, CheckCircle2, Download } from 'lucide-react';
-import { generateCSV } from '../../utils/exportUtils';
+import { downloadExport } from '../../utils/exportUtils';
 
 export default function CeoDashboard() {
     const [projectCount, setProjectCount] = useState(0);
@@ -9,32 +9,30 @@ export default function CeoDashboard() {
     const [projects, setProjects] = useState<any[]>([]);
 
     useEffect(() => {
-        Promise.all([getProjects(), getTasks()]).then(([pRes, tRes]) => {
+        // No nested tasks: progress comes from the project rollups
+        Promise.all([getProjects({ expand: '' }), getTaskStats()]).then(([pRes, sRes]) => {
             const p = pRes.data.results ?? pRes.data;
-            const t = tRes.data.results ?? tRes.data;
-            setProjectCount(p.length);
+            const s = sRes.data;
+            setProjectCount(s.projects);
             setProjects(p.slice(0, 5));
             setTaskStats({
-                total: t.length,
-                done: t.filter((x: any) => x.status === 'DONE').length,
-                inProgress: t.filter((x: any) => x.status === 'IN_PROGRESS').length,
-                overdue: t.filter((x: any) => x.due_date && new Date(x.due_date) < new Date() && x.status !== 'DONE').length,
+                total: s.tasks,
+                done: s.by_status.DONE,
+                inProgress: s.by_status.IN_PROGRESS,
+                overdue: s.overdue,
             });
         }).catch(() => { });
     }, []);
 
+    const projectProgress = (p: any) => {
+        const total = p.tasks_todo + p.tasks_in_progress + p.tasks_review + p.tasks_done;
+        return total > 0 ? Math.round((p.tasks_done / total) * 100) : 0;
+    };
+
     const completionRate = taskStats.total > 0 ? Math.round((taskStats.done / taskStats.total) * 100) : 0;
 
     const handleExport = () => {
-        const exportData = projects.map((p: any) => ({
-            "Project Name": p.name,
-            "Project Manager": p.pm?.username || "—",
-            "Start Date": p.start_date || "—",
-            "End Date": p.end_date || "—",
-            "Status": p.status || "—"
-        }));
-        // Adding a summary row at the top or bottom isn't structured well for CSV, so we export the projects list
-        generateCSV(exportData, "Executive_Project_Report");
+        downloadExport('projects', 'Executive_Project_Report').catch(() => { });
     };
 
     return (
@@ -97,6 +95,8 @@ export default function CeoDashboard() {
                             <th style={{ textAlign: 'left', padding: '0.75rem', color: '#94a3b8', fontWeight: 500 }}>Project</th>
                             <th style={{ textAlign: 'left', padding: '0.75rem', color: '#94a3b8', fontWeight: 500 }}>PM</th>
                             <th style={{ textAlign: 'left', padding: '0.75rem', color: '#94a3b8', fontWeight: 500 }}>Start Date</th>
+                            <th style={{ textAlign: 'left', padding: '0.75rem', color: '#94a3b8', fontWeight: 500 }}>Progress</th>
+                            <th style={{ textAlign: 'left', padding: '0.75rem', color: '#94a3b8', fontWeight: 500 }}>Overdue</th>
                         </tr>
                     </thead>
                     <tbody>
@@ -105,9 +105,11 @@ export default function CeoDashboard() {
                                 <td style={{ padding: '0.75rem', fontWeight: 500 }}>{p.name}</td>
                                 <td style={{ padding: '0.75rem', color: '#94a3b8' }}>{p.pm?.username ?? '—'}</td>
                                 <td style={{ padding: '0.75rem', color: '#94a3b8' }}>{p.start_date ?? '—'}</td>
+                                <td style={{ padding: '0.75rem', color: '#94a3b8' }}>{projectProgress(p)}%</td>
+                                <td style={{ padding: '0.75rem', color: p.tasks_overdue > 0 ? '#ef4444' : '#94a3b8' }}>{p.tasks_overdue}</td>
                             </tr>
                         )) : (
-                            <tr><td colSpan={3} style={{ padding: '1.5rem', textAlign: 'center', color: '#64748b' }}>No projects yet</td></tr>
+                            <tr><td colSpan={5} style={{ padding: '1.5rem', textAlign: 'center', color: '#64748b' }}>No projects yet</td></tr>
                         )}
                     </tbody>
                 </table>
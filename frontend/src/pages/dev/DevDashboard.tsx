@@ -1,6 +1,7 @@
 import { useEffect, useState } from 'react';
 import { useAuthStore } from '../../store/authStore';
 import { getTasks, updateTask } from '../../services/api';
+import { connectLive } from '../../services/realtime';
 import { ArrowRight, Clock, GitPullRequest } from 'lucide-react';
 
 const COLUMNS = [
@@ -17,9 +18,11 @@ export default function DevDashboard() {
     const [tasks, setTasks] = useState<any[]>([]);
 
     const load = () => {
-        getTasks().then((r) => setTasks(r.data.results ?? r.data)).catch(() => { });
+        getTasks({ fields: 'id,title,status,priority,sprint,due_date,github_pr_url' })
+            .then((r) => setTasks(r.data.results ?? r.data)).catch(() => { });
     };
     useEffect(load, []);
+    useEffect(() => connectLive((e) => { if (e.event === 'task.status_changed') load(); }), []);
 
     const moveTask = async (id: number, newStatus: string) => {
         await updateTask(id, { status: newStatus });
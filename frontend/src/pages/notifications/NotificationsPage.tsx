@@ -1,20 +1,29 @@
 import { useEffect, useState } from 'react';
-import { getNotifications, markNotificationRead } from '../../services/api';
+import { getNotifications, getUnreadCount, markNotificationRead, markAllNotificationsRead } from '../../services/api';
+import { connectLive } from '../../services/realtime';
 import { Bell, CheckCircle2, Inbox } from 'lucide-react';
 
 export default function NotificationsPage() {
     const [notifications, setNotifications] = useState<any[]>([]);
+    const [unreadCount, setUnreadCount] = useState(0);
 
     const load = () => {
         getNotifications().then((r) => setNotifications(r.data.results ?? r.data)).catch(() => { });
+        getUnreadCount().then((r) => setUnreadCount(r.data.unread)).catch(() => { });
     };
     useEffect(load, []);
+    useEffect(() => connectLive((e) => { if (e.event === 'notification.created') load(); }), []);
 
     const handleMarkRead = async (id: number) => {
         await markNotificationRead(id);
         load();
     };
 
+    const handleMarkAllRead = async () => {
+        await markAllNotificationsRead();
+        load();
+    };
+
     const unread = notifications.filter((n) => !n.is_read);
     const read = notifications.filter((n) => n.is_read);
 
@@ -24,7 +33,14 @@ export default function NotificationsPage() {
                 <h1 style={{ fontSize: '1.75rem', fontWeight: 700, display: 'flex', alignItems: 'center', gap: 10 }}>
                     <Bell size={24} /> Notifications
                 </h1>
-                <p style={{ color: '#94a3b8', marginTop: 4 }}>{unread.length} unread notification{unread.length !== 1 ? 's' : ''}</p>
+                <div style={{ display: 'flex', alignItems: 'center', gap: 12, marginTop: 4 }}>
+                    <p style={{ color: '#94a3b8' }}>{unreadCount} unread notification{unreadCount !== 1 ? 's' : ''}</p>
+                    {unreadCount > 0 && (
+                        <button className="btn btn-outline" style={{ fontSize: '0.75rem', padding: '0.3rem 0.75rem' }} onClick={handleMarkAllRead}>
+                            <CheckCircle2 size={14} /> Mark all read
+                        </button>
+                    )}
+                </div>
             </div>
 
             {notifications.length === 0 ? (
@@ -3,7 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { useAuthStore } from '../../store/authStore';
 import { getProjects, getTasks, createProject, getUsers } from '../../services/api';
 import { FolderKanban, Plus, ListTodo, Search, Filter, Download } from 'lucide-react';
-import { generateCSV } from '../../utils/exportUtils';
+import { downloadExport } from '../../utils/exportUtils';
 
 export default function PmDashboard() {
     const { username } = useAuthStore();
@@ -66,16 +66,10 @@ export default function PmDashboard() {
     });
 
     const handleExportTasks = () => {
-        const exportData = filteredTasks.map((t: any) => ({
-            "Task ID": t.id,
-            "Title": t.title,
-            "Project": projects.find(p => p.id === t.project)?.name || "Unknown",
-            "Priority": t.priority,
-            "Status": t.status,
-            "Sprint": t.sprint || "—",
-            "Assigned To": t.assigned_to?.username || "—"
-        }));
-        generateCSV(exportData, "PM_Tasks_Report");
+        const params: Record<string, string> = {};
+        if (filterStatus !== 'ALL') params.status = filterStatus;
+        if (searchTask) params.search = searchTask;
+        downloadExport('tasks', 'PM_Tasks_Report', params).catch(() => { });
     };
 
     return (
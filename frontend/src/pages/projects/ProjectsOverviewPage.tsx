@@ -1,47 +1,27 @@
 import { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuthStore } from '../../store/authStore';
-import { getProjects, getTasks } from '../../services/api';
+import { getProjects } from '../../services/api';
 import { FolderKanban, Users, Eye, CheckCircle2, Clock, AlertCircle, Search, Download } from 'lucide-react';
-import { generateCSV } from '../../utils/exportUtils';
+import { downloadExport } from '../../utils/exportUtils';
 
 export default function ProjectsOverviewPage() {
     const { role } = useAuthStore();
     const navigate = useNavigate();
     const [projects, setProjects] = useState<any[]>([]);
-    const [tasks, setTasks] = useState<any[]>([]);
     const [searchQuery, setSearchQuery] = useState('');
 
     useEffect(() => {
         getProjects().then((r) => setProjects(r.data.results ?? r.data)).catch(() => { });
-        getTasks().then((r) => setTasks(r.data.results ?? r.data)).catch(() => { });
     }, []);
 
-    const getProjectTasks = (projectId: number) => tasks.filter((t: any) => t.project === projectId);
-    const getStatusCount = (projectTasks: any[], status: string) => projectTasks.filter((t: any) => t.status === status).length;
-
     const filteredProjects = projects.filter(p =>
         p.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
         (p.description && p.description.toLowerCase().includes(searchQuery.toLowerCase()))
     );
 
     const handleExport = () => {
-        const exportData = filteredProjects.map(p => {
-            const pTasks = getProjectTasks(p.id);
-            const done = getStatusCount(pTasks, 'DONE');
-            const progress = pTasks.length > 0 ? Math.round((done / pTasks.length) * 100) : 0;
-            return {
-                "Project ID": p.id,
-                "Name": p.name,
-                "Description": p.description || "N/A",
-                "Project Manager": p.pm?.username || "Unassigned",
-                "Start Date": p.start_date || "N/A",
-                "Total Tasks": pTasks.length,
-                "Tasks Done": done,
-                "Completion %": `${progress}%`
-            };
-        });
-        generateCSV(exportData, "Projects_Report");
+        downloadExport('projects', 'Projects_Report', searchQuery ? { search: searchQuery } : {}).catch(() => { });
     };
 
     return (
@@ -78,14 +58,14 @@ export default function ProjectsOverviewPage() {
             {filteredProjects.length > 0 ? (
                 <div style={{ display: 'flex', flexDirection: 'column', gap: '1rem' }}>
                     {filteredProjects.map((p: any) => {
-                        const pTasks = getProjectTasks(p.id);
-                        const done = getStatusCount(pTasks, 'DONE');
-                        const inProgress = getStatusCount(pTasks, 'IN_PROGRESS');
-                        const review = getStatusCount(pTasks, 'REVIEW');
-                        const todo = getStatusCount(pTasks, 'TODO');
-                        const total = pTasks.length;
+                        // Counts come from the project's maintained rollups
+                        const done = p.tasks_done;
+                        const inProgress = p.tasks_in_progress;
+                        const review = p.tasks_review;
+                        const todo = p.tasks_todo;
+                        const total = todo + inProgress + review + done;
                         const progress = total > 0 ? Math.round((done / total) * 100) : 0;
-                        const devs = [...new Set(pTasks.filter((t: any) => t.assigned_to).map((t: any) => t.assigned_to?.username))];
+                        const devs = [...new Set((p.tasks ?? []).filter((t: any) => t.assigned_to).map((t: any) => t.assigned_to?.username))];
 
                         return (
                             <div key={p.id} className="card" style={{ cursor: 'pointer', transition: 'border-color 0.15s', border: '1px solid transparent' }}
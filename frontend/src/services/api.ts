@@ -45,7 +45,7 @@ export const login = (username: string, password: string) =>
     api.post('/token/', { username, password });
 
 // ── Projects ──
-export const getProjects = () => api.get('/projects/');
+export const getProjects = (params?: Record<string, string>) => api.get('/projects/', { params });
 export const getProject = (id: number) => api.get(`/projects/${id}/`);
 export const createProject = (data: Record<string, unknown>) => api.post('/projects/', data);
 export const updateProject = (id: number, data: Record<string, unknown>) => api.patch(`/projects/${id}/`, data);
@@ -53,18 +53,32 @@ export const deleteProject = (id: number) => api.delete(`/projects/${id}/`);
 
 // ── Tasks ──
 export const getTasks = (params?: Record<string, string>) => api.get('/tasks/', { params });
+export const getTaskStats = (params?: Record<string, string>) => api.get('/tasks/stats/', { params });
 export const getTask = (id: number) => api.get(`/tasks/${id}/`);
 export const createTask = (data: Record<string, unknown>) => api.post('/tasks/', data);
 export const updateTask = (id: number, data: Record<string, unknown>) => api.patch(`/tasks/${id}/`, data);
+export const bulkUpdateTasks = (updates: Record<string, unknown>[]) => api.patch('/tasks/bulk/', updates);
 export const deleteTask = (id: number) => api.delete(`/tasks/${id}/`);
 export const createTaskComment = (data: Record<string, unknown>) => api.post('/task-comments/', data);
 
+// ── Exports (streamed CSV / JSONL) ──
+export type ExportResource = 'projects' | 'tasks' | 'activity-logs';
+
+export const exportRows = (resource: ExportResource, params?: Record<string, string>) =>
+    api.get(`/${resource}/export/`, { params, responseType: 'blob' });
+
+// ── Search ──
+export const search = (q: string, params?: Record<string, string>) => api.get('/search/', { params: { q, ...params } });
+
 // ── Activity Logs ──
 export const getActivityLogs = (params?: Record<string, string>) => api.get('/activity-logs/', { params });
 
 // ── Notifications ──
 export const getNotifications = () => api.get('/notifications/');
 export const markNotificationRead = (id: number) => api.post(`/notifications/${id}/mark_read/`);
+export const getUnreadCount = () => api.get('/notifications/unread-count/');
+export const markNotificationsRead = (ids: number[]) => api.post('/notifications/mark-read/', { ids });
+export const markAllNotificationsRead = () => api.post('/notifications/mark-all-read/');
 
 // ── Assets ──
 export const getAssets = (params?: Record<string, string>) => api.get('/assets/', { params });
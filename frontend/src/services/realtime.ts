@@ -0,0 +1,32 @@
+import Cookies from 'js-cookie';
+
+const API_BASE = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api';
+const WS_URL = API_BASE.replace(/^http/, 'ws').replace(/\/api\/?$/, '/ws/live/');
+
+export interface LiveEvent {
+    event: string;
+    [key: string]: unknown;
+}
+
+// Opens the live updates socket; returns a function that closes it
+export function connectLive(onEvent: (e: LiveEvent) => void, projects: number[] = []) {
+    let socket: WebSocket | null = null;
+    let closed = false;
+    let retry: ReturnType<typeof setTimeout>;
+
+    const open = () => {
+        const token = Cookies.get('access_token');
+        if (!token || closed) return;
+        socket = new WebSocket(`${WS_URL}?token=${encodeURIComponent(token)}`);
+        socket.onopen = () => projects.forEach((project) => socket?.send(JSON.stringify({ action: 'subscribe', project })));
+        socket.onmessage = (msg) => onEvent(JSON.parse(msg.data));
+        socket.onclose = () => { if (!closed) retry = setTimeout(open, 3000); };
+    };
+    open();
+
+    return () => {
+        closed = true;
+        clearTimeout(retry);
+        socket?.close();
+    };
+}